@@ -0,0 +1,84 @@
+import copy
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+USER_VERSION_KEY = 'auth_user_version:{user_id}'
+USER_CACHE_KEY = 'auth_user:{user_id}'
+
+# user_id -> (version, user, expires_at); a per-process tier in front of CACHES.
+_local_users = {}
+
+
+def bump_user_version(user_id):
+    # A fresh random stamp rather than a counter, so an evicted stamp can
+    # never be recreated with a value an old cache entry still carries.
+    # Called from the User save/delete signals; code that changes users with
+    # QuerySet.update() must call it itself.
+    cache.set(USER_VERSION_KEY.format(user_id=user_id), uuid.uuid4().hex, None)
+    _local_users.pop(user_id, None)
+
+
+def _current_version(user_id):
+    key = USER_VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def get_cached_user(user_model, user_id):
+    # Every lookup re-reads the shared stamp, so a bump in one process is
+    # seen by all of them on their next request.
+    version = _current_version(user_id)
+    now = time.monotonic()
+    
+    entry = _local_users.get(user_id)
+    if entry is None or entry[0] != version or entry[2] < now:
+        entry = cache.get(USER_CACHE_KEY.format(user_id=user_id))
+        if entry is None or entry[0] != version:
+            user = user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            entry = (version, user)
+            cache.set(USER_CACHE_KEY.format(user_id=user_id), entry, settings.AUTH_USER_CACHE_TIMEOUT)
+        if len(_local_users) >= settings.AUTH_USER_LOCAL_CACHE_SIZE:
+            _local_users.clear()
+        entry = (version, entry[1], now + settings.AUTH_USER_CACHE_TIMEOUT)
+        _local_users[user_id] = entry
+    
+    # Views mutate request.user (e.g. set_password), so never hand out the cached instance.
+    return copy.copy(entry[1])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    
+    def get_user(self, validated_token):
+        if not settings.AUTH_USER_CACHE_ENABLED:
+            # Without a shared cache the version stamps are per process.
+            return super().get_user(validated_token)
+        
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+        
+        try:
+            user = get_cached_user(self.user_model, user_id)
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+        
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        
+        return user
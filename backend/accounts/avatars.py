@@ -0,0 +1,87 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from .models import User
+
+
+@lru_cache(maxsize=None)
+def get_avatar_executor():
+    return ThreadPoolExecutor(max_workers=settings.AVATAR_VARIANT_WORKERS, thread_name_prefix='avatar-variants')
+
+
+def variant_path(source_name, size):
+    stem = os.path.splitext(os.path.basename(source_name))[0]
+    return f'profile_pictures/variants/{stem}_{size}.webp'
+
+
+def render_variants(source):
+    from PIL import Image, ImageOps
+    
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+        for size in settings.AVATAR_VARIANT_SIZES:
+            variant = ImageOps.fit(image, (size, size), Image.LANCZOS)
+            buffer = io.BytesIO()
+            variant.save(buffer, 'WEBP', quality=settings.AVATAR_VARIANT_QUALITY, method=4)
+            yield size, buffer.getvalue()
+
+
+def generate_avatar_variants(user_id, source_name):
+    user = User.objects.filter(id=user_id).first()
+    if user is None or user.profile_picture.name != source_name:
+        return
+    
+    storage = user.profile_picture.storage
+    variants = {}
+    with user.profile_picture.open('rb') as source:
+        for size, content in render_variants(source):
+            path = variant_path(source_name, size)
+            if storage.exists(path):
+                storage.delete(path)
+            variants[str(size)] = storage.save(path, ContentFile(content))
+    
+    with transaction.atomic():
+        # The picture may have been replaced while we were rendering.
+        user = User.objects.select_for_update().filter(id=user_id, profile_picture=source_name).first()
+        if user is None:
+            delete_variant_files(storage, variants)
+            return
+        user.avatar_variants = variants
+        user.save(update_fields=['avatar_variants'])
+
+
+def _generate_in_pool(user_id, source_name):
+    # Pool threads hold their own connections; release them like a request would.
+    try:
+        generate_avatar_variants(user_id, source_name)
+    finally:
+        close_old_connections()
+
+
+def schedule_avatar_variants(user):
+    # Rendering happens after commit on a small pool, never on the request.
+    source_name = user.profile_picture.name
+    if not source_name:
+        return
+    if settings.AVATAR_VARIANTS_EAGER:
+        job = lambda: generate_avatar_variants(user.id, source_name)  # noqa: E731
+    else:
+        job = lambda: get_avatar_executor().submit(_generate_in_pool, user.id, source_name)  # noqa: E731
+    transaction.on_commit(job, robust=True)
+
+
+def delete_variant_files(storage, variants):
+    for path in variants.values():
+        storage.delete(path)
+
+
+def clear_avatar_variants(user):
+    # Removes the files; the caller saves the user.
+    if user.avatar_variants:
+        delete_variant_files(user.profile_picture.storage, user.avatar_variants)
+    user.avatar_variants = {}
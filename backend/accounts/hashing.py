@@ -0,0 +1,42 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from django.conf import settings
+
+
+class HashingBusy(Exception):
+    pass
+
+
+@lru_cache(maxsize=None)
+def get_hashing_executor():
+    # hashlib's PBKDF2 releases the GIL, so these threads hash in parallel
+    # while the event loop keeps serving other requests.
+    return ThreadPoolExecutor(max_workers=settings.PASSWORD_HASHING_WORKERS, thread_name_prefix='password-hashing')
+
+
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+async def run_hashing(func, *args, **kwargs):
+    """
+    Run a CPU-bound password hashing call on the bounded hashing pool.
+
+    Raises HashingBusy instead of queueing once PASSWORD_HASHING_MAX_PENDING
+    calls are running or waiting, so a login spike is shed with 503s rather
+    than growing an unbounded backlog.
+    """
+    global _pending
+    with _pending_lock:
+        if _pending >= settings.PASSWORD_HASHING_MAX_PENDING:
+            raise HashingBusy()
+        _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_hashing_executor(), functools.partial(func, *args, **kwargs))
+    finally:
+        with _pending_lock:
+            _pending -= 1
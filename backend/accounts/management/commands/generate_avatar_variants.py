@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from accounts.avatars import generate_avatar_variants
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    help = 'Render avatar variants for profile pictures that do not have them yet.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-render variants that already exist too.')
+    
+    def handle(self, *args, **options):
+        users = User.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+        if not options['all']:
+            users = users.filter(avatar_variants={})
+        total = 0
+        for user_id, source_name in users.values_list('id', 'profile_picture').iterator():
+            generate_avatar_variants(user_id, source_name)
+            total += 1
+        self.stdout.write(self.style.SUCCESS(f'Rendered avatar variants for {total} users'))
@@ -14,6 +14,9 @@ class User(AbstractUser):
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='renter')
     phone_number = models.CharField(max_length=20, blank=True)
     profile_picture = models.ImageField(upload_to='profile_pictures/', blank=True, null=True)
+    # Size (px, as a string) -> storage path of the square WebP renditions
+    # written by accounts.avatars; empty until they have been generated.
+    avatar_variants = models.JSONField(default=dict, blank=True)
     is_verified = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -56,3 +59,13 @@ class RenterProfile(models.Model):
     
     def __str__(self):
         return f"{self.user.full_name} - Renter Profile"
+
+
+class RevokedToken(models.Model):
+    
+    # Refresh-token jtis revoked by logout or rotation, for DatabaseRevocationStore.
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    
+    def __str__(self):
+        return self.jti
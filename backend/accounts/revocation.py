@@ -0,0 +1,156 @@
+import hashlib
+import heapq
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class BloomFilter:
+    """
+    Fixed-size set membership with no false negatives. A miss means the jti
+    was never revoked, so the common case needs no lookup at all.
+    """
+    
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+    
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big')
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+    
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position // 8] |= 1 << (position % 8)
+        self.count += 1
+    
+    def __contains__(self, item):
+        return all(self.bits[position // 8] & (1 << (position % 8)) for position in self._positions(item))
+
+
+class InMemoryRevocationStore:
+    """
+    Revoked jtis for this process only. Used in tests and single-worker
+    setups; run RedisRevocationStore when there is more than one worker.
+    """
+    
+    def __init__(self):
+        self._revoked = {}
+        self._expiry = []
+        self._lock = threading.Lock()
+    
+    def _purge(self, now):
+        # Entries leave in exp order as they lapse, so no sweep ever scans the store.
+        while self._expiry and self._expiry[0][0] <= now:
+            _, jti = heapq.heappop(self._expiry)
+            self._revoked.pop(jti, None)
+    
+    def revoke(self, jti, exp):
+        with self._lock:
+            self._purge(time.time())
+            self._revoked[jti] = exp
+            heapq.heappush(self._expiry, (exp, jti))
+    
+    def is_revoked(self, jti):
+        with self._lock:
+            self._purge(time.time())
+            return jti in self._revoked
+
+
+class DatabaseRevocationStore:
+    """
+    Revoked jtis as RevokedToken rows, so every worker sees them without
+    Redis. One indexed lookup per refresh; expired rows are dropped as new
+    revocations arrive.
+    """
+    
+    def revoke(self, jti, exp):
+        from .models import RevokedToken
+        now = datetime.now(timezone.utc)
+        RevokedToken.objects.filter(expires_at__lte=now).delete()
+        RevokedToken.objects.get_or_create(jti=jti, defaults={'expires_at': datetime.fromtimestamp(exp, timezone.utc)})
+    
+    def is_revoked(self, jti):
+        from .models import RevokedToken
+        return RevokedToken.objects.filter(jti=jti, expires_at__gt=datetime.now(timezone.utc)).exists()
+
+
+class RedisRevocationStore:
+    """
+    One Redis key per revoked jti that expires at the token's exp, plus a
+    stream of revocations that each process folds into a local Bloom filter.
+    Only Bloom hits (revoked tokens and rare false positives) reach Redis.
+    Revocations from other workers are picked up within sync_interval seconds.
+    """
+    
+    def __init__(self, url, prefix='rentify:revoked:', sync_interval=1.0, capacity=100000, error_rate=0.001):
+        self.url = url
+        self.prefix = prefix
+        self.stream = f'{prefix}log'
+        self.sync_interval = sync_interval
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._client = None
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._last_id = '0-0'
+        self._synced_at = 0.0
+    
+    @property
+    def client(self):
+        if self._client is None:
+            import redis
+            self._client = redis.Redis.from_url(self.url, decode_responses=True)
+        return self._client
+    
+    def revoke(self, jti, exp):
+        now = time.time()
+        # No token older than the refresh lifetime can still be presented, so
+        # older stream entries are trimmed as new ones arrive.
+        oldest = int((now - settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME'].total_seconds()) * 1000)
+        pipeline = self.client.pipeline()
+        pipeline.set(f'{self.prefix}{jti}', 1, exat=max(int(exp), int(now) + 1))
+        pipeline.xadd(self.stream, {'jti': jti, 'exp': int(exp)})
+        pipeline.xtrim(self.stream, minid=f'{max(oldest, 0)}-0', approximate=True)
+        pipeline.execute()
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+    
+    def _sync(self):
+        now = time.monotonic()
+        if self._bloom is not None and now - self._synced_at < self.sync_interval:
+            return
+        with self._lock:
+            if self._bloom is None or self._bloom.count >= self.capacity:
+                # Bloom filters cannot forget, so a full one is rebuilt from
+                # the entries that have not expired yet.
+                self._bloom, self._last_id = BloomFilter(self.capacity, self.error_rate), '0-0'
+                live_after = time.time()
+            else:
+                live_after = 0
+            for entry_id, fields in self.client.xrange(self.stream, min=f'({self._last_id}'):
+                if int(fields['exp']) > live_after:
+                    self._bloom.add(fields['jti'])
+                self._last_id = entry_id
+            self._synced_at = now
+    
+    def is_revoked(self, jti):
+        self._sync()
+        if jti not in self._bloom:
+            return False
+        return bool(self.client.exists(f'{self.prefix}{jti}'))
+
+
+@lru_cache(maxsize=None)
+def get_revocation_store():
+    config = settings.TOKEN_REVOCATION_STORE
+    return import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
@@ -1,7 +1,9 @@
 from rest_framework import serializers
-from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rentify.sideload import SideloadedSerializerMixin
 from .models import User, HomeownerProfile, RenterProfile
+from .tokens import RevocableRefreshToken
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -20,40 +22,50 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         validated_data.pop('password_confirm')
-        user = User.objects.create_user(**validated_data)
+        password_hash = validated_data.pop('password_hash', None)
+        if password_hash is None:
+            return User.objects.create_user(**validated_data)
+        
+        # The view already hashed the password on the hashing pool.
+        validated_data.pop('password')
+        validated_data['email'] = User.objects.normalize_email(validated_data['email'])
+        validated_data['username'] = User.normalize_username(validated_data['username'])
+        user = User(password=password_hash, **validated_data)
+        user.save()
         return user
 
 
 class UserLoginSerializer(serializers.Serializer):
     
+    # Credentials are checked by user_login_view so hashing stays off the event loop.
     email = serializers.EmailField()
     password = serializers.CharField()
-    
-    def validate(self, attrs):
-        email = attrs.get('email')
-        password = attrs.get('password')
-        
-        if email and password:
-            user = authenticate(username=email, password=password)
-            if not user:
-                raise serializers.ValidationError('Invalid credentials')
-            if not user.is_active:
-                raise serializers.ValidationError('User account is disabled')
-            attrs['user'] = user
-            return attrs
-        else:
-            raise serializers.ValidationError('Must include email and password')
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SideloadedSerializerMixin, serializers.ModelSerializer):
     
+    sideload_as = 'users'
     full_name = serializers.ReadOnlyField()
+    avatar = serializers.SerializerMethodField()
     
     class Meta:
         model = User
         fields = ('id', 'email', 'username', 'first_name', 'last_name', 'full_name', 'role', 
-                 'phone_number', 'profile_picture', 'is_verified', 'created_at', 'updated_at')
+                 'phone_number', 'profile_picture', 'avatar', 'is_verified', 'created_at', 'updated_at')
         read_only_fields = ('id', 'email', 'role', 'is_verified', 'created_at', 'updated_at')
+    
+    def get_avatar(self, obj):
+        # Small WebP renditions keyed by pixel size; null until generated,
+        # in which case clients fall back to profile_picture.
+        if not obj.avatar_variants:
+            return None
+        storage = obj.profile_picture.storage
+        request = self.context.get('request')
+        urls = {}
+        for size, path in obj.avatar_variants.items():
+            url = storage.url(path)
+            urls[size] = request.build_absolute_uri(url) if request else url
+        return urls
 
 
 class UserUpdateSerializer(serializers.ModelSerializer):
@@ -73,12 +85,6 @@ class PasswordChangeSerializer(serializers.Serializer):
         if attrs['new_password'] != attrs['new_password_confirm']:
             raise serializers.ValidationError("New passwords don't match")
         return attrs
-    
-    def validate_old_password(self, value):
-        user = self.context['request'].user
-        if not user.check_password(value):
-            raise serializers.ValidationError("Old password is incorrect")
-        return value
 
 
 class HomeownerProfileSerializer(serializers.ModelSerializer):
@@ -112,3 +118,8 @@ class RenterProfileUpdateSerializer(serializers.ModelSerializer):
         model = RenterProfile
         fields = ('bio', 'employment_status', 'annual_income', 'credit_score', 'references',
                  'preferred_location', 'budget_min', 'budget_max')
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    
+    token_class = RevocableRefreshToken
@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .authentication import bump_user_version
+from .models import User
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    # Token issue only touches last_login; anything else (profile edits,
+    # password changes, deactivation) must reach authenticated requests.
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    bump_user_version(instance.id)
@@ -1,3 +1,272 @@
-from django.test import TestCase
+import asyncio
+import io
+import shutil
+import tempfile
+import time
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth.hashers import make_password
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from rentify.metrics import RATE_LIMIT_REJECTIONS
+from rentify.throttling import get_bucket_store
+from .hashing import run_hashing
+from .models import User, RenterProfile, RevokedToken
+from .revocation import BloomFilter, InMemoryRevocationStore, get_revocation_store
 
-# Create your tests here.
+
+class CachedAuthenticationTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='renter@example.com', username='renter', password='old-password-123',
+            first_name='Renter', last_name='Test', role='renter',
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def test_repeat_requests_skip_the_user_query(self):
+        with self.assertNumQueries(1):
+            self.client.get(reverse('user_profile'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('user_profile'))
+        self.assertEqual(response.data['email'], 'renter@example.com')
+
+    def test_profile_update_is_visible_on_the_next_request(self):
+        self.client.get(reverse('user_profile'))
+        self.client.patch(reverse('user_update'), {'first_name': 'Renamed'}, format='multipart')
+        self.assertEqual(self.client.get(reverse('user_profile')).data['first_name'], 'Renamed')
+
+    def test_password_change_and_deactivation_reach_cached_sessions(self):
+        self.client.get(reverse('user_profile'))
+        for old, new in [('old-password-123', 'new-password-456'), ('new-password-456', 'newer-password-789')]:
+            # The second change only validates if request.user carries the new hash.
+            response = self.client.post(reverse('password_change'), {
+                'old_password': old, 'new_password': new, 'new_password_confirm': new,
+            })
+            self.assertEqual(response.status_code, 200)
+
+        user = User.objects.get(id=self.user.id)
+        user.is_active = False
+        user.save()
+        self.assertEqual(self.client.get(reverse('user_profile')).status_code, 401)
+
+    @override_settings(AUTH_USER_CACHE_ENABLED=False)
+    def test_disabled_cache_reads_the_user_every_request(self):
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                self.client.get(reverse('user_profile'))
+
+    def test_last_login_updates_keep_the_cached_user(self):
+        self.client.get(reverse('user_profile'))
+        user = User.objects.get(id=self.user.id)
+        user.save(update_fields=['last_login'])
+        with self.assertNumQueries(0):
+            self.client.get(reverse('user_profile'))
+
+
+class TokenRevocationTests(APITestCase):
+    
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='renter@example.com', username='renter', password='password-123',
+            first_name='Renter', last_name='Test', role='renter',
+        )
+        self.refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.refresh.access_token}')
+        get_revocation_store.cache_clear()
+        self.addCleanup(get_revocation_store.cache_clear)
+    
+    def test_logout_revokes_the_refresh_token(self):
+        response = self.client.post(reverse('user_logout'), {'refresh': str(self.refresh)})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post(reverse('token_refresh'), {'refresh': str(self.refresh)})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.client.post(reverse('user_logout'), {'refresh': 'garbage'}).status_code, 400)
+    
+    def test_rotated_refresh_tokens_cannot_be_replayed(self):
+        response = self.client.post(reverse('token_refresh'), {'refresh': str(self.refresh)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.post(reverse('token_refresh'), {'refresh': str(self.refresh)}).status_code, 401)
+        self.assertEqual(self.client.post(reverse('token_refresh'), {'refresh': response.data['refresh']}).status_code, 200)
+    
+    def test_store_forgets_entries_once_their_token_has_expired(self):
+        store = InMemoryRevocationStore()
+        store.revoke('expired', 1)
+        store.revoke('live', 2 ** 40)
+        self.assertTrue(store.is_revoked('live'))
+        self.assertFalse(store.is_revoked('expired'))
+        self.assertEqual(list(store._revoked), ['live'])
+    
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f'revoked-{i}')
+        self.assertTrue(all(f'revoked-{i}' in bloom for i in range(1000)))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+@override_settings(TOKEN_REVOCATION_STORE={'BACKEND': 'accounts.revocation.DatabaseRevocationStore'})
+class DatabaseTokenRevocationTests(TokenRevocationTests):
+    
+    # The default without Redis outside DEBUG: the same checks against rows
+    # every worker reads.
+    
+    def test_revocations_are_rows_every_worker_sees(self):
+        self.client.post(reverse('user_logout'), {'refresh': str(self.refresh)})
+        get_revocation_store.cache_clear()
+        self.assertTrue(get_revocation_store().is_revoked(self.refresh['jti']))
+        self.assertFalse(get_revocation_store().is_revoked(RefreshToken.for_user(self.user)['jti']))
+    
+    def test_store_forgets_entries_once_their_token_has_expired(self):
+        store = get_revocation_store()
+        store.revoke('expired', 1)
+        store.revoke('live', time.time() + 3600)
+        self.assertTrue(store.is_revoked('live'))
+        self.assertFalse(store.is_revoked('expired'))
+        store.revoke('later', time.time() + 3600)
+        self.assertEqual(sorted(RevokedToken.objects.values_list('jti', flat=True)), ['later', 'live'])
+
+
+@override_settings(RATE_LIMITS={'login': {'ip': '3/minute', 'account': '2/minute'}})
+class LoginRateLimitTests(APITestCase):
+    
+    def setUp(self):
+        get_bucket_store.cache_clear()
+    
+    def login(self, email):
+        return self.client.post(reverse('user_login'), {'email': email, 'password': 'wrong-password'})
+    
+    def test_account_and_ip_buckets_refuse_before_any_work(self):
+        before = RATE_LIMIT_REJECTIONS.value(scope='login', bucket='account')
+        self.assertEqual([self.login('Target@example.com').status_code for _ in range(2)], [400, 400])
+        with self.assertLogs('rentify.throttling', 'WARNING') as logs:
+            with self.assertNumQueries(0):
+                response = self.login('target@example.com ')
+            self.assertEqual(response.status_code, 429)
+            self.assertIn('Retry-After', response)
+            self.assertEqual(RATE_LIMIT_REJECTIONS.value(scope='login', bucket='account'), before + 1)
+            
+            # The rejected attempt still drew from this IP's bucket.
+            self.assertEqual(self.login('other@example.com').status_code, 429)
+        self.assertIn('login/account exceeded', logs.output[0])
+    
+    def test_non_object_bodies_are_rejected_not_crashed_on(self):
+        for body in (['target@example.com'], 'target@example.com'):
+            response = self.client.post(reverse('user_login'), body, format='json')
+            self.assertEqual(response.status_code, 400)
+
+
+class AsyncCredentialViewTests(APITestCase):
+    
+    def setUp(self):
+        get_bucket_store.cache_clear()
+    
+    def register(self):
+        return self.client.post(reverse('user_register'), {
+            'email': 'New@Example.com', 'username': 'newrenter', 'first_name': 'New', 'last_name': 'Renter',
+            'role': 'renter', 'password': 'a-long-password-1', 'password_confirm': 'a-long-password-1',
+        }, format='json')
+    
+    def test_register_then_login(self):
+        response = self.register()
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('access', response.json()['tokens'])
+        user = User.objects.get(username='newrenter')
+        self.assertEqual(user.email, 'New@example.com')
+        self.assertTrue(user.check_password('a-long-password-1'))
+        self.assertTrue(RenterProfile.objects.filter(user=user).exists())
+        
+        response = self.client.post(reverse('user_login'), {'email': 'New@example.com', 'password': 'a-long-password-1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['user']['username'], 'newrenter')
+        
+        response = self.client.post(reverse('user_login'), {'email': 'New@example.com', 'password': 'wrong'})
+        self.assertEqual(response.json(), {'non_field_errors': ['Invalid credentials']})
+        self.assertEqual(self.register().status_code, 400)
+    
+    def test_login_upgrades_an_outdated_password_hash(self):
+        self.register()
+        user = User.objects.get(username='newrenter')
+        user.password = make_password('a-long-password-1', hasher='pbkdf2_sha1')
+        user.save(update_fields=['password'])
+        
+        response = self.client.post(reverse('user_login'), {'email': 'New@example.com', 'password': 'a-long-password-1'})
+        self.assertEqual(response.status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$'))
+        self.assertTrue(user.check_password('a-long-password-1'))
+    
+    def test_unauthenticated_password_change_is_a_401_with_a_challenge(self):
+        response = self.client.post(reverse('password_change'), {})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer realm="api"')
+    
+    @override_settings(PASSWORD_HASHING_MAX_PENDING=0)
+    def test_full_hashing_queue_sheds_load(self):
+        response = self.client.post(reverse('user_login'), {'email': 'a@example.com', 'password': 'secret'})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+    
+    async def test_hashing_does_not_block_the_event_loop(self):
+        started = time.monotonic()
+        hashing = asyncio.ensure_future(run_hashing(time.sleep, 0.3))
+        await asyncio.sleep(0.01)
+        self.assertLess(time.monotonic() - started, 0.2)
+        await hashing
+
+
+class AvatarVariantTests(APITestCase):
+    
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media_settings = override_settings(MEDIA_ROOT=self.media_root, AVATAR_VARIANTS_EAGER=True)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        
+        self.user = User.objects.create_user(
+            email='renter@example.com', username='renter', password=None,
+            first_name='Renter', last_name='Test', role='renter',
+        )
+        self.client.force_authenticate(self.user)
+    
+    def upload(self, name='portrait.png'):
+        buffer = io.BytesIO()
+        Image.new('RGB', (640, 480), 'teal').save(buffer, 'PNG')
+        picture = SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse('profile_image_upload'), {'profile_picture': picture})
+    
+    def test_upload_renders_variants_after_the_response_data(self):
+        response = self.upload()
+        # Rendering runs after commit, so the upload response has none yet.
+        self.assertIsNone(response.data['user']['avatar'])
+        
+        user = User.objects.get(id=self.user.id)
+        self.assertEqual(sorted(user.avatar_variants, key=int), ['48', '96', '256'])
+        with user.profile_picture.storage.open(user.avatar_variants['96']) as variant, Image.open(variant) as image:
+            self.assertEqual((image.format, image.size), ('WEBP', (96, 96)))
+        
+        self.client.force_authenticate(user)
+        avatar = self.client.get(reverse('user_profile')).data['avatar']
+        self.assertTrue(avatar['48'].endswith('.webp'))
+    
+    def test_replacing_and_deleting_clean_up_old_variants(self):
+        self.upload('first.png')
+        first = User.objects.get(id=self.user.id)
+        storage = first.profile_picture.storage
+        self.client.force_authenticate(first)
+        self.upload('second.png')
+        self.assertFalse(any(storage.exists(path) for path in first.avatar_variants.values()))
+        
+        second = User.objects.get(id=self.user.id)
+        self.client.force_authenticate(second)
+        response = self.client.delete(reverse('delete_profile_image'))
+        self.assertIsNone(response.data['user']['avatar'])
+        self.assertFalse(any(storage.exists(path) for path in second.avatar_variants.values()))
+        self.assertEqual(User.objects.get(id=self.user.id).avatar_variants, {})
@@ -0,0 +1,18 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from .revocation import get_revocation_store
+
+
+class RevocableRefreshToken(RefreshToken):
+    
+    # Same interface as the token_blacklist app's mixin, so simplejwt's
+    # BLACKLIST_AFTER_ROTATION handling revokes through the store as well.
+    def verify(self, *args, **kwargs):
+        if get_revocation_store().is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+        super().verify(*args, **kwargs)
+    
+    def blacklist(self):
+        get_revocation_store().revoke(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
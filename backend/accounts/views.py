@@ -1,11 +1,24 @@
+from asgiref.sync import sync_to_async
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.views import APIView
-from django.contrib.auth import login
+from django.contrib.auth import alogin
+from django.contrib.auth.hashers import check_password, make_password
+from django.db import transaction
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rentify.async_api import begin_async_request
+from rentify.db_router import stick_to_primary
+from rentify.throttling import LoginRateThrottle, RegistrationRateThrottle
+from .avatars import clear_avatar_variants, schedule_avatar_variants
+from .hashing import HashingBusy, run_hashing
 from .models import User, HomeownerProfile, RenterProfile
+from .tokens import RevocableRefreshToken
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, UserSerializer, 
     UserUpdateSerializer, PasswordChangeSerializer,
@@ -14,53 +27,103 @@ from .serializers import (
 )
 
 
-class UserRegistrationView(generics.CreateAPIView):
-    
-    queryset = User.objects.all()
-    serializer_class = UserRegistrationSerializer
-    permission_classes = [permissions.AllowAny]
-    
-    def create(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        user = serializer.save()
-        
+def _hashing_busy_response():
+    response = JsonResponse({'error': 'Too many sign-in requests, please retry shortly'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    response['Retry-After'] = '1'
+    return response
+
+
+def _auth_response(user, status_code):
+    refresh = RefreshToken.for_user(user)
+    return JsonResponse({
+        'user': UserSerializer(user).data,
+        'tokens': {
+            'refresh': str(refresh),
+            'access': str(refresh.access_token),
+        }
+    }, status=status_code)
+
+
+def _create_account(serializer, password_hash):
+    with transaction.atomic():
+        user = serializer.save(password_hash=password_hash)
         if user.role == 'homeowner':
             HomeownerProfile.objects.create(user=user)
         elif user.role == 'renter':
             RenterProfile.objects.create(user=user)
-        
-        refresh = RefreshToken.for_user(user)
-        
-        return Response({
-            'user': UserSerializer(user).data,
-            'tokens': {
-                'refresh': str(refresh),
-                'access': str(refresh.access_token),
-            }
-        }, status=status.HTTP_201_CREATED)
+    return user
+
+
+# Login, registration and password changes are async views so PBKDF2 runs on
+# the bounded pool in accounts.hashing rather than on the request worker
+# (under ASGI that is the one thread every sync view shares).
+
+async def _verify_password(user, password):
+    # Like user.check_password(): a hash made with an older hasher or fewer
+    # iterations is replaced after a successful check. The re-hash is best
+    # effort; a full pool leaves it for the next sign-in.
+    outdated = []
+    valid = await run_hashing(check_password, password, user.password, outdated.append)
+    if valid and outdated:
+        try:
+            user.password = await run_hashing(make_password, password)
+        except HashingBusy:
+            return valid
+        await user.asave(update_fields=['password'])
+    return valid
 
 
-class UserLoginView(APIView):
+@csrf_exempt
+@require_POST
+async def user_registration_view(request):
+    drf_request, refused = await sync_to_async(begin_async_request)(request, [RegistrationRateThrottle()])
+    if refused:
+        return refused
     
-    permission_classes = [permissions.AllowAny]
+    serializer = UserRegistrationSerializer(data=drf_request.data)
+    if not await sync_to_async(serializer.is_valid)():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    def post(self, request):
-        serializer = UserLoginSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        
-        user = serializer.validated_data['user']
-        login(request, user)
-        
-        refresh = RefreshToken.for_user(user)
-        
-        return Response({
-            'user': UserSerializer(user).data,
-            'tokens': {
-                'refresh': str(refresh),
-                'access': str(refresh.access_token),
-            }
-        }, status=status.HTTP_200_OK)
+    try:
+        password_hash = await run_hashing(make_password, serializer.validated_data['password'])
+    except HashingBusy:
+        return _hashing_busy_response()
+    
+    user = await sync_to_async(_create_account)(serializer, password_hash)
+    # The request was anonymous; the next one carries the new user's token.
+    await sync_to_async(stick_to_primary)(user.id)
+    return _auth_response(user, status.HTTP_201_CREATED)
+
+
+@csrf_exempt
+@require_POST
+async def user_login_view(request):
+    drf_request, refused = await sync_to_async(begin_async_request)(request, [LoginRateThrottle()])
+    if refused:
+        return refused
+    
+    serializer = UserLoginSerializer(data=drf_request.data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    email, password = serializer.validated_data['email'], serializer.validated_data['password']
+    
+    user = await User.objects.filter(email=email).afirst()
+    try:
+        if user is None:
+            # Hash anyway so response time does not reveal which emails exist.
+            await run_hashing(make_password, password)
+            valid = False
+        else:
+            valid = await _verify_password(user, password)
+    except HashingBusy:
+        return _hashing_busy_response()
+    
+    if not (valid and user.is_active):
+        return JsonResponse({'non_field_errors': ['Invalid credentials']}, status=status.HTTP_400_BAD_REQUEST)
+    
+    await alogin(request, user)
+    await sync_to_async(stick_to_primary)(user.id)
+    return _auth_response(user, status.HTTP_200_OK)
 
 
 class UserProfileView(generics.RetrieveUpdateAPIView):
@@ -81,6 +144,14 @@ class UserUpdateView(generics.UpdateAPIView):
     def get_object(self):
         return self.request.user
     
+    def perform_update(self, serializer):
+        new_picture = 'profile_picture' in serializer.validated_data
+        if new_picture:
+            clear_avatar_variants(serializer.instance)
+        user = serializer.save()
+        if new_picture:
+            schedule_avatar_variants(user)
+    
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
         instance = self.get_object()
@@ -99,19 +170,27 @@ class UserUpdateView(generics.UpdateAPIView):
         return Response(user_serializer.data)
 
 
-class PasswordChangeView(APIView):
+@csrf_exempt
+@require_POST
+async def password_change_view(request):
+    drf_request, refused = await sync_to_async(begin_async_request)(request, [], authenticate=True)
+    if refused:
+        return refused
     
-    permission_classes = [permissions.IsAuthenticated]
+    serializer = PasswordChangeSerializer(data=drf_request.data, context={'request': drf_request})
+    if not await sync_to_async(serializer.is_valid)():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    def post(self, request):
-        serializer = PasswordChangeSerializer(data=request.data, context={'request': request})
-        serializer.is_valid(raise_exception=True)
-        
-        user = request.user
-        user.set_password(serializer.validated_data['new_password'])
-        user.save()
-        
-        return Response({'message': 'Password changed successfully'}, status=status.HTTP_200_OK)
+    user = drf_request.user
+    try:
+        if not await _verify_password(user, serializer.validated_data['old_password']):
+            return JsonResponse({'old_password': ['Old password is incorrect']}, status=status.HTTP_400_BAD_REQUEST)
+        user.password = await run_hashing(make_password, serializer.validated_data['new_password'])
+    except HashingBusy:
+        return _hashing_busy_response()
+    
+    await user.asave(update_fields=['password'])
+    return JsonResponse({'message': 'Password changed successfully'}, status=status.HTTP_200_OK)
 
 
 class HomeownerProfileView(generics.RetrieveUpdateAPIView):
@@ -153,10 +232,10 @@ class RenterProfileView(generics.RetrieveUpdateAPIView):
 def logout_view(request):
     try:
         refresh_token = request.data["refresh"]
-        token = RefreshToken(refresh_token)
+        token = RevocableRefreshToken(refresh_token)
         token.blacklist()
         return Response({'message': 'Logout successful'}, status=status.HTTP_200_OK)
-    except Exception as e:
+    except (KeyError, TokenError):
         return Response({'error': 'Invalid token'}, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -170,8 +249,10 @@ class ProfileImageUploadView(APIView):
             return Response({'error': 'No image file provided'}, status=status.HTTP_400_BAD_REQUEST)
         
         user = request.user
+        clear_avatar_variants(user)
         user.profile_picture = request.FILES['profile_picture']
         user.save()
+        schedule_avatar_variants(user)
         
         serializer = UserSerializer(user, context={'request': request})
         return Response({
@@ -186,6 +267,7 @@ def delete_profile_image_view(request):
     
     user = request.user
     if user.profile_picture:
+        clear_avatar_variants(user)
         user.profile_picture.delete()
         user.profile_picture = None
         user.save()
@@ -0,0 +1,86 @@
+from django.http import Http404
+from properties.models import Property
+from .models import RentalApplication
+
+
+def visible_applications(user, model=RentalApplication):
+    # Row-level scope shared by the application list and detail endpoints.
+    if user.role == 'homeowner':
+        return model.objects.filter(property__owner=user)
+    if user.role == 'renter':
+        return model.objects.filter(applicant=user)
+    return model.objects.all()
+
+
+def reviewable_applications(user, model=RentalApplication):
+    if user.role == 'homeowner':
+        return model.objects.filter(property__owner=user)
+    if user.role == 'admin':
+        return model.objects.all()
+    return model.objects.none()
+
+
+class ApplicationAccess:
+    
+    def __init__(self, application, user):
+        self.application = application
+        self.user = user
+    
+    @property
+    def is_applicant(self):
+        return self.user.id == self.application.applicant_id
+    
+    @property
+    def is_owner(self):
+        return self.user.id == self.application.property.owner_id
+    
+    def can_view(self):
+        return self.is_applicant or self.is_owner or self.user.role == 'admin'
+    
+    def can_message(self):
+        return self.is_applicant or self.is_owner
+    
+    def can_upload(self):
+        return self.is_applicant
+
+
+class PropertyAccess:
+    
+    def __init__(self, property_obj, user):
+        self.property = property_obj
+        self.user = user
+    
+    def can_manage(self):
+        return self.user.id == self.property.owner_id or self.user.role == 'admin'
+
+
+def _request_cache(request):
+    # Kept on the HttpRequest so the DRF Request wrapper, the view and its
+    # serializers all see the same lookups.
+    request = getattr(request, '_request', request)
+    if not hasattr(request, '_access_cache'):
+        request._access_cache = {}
+    return request._access_cache
+
+
+def application_access(request, application_id, model=RentalApplication):
+    # One joined query per application per request, however many checks run.
+    cache = _request_cache(request)
+    key = (model, int(application_id))
+    if key not in cache:
+        application = model.objects.select_related('property').filter(id=application_id).first()
+        cache[key] = application and ApplicationAccess(application, request.user)
+    if cache[key] is None:
+        raise Http404('No application matches the given query.')
+    return cache[key]
+
+
+def property_access(request, property_id):
+    cache = _request_cache(request)
+    key = (Property, int(property_id))
+    if key not in cache:
+        property_obj = Property.objects.filter(id=property_id).first()
+        cache[key] = property_obj and PropertyAccess(property_obj, request.user)
+    if cache[key] is None:
+        raise Http404('No property matches the given query.')
+    return cache[key]
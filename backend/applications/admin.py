@@ -1,3 +1,39 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.utils import timezone
+from rentify.admin_tools import LargeTableAdmin
+from .cache import invalidate_dashboard_summary
+from .models import RentalApplication
 
-# Register your models here.
+
+def _review(modeladmin, request, queryset, status):
+    # One UPDATE for the whole selection, like bulk_review_view;
+    # withdrawn applications are left alone.
+    queryset = queryset.exclude(status='withdrawn')
+    user_ids = list(queryset.values_list('applicant_id', 'property__owner_id'))
+    updated = queryset.update(status=status, reviewed_by=request.user, reviewed_at=timezone.now())
+    # update() skips the post_save handlers in signals.py.
+    invalidate_dashboard_summary(*(user_id for pair in user_ids for user_id in pair))
+    modeladmin.message_user(request, f'{updated} applications {status}.', messages.SUCCESS)
+
+
+@admin.action(description='Approve selected applications')
+def approve_applications(modeladmin, request, queryset):
+    _review(modeladmin, request, queryset, 'approved')
+
+
+@admin.action(description='Reject selected applications')
+def reject_applications(modeladmin, request, queryset):
+    _review(modeladmin, request, queryset, 'rejected')
+
+
+@admin.register(RentalApplication)
+class RentalApplicationAdmin(LargeTableAdmin):
+    
+    list_display = ('__str__', 'status', 'screening_score', 'submitted_at')
+    list_filter = ('status',)
+    # __str__ reads both the applicant and the property.
+    list_select_related = ('applicant', 'property')
+    actions = (approve_applications, reject_applications)
+    raw_id_fields = ('applicant', 'reviewed_by')
+    autocomplete_fields = ('property',)
+    search_fields = ('^property__title',)
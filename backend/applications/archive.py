@@ -0,0 +1,83 @@
+from django.db import transaction
+from .models import (
+    RentalApplication, ApplicationDocument, ApplicationMessage,
+    ArchivedApplication, ArchivedApplicationDocument, ArchivedApplicationMessage
+)
+
+
+CLOSED_STATUSES = ('approved', 'rejected', 'withdrawn')
+
+# RentalApplication fields stored as ArchivedApplication columns; every other
+# concrete field goes into ArchivedApplication.data.
+ARCHIVE_COLUMNS = (
+    'id', 'property_id', 'applicant_id', 'status', 'move_in_date', 'lease_duration_months',
+    'screening_score', 'submitted_at', 'reviewed_at', 'reviewed_by_id',
+)
+ARCHIVE_DATA_FIELDS = tuple(
+    field.attname for field in RentalApplication._meta.concrete_fields if field.attname not in ARCHIVE_COLUMNS
+)
+
+
+def archivable_applications(cutoff):
+    # Closed, and nothing has happened on the application since the cutoff.
+    return RentalApplication.objects.filter(
+        status__in=CLOSED_STATUSES, submitted_at__lt=cutoff
+    ).exclude(reviewed_at__gte=cutoff).exclude(messages__created_at__gte=cutoff)
+
+
+def _delete_document_files(file_names):
+    storage = ApplicationDocument._meta.get_field('file').storage
+    for name in file_names:
+        storage.delete(name)
+
+
+def archive_batch(application_ids):
+    with transaction.atomic():
+        applications = list(
+            RentalApplication.objects.select_for_update().filter(id__in=application_ids, status__in=CLOSED_STATUSES)
+        )
+        application_ids = [application.id for application in applications]
+        if not application_ids:
+            return 0
+        
+        ArchivedApplication.objects.bulk_create([
+            ArchivedApplication(
+                **{column: getattr(application, column) for column in ARCHIVE_COLUMNS},
+                data={field: getattr(application, field) for field in ARCHIVE_DATA_FIELDS},
+            )
+            for application in applications
+        ])
+        ArchivedApplicationMessage.objects.bulk_create((
+            ArchivedApplicationMessage(
+                id=message.id, application_id=message.application_id, sender_id=message.sender_id,
+                message=message.message, is_from_owner=message.is_from_owner, created_at=message.created_at,
+            )
+            for message in ApplicationMessage.objects.filter(application_id__in=application_ids).iterator()
+        ), batch_size=1000)
+        documents = list(ApplicationDocument.objects.filter(application_id__in=application_ids))
+        ArchivedApplicationDocument.objects.bulk_create((
+            ArchivedApplicationDocument(
+                id=document.id, application_id=document.application_id, document_type=document.document_type,
+                file_name=document.file.name, description=document.description, uploaded_at=document.uploaded_at,
+            )
+            for document in documents
+        ), batch_size=1000)
+        
+        # Cascades to the hot messages, documents and read cursors.
+        RentalApplication.objects.filter(id__in=application_ids).delete()
+        # Nothing serves an archived document, so the stored file goes too;
+        # only once the rows are gone for good.
+        file_names = [document.file.name for document in documents if document.file]
+        transaction.on_commit(lambda: _delete_document_files(file_names))
+    
+    return len(application_ids)
+
+
+def archive_closed_applications(cutoff, batch_size=500):
+    total = 0
+    while True:
+        application_ids = list(archivable_applications(cutoff).values_list('id', flat=True)[:batch_size])
+        archived = archive_batch(application_ids) if application_ids else 0
+        if not archived:
+            return total
+        total += archived
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.cache import cache
+
+
+DASHBOARD_CACHE_KEY = 'dashboard_summary:{user_id}'
+
+
+def dashboard_cache_key(user_id):
+    return DASHBOARD_CACHE_KEY.format(user_id=user_id)
+
+
+def get_dashboard_summary(user_id):
+    return cache.get(dashboard_cache_key(user_id))
+
+
+def set_dashboard_summary(user_id, data):
+    cache.set(dashboard_cache_key(user_id), data, settings.DASHBOARD_CACHE_TIMEOUT)
+
+
+def invalidate_dashboard_summary(*user_ids):
+    keys = [dashboard_cache_key(user_id) for user_id in set(user_ids) if user_id]
+    if keys:
+        cache.delete_many(keys)
@@ -0,0 +1,26 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from applications.archive import archivable_applications, archive_closed_applications
+
+
+class Command(BaseCommand):
+    help = 'Move closed applications, their messages and document metadata into the archive tables.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=settings.APPLICATION_ARCHIVE_AFTER_DAYS,
+                            help='Archive applications with no activity for this many days.')
+        parser.add_argument('--batch-size', type=int, default=settings.APPLICATION_ARCHIVE_BATCH_SIZE,
+                            help='Applications moved per transaction.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many would be archived.')
+    
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+        if options['dry_run']:
+            count = archivable_applications(cutoff).count()
+            self.stdout.write(f'{count} applications would be archived')
+            return
+        
+        total = archive_closed_applications(cutoff, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {total} applications'))
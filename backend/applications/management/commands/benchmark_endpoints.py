@@ -0,0 +1,140 @@
+import json
+import random
+import subprocess
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from accounts.models import User
+from applications.models import ApplicationMessage, RentalApplication
+from properties.models import Property
+from rentify.benchmarking import run_threaded
+
+SEARCHES = [
+    {'search': 'apartment'}, {'city': 'Addis Ababa'}, {'city': 'Adama', 'min_bedrooms': 2},
+    {'min_price': 10000, 'max_price': 30000}, {'property_type': 'house', 'has_parking': 'true'},
+    {'furnishing': 'furnished', 'ordering': 'monthly_rent'},
+]
+METRICS = ('requests_per_second', 'p50_ms', 'p95_ms', 'p99_ms')
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the main read endpoints of a running server over HTTP and report '
+        'p50/p95/p99 latency and requests per second per endpoint as a JSON '
+        'baseline. The server must use this database (see seed_benchmark_data) '
+        'and SECRET_KEY, and rate limits loose enough not to answer 429.'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://localhost:8000', help='Root URL of the server under test.')
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent client threads.')
+        parser.add_argument('--requests', type=int, default=200, help='Measured requests per endpoint.')
+        parser.add_argument('--warmup', type=int, default=10, help='Unmeasured requests per endpoint first.')
+        parser.add_argument('--endpoints', help='Comma-separated subset of the endpoint names.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Also write the JSON result to this file.')
+        parser.add_argument('--compare', help='A previous result file; adds the percentage change per metric.')
+    
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        endpoints = self.endpoints()
+        if options['endpoints']:
+            selected = [name.strip() for name in options['endpoints'].split(',') if name.strip()]
+            unknown = set(selected) - set(endpoints)
+            if unknown:
+                raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+            endpoints = {name: endpoints[name] for name in selected}
+        
+        import httpx
+        
+        results = {}
+        for name, (paths, headers) in endpoints.items():
+            
+            def fetch(client, index, paths=paths, headers=headers):
+                try:
+                    return client.get(paths[index % len(paths)], headers=headers).status_code
+                except httpx.HTTPError:
+                    return 599
+            
+            # One keep-alive connection per client thread, like a browser.
+            make_client = lambda: httpx.Client(base_url=options['base_url'], timeout=30)
+            if options['warmup']:
+                run_threaded(make_client, fetch, options['workers'], options['warmup'])
+            results[name] = run_threaded(make_client, fetch, options['workers'], options['requests'])
+        
+        report = {
+            'commit': self.commit(),
+            'base_url': options['base_url'],
+            'database': connection.vendor,
+            'rows': {
+                model._meta.label: model.objects.count()
+                for model in (User, Property, RentalApplication, ApplicationMessage)
+            },
+            'workers': options['workers'],
+            'requests': options['requests'],
+            'endpoints': results,
+        }
+        if options['compare']:
+            with open(options['compare']) as baseline_file:
+                report['change_percent'] = self.compare(results, json.load(baseline_file)['endpoints'])
+        
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(output + '\n')
+        self.stdout.write(output)
+    
+    def endpoints(self):
+        # name -> (paths to rotate through, request headers)
+        property_ids = list(Property.objects.filter(is_approved=True).order_by('?').values_list('id', flat=True)[:100])
+        owner = User.objects.filter(role='homeowner').annotate(
+            application_count=Count('properties__applications')
+        ).order_by('-application_count').first()
+        if not property_ids or owner is None:
+            raise CommandError('Not enough data to benchmark; run seed_benchmark_data first.')
+        application_ids = list(
+            RentalApplication.objects.filter(property__owner=owner).values_list('id', flat=True)[:100]
+        ) or [0]
+        owner_headers = {'Authorization': f'Bearer {AccessToken.for_user(owner)}'}
+        list_url = reverse('property_list')
+        
+        def with_query(url, query):
+            return f'{url}?{urlencode(query)}'
+        
+        return {
+            'property_list': ([with_query(list_url, {'page': page}) for page in range(1, 6)], {}),
+            'property_search': ([with_query(reverse('property_search'), query) for query in SEARCHES], {}),
+            'property_detail': ([reverse('property_detail', args=[pk]) for pk in property_ids], {}),
+            'property_stats': ([reverse('property_stats')], {}),
+            'application_list': ([reverse('application_list')], owner_headers),
+            'application_inbox': ([reverse('application_inbox')], owner_headers),
+            'application_detail': ([reverse('application_detail', args=[pk]) for pk in application_ids], owner_headers),
+            'application_messages': (
+                [reverse('application_messages', args=[pk]) for pk in application_ids], owner_headers
+            ),
+            'dashboard_summary': ([reverse('dashboard_summary')], owner_headers),
+        }
+    
+    def commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, cwd=settings.BASE_DIR, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    
+    def compare(self, results, baseline):
+        changes = {}
+        for name, result in results.items():
+            before = baseline.get(name)
+            if not before:
+                continue
+            changes[name] = {
+                metric: round((result[metric] - before[metric]) / before[metric] * 100, 1)
+                for metric in METRICS if result.get(metric) is not None and before.get(metric)
+            }
+        return changes
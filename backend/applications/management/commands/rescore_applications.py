@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from applications.models import RentalApplication
+from applications.scoring import rescore_applications
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored screening scores, one vectorised batch per property.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--property', type=int, action='append', dest='properties',
+                            help='Only rescore applications for this property id (repeatable).')
+    
+    def handle(self, *args, **options):
+        property_ids = options['properties'] or (
+            RentalApplication.objects.order_by().values_list('property_id', flat=True).distinct()
+        )
+        total = 0
+        for property_id in property_ids:
+            total += len(rescore_applications(RentalApplication.objects.filter(property_id=property_id)))
+        self.stdout.write(self.style.SUCCESS(f'Rescored {total} applications'))
@@ -0,0 +1,215 @@
+import json
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from accounts.models import HomeownerProfile, RenterProfile, User
+from applications.models import ApplicationMessage, ApplicationReadCursor, RentalApplication
+from applications.scoring import rescore_applications
+from properties.models import Property, PropertyAmenity, PropertyImage
+
+# (city, region, latitude, longitude)
+CITIES = [
+    ('Addis Ababa', 'Addis Ababa', 9.0300, 38.7400),
+    ('Adama', 'Oromia', 8.5400, 39.2700),
+    ('Bahir Dar', 'Amhara', 11.5900, 37.3900),
+    ('Hawassa', 'Sidama', 7.0600, 38.4800),
+    ('Mekelle', 'Tigray', 13.4970, 39.4750),
+    ('Dire Dawa', 'Dire Dawa', 9.5900, 41.8600),
+    ('Gondar', 'Amhara', 12.6000, 37.4700),
+    ('Jimma', 'Oromia', 7.6700, 36.8300),
+]
+STREETS = ['Bole Road', 'Churchill Avenue', 'Africa Avenue', 'Haile Gebreselassie Road', 'Ras Desta Damtew Street', 'Cameroon Street']
+AMENITIES = ['Wi-Fi', 'Backup generator', 'Water tank', 'Security guard', 'CCTV', 'Laundry room', 'Playground', 'Rooftop terrace']
+FEATURES = [
+    'has_parking', 'has_balcony', 'has_garden', 'has_pool', 'has_gym', 'has_elevator',
+    'has_air_conditioning', 'has_heating', 'has_washer_dryer', 'pet_friendly', 'utilities_included',
+]
+MESSAGES = [
+    'Is the apartment still available?', 'Can I schedule a viewing this weekend?',
+    'Are utilities included in the rent?', 'Thanks, I have uploaded my pay stubs.',
+    'The viewing is confirmed for Saturday at 10am.', 'Please send your employment letter.',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate synthetic owners, renters, properties (with coordinates, images and amenities), '
+        'applications and messages with bulk_create, for load tests and query-plan checks.'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--properties', type=int, default=1000)
+        parser.add_argument('--owners', type=int, help='Defaults to one owner per 10 properties.')
+        parser.add_argument('--renters', type=int, help='Defaults to one renter per property.')
+        parser.add_argument('--images-per-property', type=int, default=3)
+        parser.add_argument('--amenities-per-property', type=int, default=4)
+        parser.add_argument('--applications-per-property', type=int, default=3)
+        parser.add_argument('--messages-per-application', type=int, default=4)
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--prefix', default='bench', help='Username/email prefix of the generated users.')
+        parser.add_argument('--clear', action='store_true', help='Delete users with this prefix (and their data) first. Slow on large sets, since deletes send signals per row.')
+    
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.prefix = options['prefix']
+        self.batch_size = options['batch_size']
+        property_count = options['properties']
+        owner_count = options['owners'] or max(1, property_count // 10)
+        renter_count = options['renters'] or max(1, property_count)
+        if options['applications_per_property'] > renter_count:
+            raise CommandError('--applications-per-property cannot exceed --renters (one application per renter and property).')
+        
+        if options['clear']:
+            User.objects.filter(username__startswith=f'{self.prefix}_').delete()
+        elif User.objects.filter(username__startswith=f'{self.prefix}_').exists():
+            raise CommandError(f"Users prefixed '{self.prefix}_' already exist; pass --clear or another --prefix.")
+        
+        started = time.perf_counter()
+        self.counts = {}
+        # One hash for every generated account: hashing per user would dominate the run.
+        self.password = make_password('benchmark-password')
+        owner_ids = self.create_users('homeowner', owner_count)
+        renter_ids = self.create_users('renter', renter_count)
+        
+        for offset in range(0, property_count, self.batch_size):
+            with transaction.atomic():
+                properties = self.create_properties(owner_ids, offset, min(self.batch_size, property_count - offset))
+                self.create_images(properties, options['images_per_property'])
+                self.create_amenities(properties, options['amenities_per_property'])
+                applications = self.create_applications(properties, renter_ids, options['applications_per_property'])
+                self.create_messages(applications, options['messages_per_application'])
+        
+        elapsed = time.perf_counter() - started
+        self.stdout.write(json.dumps({
+            'rows': self.counts,
+            'total_rows': sum(self.counts.values()),
+            'seconds': round(elapsed, 2),
+        }))
+    
+    def bulk_create(self, model, objects):
+        created = model.objects.bulk_create(objects, batch_size=self.batch_size)
+        self.counts[model._meta.label] = self.counts.get(model._meta.label, 0) + len(created)
+        return created
+    
+    def create_users(self, role, count):
+        ids = []
+        for offset in range(0, count, self.batch_size):
+            with transaction.atomic():
+                users = self.bulk_create(User, [
+                    User(
+                        username=f'{self.prefix}_{role}_{index}', email=f'{self.prefix}.{role}.{index}@example.com',
+                        first_name=f'{role.title()}{index}', last_name='Benchmark', role=role,
+                        password=self.password, is_verified=self.random.random() < 0.7,
+                    )
+                    for index in range(offset, min(offset + self.batch_size, count))
+                ])
+                if role == 'homeowner':
+                    self.bulk_create(HomeownerProfile, [HomeownerProfile(user=user) for user in users])
+                else:
+                    # Credit scores feed the screening score; some renters have none on file.
+                    self.bulk_create(RenterProfile, [
+                        RenterProfile(user=user, credit_score=self.random.randrange(450, 820) if self.random.random() < 0.8 else None)
+                        for user in users
+                    ])
+            ids.extend(user.id for user in users)
+        return ids
+    
+    def create_properties(self, owner_ids, offset, count):
+        properties = []
+        for index in range(offset, offset + count):
+            city, region, latitude, longitude = self.random.choice(CITIES)
+            bedrooms = self.random.choice([0, 1, 1, 2, 2, 2, 3, 3, 4, 5])
+            rent = Decimal(self.random.randrange(80, 1200) * 50)
+            property_obj = Property(
+                owner_id=self.random.choice(owner_ids),
+                title=f'{bedrooms or "Studio"} bedroom {self.random.choice(Property.PROPERTY_TYPES)[1].lower()} in {city}',
+                description=f'Listing {index}: bright home near {self.random.choice(STREETS)} with good transport links.',
+                property_type='studio' if bedrooms == 0 else self.random.choice(Property.PROPERTY_TYPES)[0],
+                furnishing=self.random.choice(Property.FURNISHING_CHOICES)[0],
+                address=f'{self.random.randrange(1, 400)} {self.random.choice(STREETS)}',
+                city=city, state=region, zip_code=f'{self.random.randrange(1000, 9999)}',
+                location=f'{city}, {region}',
+                latitude=Decimal(f'{latitude + self.random.uniform(-0.08, 0.08):.6f}'),
+                longitude=Decimal(f'{longitude + self.random.uniform(-0.08, 0.08):.6f}'),
+                bedrooms=bedrooms,
+                bathrooms=Decimal(self.random.choice(['1.0', '1.0', '1.5', '2.0', '2.5', '3.0'])),
+                square_feet=self.random.randrange(300, 3500),
+                monthly_rent=rent, security_deposit=rent * 2,
+                status=self.random.choices(['available', 'rented', 'pending', 'inactive'], [80, 10, 5, 5])[0],
+                is_featured=self.random.random() < 0.05,
+                is_approved=self.random.random() < 0.9,
+                available_from=date.today() + timedelta(days=self.random.randrange(-60, 120)),
+                **{feature: self.random.random() < 0.35 for feature in FEATURES},
+            )
+            properties.append(property_obj)
+        return self.bulk_create(Property, properties)
+    
+    def create_images(self, properties, per_property):
+        self.bulk_create(PropertyImage, [
+            PropertyImage(
+                property_id=property_obj.id, image=f'property_images/{self.prefix}-{property_obj.id}-{order}.jpg',
+                is_primary=order == 0, order=order,
+            )
+            for property_obj in properties for order in range(per_property)
+        ])
+    
+    def create_amenities(self, properties, per_property):
+        self.bulk_create(PropertyAmenity, [
+            PropertyAmenity(property_id=property_obj.id, name=name)
+            for property_obj in properties for name in self.random.sample(AMENITIES, min(per_property, len(AMENITIES)))
+        ])
+    
+    def create_applications(self, properties, renter_ids, per_property):
+        applications = []
+        for property_obj in properties:
+            for applicant_id in self.random.sample(renter_ids, per_property):
+                income = Decimal(self.random.randrange(200, 3000) * 50)
+                applications.append(RentalApplication(
+                    property_id=property_obj.id, applicant_id=applicant_id,
+                    status=self.random.choices(['pending', 'approved', 'rejected', 'withdrawn'], [70, 10, 15, 5])[0],
+                    message='I would like to rent this place.',
+                    move_in_date=property_obj.available_from + timedelta(days=self.random.randrange(0, 45)),
+                    monthly_income=income, employment_status='employed',
+                    has_pets=self.random.random() < 0.2,
+                ))
+        created = self.bulk_create(RentalApplication, applications)
+        # bulk_create skips the signals that score applications; score the
+        # batch the way they would, from the same inputs.
+        rescore_applications(RentalApplication.objects.filter(id__in=[application.id for application in created]))
+        # The owner of each application's property, for the message senders.
+        owners = {property_obj.id: property_obj.owner_id for property_obj in properties}
+        return [(application, owners[application.property_id]) for application in created]
+    
+    def create_messages(self, applications, per_application):
+        messages = self.bulk_create(ApplicationMessage, [
+            ApplicationMessage(
+                application_id=application.id,
+                sender_id=owner_id if index % 2 else application.applicant_id,
+                is_from_owner=bool(index % 2),
+                message=self.random.choice(MESSAGES),
+            )
+            for application, owner_id in applications for index in range(per_application)
+        ])
+        
+        # bulk_create bypasses ApplicationMessageCreateSerializer, which keeps
+        # the read cursors; rebuild them as it would have left them: each
+        # participant has read up to their own last message and has every
+        # later message from the other side unread.
+        cursors = {}
+        participants = {application.id: (application.applicant_id, owner_id) for application, owner_id in applications}
+        for message in messages:
+            for user_id in participants[message.application_id]:
+                cursor = cursors.setdefault((message.application_id, user_id), ApplicationReadCursor(
+                    application_id=message.application_id, user_id=user_id,
+                ))
+                if user_id == message.sender_id:
+                    cursor.last_read_message_id = message.id
+                    cursor.unread_count = 0
+                else:
+                    cursor.unread_count += 1
+        self.bulk_create(ApplicationReadCursor, list(cursors.values()))
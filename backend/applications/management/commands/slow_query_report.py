@@ -0,0 +1,70 @@
+import json
+import math
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+class Command(BaseCommand):
+    help = (
+        'Aggregate the slow-query log (SLOW_QUERY_LOG_FILE) by query fingerprint and '
+        'print the worst offenders by total time as JSON, with the views and filter '
+        'combinations that issued them and the latest sampled EXPLAIN plan.'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help='Defaults to SLOW_QUERY_LOG_FILE.')
+        parser.add_argument('--top', type=int, default=10)
+        parser.add_argument('--hours', type=float, help='Only entries from the last N hours.')
+        parser.add_argument('--view', help='Only queries issued by this URL name.')
+    
+    def handle(self, *args, **options):
+        path = options['file'] or settings.SLOW_QUERY_LOG_FILE
+        since = timezone.now() - timedelta(hours=options['hours']) if options['hours'] else None
+        try:
+            with open(path) as log_file:
+                entries = [json.loads(line) for line in log_file if line.strip()]
+        except FileNotFoundError:
+            raise CommandError(f'No slow-query log at {path}; is SLOW_QUERY_THRESHOLD_MS set?')
+        
+        groups = {}
+        for entry in entries:
+            if since and parse_datetime(entry['time']) < since:
+                continue
+            if options['view'] and entry['view'] != options['view']:
+                continue
+            group = groups.setdefault(entry['fingerprint'], {
+                'fingerprint': entry['fingerprint'], 'sql': entry['sql'], 'durations': [],
+                'views': Counter(), 'filters': Counter(), 'plan': None,
+            })
+            group['durations'].append(entry['duration_ms'])
+            group['views'][entry['view'] or '-'] += 1
+            group['filters'][','.join(entry['filters'])] += 1
+            if entry['plan']:
+                group['plan'] = entry['plan']
+        
+        report = sorted((self.summarize(group) for group in groups.values()), key=lambda row: -row['total_ms'])
+        self.stdout.write(json.dumps({
+            'file': path,
+            'entries': sum(row['count'] for row in report),
+            'fingerprints': len(report),
+            'top': report[:options['top']],
+        }, indent=2))
+    
+    def summarize(self, group):
+        durations = sorted(group['durations'])
+        return {
+            'fingerprint': group['fingerprint'],
+            'count': len(durations),
+            'total_ms': round(sum(durations), 2),
+            'mean_ms': round(sum(durations) / len(durations), 2),
+            'p95_ms': durations[min(math.ceil(len(durations) * 0.95) - 1, len(durations) - 1)],
+            'max_ms': durations[-1],
+            'views': dict(group['views'].most_common(5)),
+            'filters': dict(group['filters'].most_common(5)),
+            'sql': group['sql'],
+            'plan': group['plan'],
+        }
@@ -0,0 +1,113 @@
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+
+ALIAS = 'sqlite_stress'
+
+
+class Command(BaseCommand):
+    help = (
+        'Run a mixed read/write message workload from several threads against a '
+        'scratch SQLite file and report throughput and lock errors as JSON.'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--profile', choices=['default', 'concurrent'], default='concurrent',
+                            help="'concurrent' uses SQLITE_CONCURRENT_OPTIONS, 'default' plain SQLite settings.")
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=5.0)
+        parser.add_argument('--write-ratio', type=float, default=0.3)
+    
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            try:
+                self.register_alias(os.path.join(directory, 'stress.sqlite3'), options['profile'])
+                result = self.run_workload(options['threads'], options['seconds'], options['write_ratio'])
+            finally:
+                connections[ALIAS].close()
+                del connections.settings[ALIAS]
+        
+        result['profile'] = options['profile']
+        self.stdout.write(json.dumps(result))
+    
+    def register_alias(self, path, profile):
+        config = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': path}
+        if profile == 'concurrent':
+            config['OPTIONS'] = dict(settings.SQLITE_CONCURRENT_OPTIONS)
+        connections.settings[ALIAS] = connections.configure_settings({'default': {}, ALIAS: config})[ALIAS]
+        
+        with connections[ALIAS].cursor() as cursor:
+            cursor.execute(
+                'CREATE TABLE message (id INTEGER PRIMARY KEY AUTOINCREMENT, application_id INTEGER NOT NULL, '
+                'body TEXT NOT NULL, created_at REAL NOT NULL)'
+            )
+            cursor.execute('CREATE INDEX message_application_idx ON message (application_id, id)')
+            cursor.executemany(
+                'INSERT INTO message (application_id, body, created_at) VALUES (%s, %s, %s)',
+                [(i % 50, 'seed', time.time()) for i in range(1000)],
+            )
+    
+    def run_workload(self, thread_count, seconds, write_ratio):
+        counts = {'reads': 0, 'writes': 0, 'errors': 0}
+        latencies = []
+        lock = threading.Lock()
+        deadline = time.monotonic() + seconds
+        
+        def worker():
+            local = {'reads': 0, 'writes': 0, 'errors': 0}
+            local_latencies = []
+            connection = connections[ALIAS]
+            try:
+                while time.monotonic() < deadline:
+                    application_id = random.randrange(50)
+                    started = time.perf_counter()
+                    try:
+                        if random.random() < write_ratio:
+                            # Read-then-write like ApplicationMessagesView.perform_create;
+                            # a deferred transaction has to upgrade its lock here.
+                            with transaction.atomic(using=ALIAS), connection.cursor() as cursor:
+                                cursor.execute('SELECT COUNT(*) FROM message WHERE application_id = %s', [application_id])
+                                cursor.execute(
+                                    'INSERT INTO message (application_id, body, created_at) VALUES (%s, %s, %s)',
+                                    [application_id, 'hello', time.time()],
+                                )
+                            local['writes'] += 1
+                        else:
+                            with connection.cursor() as cursor:
+                                cursor.execute(
+                                    'SELECT id, body FROM message WHERE application_id = %s ORDER BY id DESC LIMIT 20',
+                                    [application_id],
+                                )
+                                cursor.fetchall()
+                            local['reads'] += 1
+                        local_latencies.append(time.perf_counter() - started)
+                    except OperationalError:
+                        local['errors'] += 1
+            finally:
+                connection.close()
+                with lock:
+                    for key, value in local.items():
+                        counts[key] += value
+                    latencies.extend(local_latencies)
+        
+        threads = [threading.Thread(target=worker) for _ in range(thread_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        latencies.sort()
+        operations = counts['reads'] + counts['writes']
+        return {
+            'threads': thread_count,
+            'seconds': seconds,
+            **counts,
+            'ops_per_second': round(operations / seconds, 1),
+            'p95_ms': round(latencies[int(len(latencies) * 0.95)] * 1000, 2) if latencies else None,
+        }
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_read_cursors(apps, schema_editor):
+    # Existing threads start fully unread for each participant.
+    RentalApplication = apps.get_model('applications', 'RentalApplication')
+    ApplicationMessage = apps.get_model('applications', 'ApplicationMessage')
+    ApplicationReadCursor = apps.get_model('applications', 'ApplicationReadCursor')
+    applications = RentalApplication.objects.filter(messages__isnull=False).distinct().values(
+        'id', 'applicant_id', 'property__owner_id'
+    )
+    cursors = []
+    for application in applications.iterator():
+        messages = ApplicationMessage.objects.filter(application_id=application['id'])
+        for user_id in {application['applicant_id'], application['property__owner_id']}:
+            cursors.append(ApplicationReadCursor(
+                application_id=application['id'],
+                user_id=user_id,
+                unread_count=messages.exclude(sender_id=user_id).count(),
+            ))
+    ApplicationReadCursor.objects.bulk_create(cursors, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0002_alter_rentalapplication_move_in_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationReadCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_read_message_id', models.PositiveBigIntegerField(default=0)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_cursors', to='applications.rentalapplication')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='application_read_cursors', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'unread_count'], name='read_cursor_user_unread_idx')],
+                'unique_together': {('application', 'user')},
+            },
+        ),
+        migrations.RunPython(backfill_read_cursors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0003_applicationreadcursor'),
+        ('properties', '0002_property_location'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rentalapplication',
+            name='screening_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='rentalapplication',
+            index=models.Index(fields=['property', '-screening_score'], name='application_property_score_idx'),
+        ),
+    ]
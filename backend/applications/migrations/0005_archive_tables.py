@@ -0,0 +1,63 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:03
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0004_rentalapplication_screening_score'),
+        ('properties', '0002_property_location'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedApplication',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('withdrawn', 'Withdrawn')], max_length=20)),
+                ('move_in_date', models.DateField(blank=True, null=True)),
+                ('lease_duration_months', models.PositiveIntegerField(default=12)),
+                ('screening_score', models.FloatField(blank=True, null=True)),
+                ('data', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('submitted_at', models.DateTimeField()),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('applicant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_rental_applications', to=settings.AUTH_USER_MODEL)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_applications', to='properties.property')),
+                ('reviewed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reviewed_archived_applications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-submitted_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedApplicationDocument',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('document_type', models.CharField(choices=[('id', 'Government ID'), ('pay_stub', 'Pay Stub'), ('bank_statement', 'Bank Statement'), ('employment_letter', 'Employment Letter'), ('reference_letter', 'Reference Letter'), ('other', 'Other')], max_length=20)),
+                ('file_name', models.CharField(max_length=255)),
+                ('description', models.CharField(blank=True, max_length=200)),
+                ('uploaded_at', models.DateTimeField()),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='documents', to='applications.archivedapplication')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedApplicationMessage',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('message', models.TextField()),
+                ('is_from_owner', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField()),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='applications.archivedapplication')),
+                ('sender', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
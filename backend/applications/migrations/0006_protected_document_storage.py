@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:54
+
+import os
+import shutil
+import applications.storage
+from django.conf import settings
+from django.db import migrations, models
+
+
+def _move_documents(apps, source, target):
+    ApplicationDocument = apps.get_model('applications', 'ApplicationDocument')
+    for name in ApplicationDocument.objects.values_list('file', flat=True).iterator():
+        old_path, new_path = os.path.join(source, name), os.path.join(target, name)
+        if os.path.exists(old_path) and not os.path.exists(new_path):
+            os.makedirs(os.path.dirname(new_path), exist_ok=True)
+            shutil.move(old_path, new_path)
+
+
+def move_documents_out_of_media_root(apps, schema_editor):
+    # Uploads made before this migration are still publicly served.
+    _move_documents(apps, str(settings.MEDIA_ROOT), str(settings.PROTECTED_MEDIA_ROOT))
+
+
+def move_documents_back(apps, schema_editor):
+    _move_documents(apps, str(settings.PROTECTED_MEDIA_ROOT), str(settings.MEDIA_ROOT))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0005_archive_tables'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='applicationdocument',
+            name='file',
+            field=models.FileField(storage=applications.storage.ProtectedDocumentStorage(), upload_to='application_documents/'),
+        ),
+        migrations.RunPython(move_documents_out_of_media_root, move_documents_back),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from .storage import ProtectedDocumentStorage
 
 User = get_user_model()
 
@@ -35,10 +37,14 @@ class RentalApplication(models.Model):
     submitted_at = models.DateTimeField(auto_now_add=True)
     reviewed_at = models.DateTimeField(null=True, blank=True)
     reviewed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='reviewed_applications')
+    screening_score = models.FloatField(null=True, blank=True)
     
     class Meta:
         ordering = ['-submitted_at']
         unique_together = ['property', 'applicant']
+        indexes = [
+            models.Index(fields=['property', '-screening_score'], name='application_property_score_idx'),
+        ]
     
     def __str__(self):
         return f"{self.applicant.full_name} - {self.property.title}"
@@ -66,7 +72,7 @@ class ApplicationDocument(models.Model):
     
     application = models.ForeignKey(RentalApplication, on_delete=models.CASCADE, related_name='documents')
     document_type = models.CharField(max_length=20, choices=DOCUMENT_TYPES)
-    file = models.FileField(upload_to='application_documents/')
+    file = models.FileField(upload_to='application_documents/', storage=ProtectedDocumentStorage())
     description = models.CharField(max_length=200, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     
@@ -87,3 +93,74 @@ class ApplicationMessage(models.Model):
     
     def __str__(self):
         return f"{self.sender.full_name} - {self.application.property.title}"
+
+
+class ApplicationReadCursor(models.Model):
+    
+    application = models.ForeignKey(RentalApplication, on_delete=models.CASCADE, related_name='read_cursors')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='application_read_cursors')
+    last_read_message_id = models.PositiveBigIntegerField(default=0)
+    unread_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['application', 'user']
+        indexes = [
+            models.Index(fields=['user', 'unread_count'], name='read_cursor_user_unread_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user} - {self.application_id}: {self.unread_count} unread"
+
+
+class ArchivedApplication(models.Model):
+    
+    # Keeps the primary key of the RentalApplication it replaced. Fields the
+    # archive is never filtered or listed by live in ``data``.
+    id = models.BigIntegerField(primary_key=True)
+    property = models.ForeignKey('properties.Property', on_delete=models.CASCADE, related_name='archived_applications')
+    applicant = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_rental_applications')
+    status = models.CharField(max_length=20, choices=RentalApplication.STATUS_CHOICES)
+    move_in_date = models.DateField(null=True, blank=True)
+    lease_duration_months = models.PositiveIntegerField(default=12)
+    screening_score = models.FloatField(null=True, blank=True)
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    submitted_at = models.DateTimeField()
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+    reviewed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='reviewed_archived_applications')
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-submitted_at']
+    
+    def __str__(self):
+        return f"{self.applicant.full_name} - {self.property.title} (archived)"
+
+
+class ArchivedApplicationMessage(models.Model):
+    
+    id = models.BigIntegerField(primary_key=True)
+    application = models.ForeignKey(ArchivedApplication, on_delete=models.CASCADE, related_name='messages')
+    sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    message = models.TextField()
+    is_from_owner = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['created_at']
+    
+    def __str__(self):
+        return f"{self.sender.full_name} - archived application {self.application_id}"
+
+
+class ArchivedApplicationDocument(models.Model):
+    
+    id = models.BigIntegerField(primary_key=True)
+    application = models.ForeignKey(ArchivedApplication, on_delete=models.CASCADE, related_name='documents')
+    document_type = models.CharField(max_length=20, choices=ApplicationDocument.DOCUMENT_TYPES)
+    file_name = models.CharField(max_length=255)
+    description = models.CharField(max_length=200, blank=True)
+    uploaded_at = models.DateTimeField()
+    
+    def __str__(self):
+        return f"Archived application {self.application_id} - {self.get_document_type_display()}"
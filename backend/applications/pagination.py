@@ -0,0 +1,29 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class NewestFirstCursorPagination(CursorPagination):
+    
+    ordering = '-id'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class OldestFirstCursorPagination(NewestFirstCursorPagination):
+    
+    ordering = 'id'
+
+
+def thread_paginator(request):
+    """
+    Plain GETs of a thread's messages or documents keep their original
+    contract: oldest first, with page numbers and a count. ?since= (the
+    reconnect catch-up), ?before= (the detail view's *_next links) and
+    ?cursor= opt into cursor pages, which need no COUNT(*) and no OFFSET.
+    """
+    params = request.query_params
+    if 'since' in params:
+        return OldestFirstCursorPagination()
+    if 'before' in params or 'cursor' in params:
+        return NewestFirstCursorPagination()
+    return PageNumberPagination()
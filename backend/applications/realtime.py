@@ -0,0 +1,148 @@
+import asyncio
+import hashlib
+import json
+import secrets
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+STREAM_TICKET_SALT = 'applications.message-stream'
+STREAM_TICKET_USED_KEY = 'stream_ticket_used:{digest}'
+
+
+class InMemoryBroker:
+    """
+    Fans messages out to subscribers in this process only. Used in tests and
+    single-worker setups; run RedisBroker when there is more than one worker.
+    """
+    
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+    
+    def publish(self, application_id, payload):
+        with self._lock:
+            subscribers = list(self._subscribers[application_id])
+        # publish() runs on request threads; hand off to each listener's loop.
+        for subscription in subscribers:
+            subscription.loop.call_soon_threadsafe(subscription.queue.put_nowait, payload)
+    
+    def subscribe(self, application_id):
+        return InMemorySubscription(self, application_id)
+
+
+class InMemorySubscription:
+    
+    def __init__(self, broker, application_id):
+        self.broker = broker
+        self.application_id = application_id
+    
+    async def __aenter__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        with self.broker._lock:
+            self.broker._subscribers[self.application_id].add(self)
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        with self.broker._lock:
+            subscribers = self.broker._subscribers[self.application_id]
+            subscribers.discard(self)
+            if not subscribers:
+                del self.broker._subscribers[self.application_id]
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self):
+        return await self.queue.get()
+
+
+class RedisBroker:
+    """
+    Fans messages out through Redis pub/sub so every worker's subscribers see
+    them. Nothing is stored; reconnecting clients catch up with ?since=.
+    """
+    
+    def __init__(self, url, prefix='rentify:application:'):
+        self.url = url
+        self.prefix = prefix
+        self._client = None
+    
+    def channel(self, application_id):
+        return f'{self.prefix}{application_id}'
+    
+    def publish(self, application_id, payload):
+        if self._client is None:
+            import redis
+            self._client = redis.Redis.from_url(self.url)
+        self._client.publish(self.channel(application_id), json.dumps(payload))
+    
+    def subscribe(self, application_id):
+        return RedisSubscription(self.url, self.channel(application_id))
+
+
+class RedisSubscription:
+    
+    def __init__(self, url, channel):
+        self.url = url
+        self.channel = channel
+    
+    async def __aenter__(self):
+        import redis.asyncio
+        self.client = redis.asyncio.Redis.from_url(self.url)
+        self.pubsub = self.client.pubsub()
+        await self.pubsub.subscribe(self.channel)
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.pubsub.unsubscribe(self.channel)
+        await self.pubsub.aclose()
+        await self.client.aclose()
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self):
+        while True:
+            message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=None)
+            if message is not None:
+                return json.loads(message['data'])
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    config = settings.MESSAGE_BROKER
+    return import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+
+
+# EventSource cannot send an Authorization header, and a JWT in the query
+# string ends up in access logs. Browsers instead exchange their token for a
+# ticket that opens one application's stream, once, within
+# MESSAGE_STREAM_TICKET_MAX_AGE seconds.
+
+def issue_stream_ticket(user, application_id):
+    # The nonce keeps two tickets issued in the same second distinct.
+    data = {'user': user.id, 'application': application_id, 'nonce': secrets.token_urlsafe(8)}
+    return signing.dumps(data, salt=STREAM_TICKET_SALT)
+
+
+def redeem_stream_ticket(ticket, application_id):
+    # Returns the ticket's user id, or None if it is forged, expired, for a
+    # different application or already used.
+    max_age = settings.MESSAGE_STREAM_TICKET_MAX_AGE
+    try:
+        data = signing.loads(ticket, salt=STREAM_TICKET_SALT, max_age=max_age)
+    except signing.BadSignature:
+        return None
+    if data['application'] != application_id:
+        return None
+    # Single use across workers when the cache is shared (REDIS_URL).
+    digest = hashlib.sha256(ticket.encode()).hexdigest()
+    if not cache.add(STREAM_TICKET_USED_KEY.format(digest=digest), 1, max_age):
+        return None
+    return data['user']
@@ -0,0 +1,61 @@
+from .models import RentalApplication
+
+
+# Relative weight of each signal in the 0-100 screening score.
+INCOME_WEIGHT = 50
+CREDIT_WEIGHT = 30
+LEASE_WEIGHT = 10
+PET_WEIGHT = 10
+
+# Income of this many times the rent earns full income marks.
+TARGET_INCOME_TO_RENT = 3.0
+CREDIT_MIN, CREDIT_MAX = 300, 850
+# Applicants without a credit score on file get the midpoint.
+NEUTRAL_CREDIT = 0.5
+FULL_LEASE_MONTHS = 12
+
+SCORE_INPUTS = (
+    'monthly_income', 'lease_duration_months', 'has_pets',
+    'property__monthly_rent', 'property__pet_friendly', 'applicant__renter_profile__credit_score',
+)
+
+
+def score_batch(monthly_income, monthly_rent, lease_duration_months, has_pets, pet_friendly, credit_score):
+    # All arguments are equal-length arrays; missing numbers are NaN.
+    # numpy is imported here so booting a worker does not pay for it.
+    import numpy as np
+    
+    monthly_income = np.asarray(monthly_income, dtype=float)
+    monthly_rent = np.asarray(monthly_rent, dtype=float)
+    credit_score = np.asarray(credit_score, dtype=float)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        income_ratio = np.where(monthly_rent > 0, monthly_income / monthly_rent, np.nan)
+    income = np.nan_to_num(np.clip((income_ratio - 1) / (TARGET_INCOME_TO_RENT - 1), 0, 1), nan=0.0)
+    credit = np.nan_to_num(np.clip((credit_score - CREDIT_MIN) / (CREDIT_MAX - CREDIT_MIN), 0, 1), nan=NEUTRAL_CREDIT)
+    lease = np.clip(np.asarray(lease_duration_months, dtype=float) / FULL_LEASE_MONTHS, 0, 1)
+    pets = ~(np.asarray(has_pets, dtype=bool) & ~np.asarray(pet_friendly, dtype=bool))
+    
+    score = INCOME_WEIGHT * income + CREDIT_WEIGHT * credit + LEASE_WEIGHT * lease + PET_WEIGHT * pets
+    return np.round(score, 2)
+
+
+def rescore_applications(queryset):
+    # One SELECT for the inputs, one vectorised pass, one bulk UPDATE.
+    rows = list(queryset.order_by().values_list('id', *SCORE_INPUTS))
+    if not rows:
+        return {}
+    
+    ids, income, lease, has_pets, rent, pet_friendly, credit = zip(*rows)
+    scores = score_batch(
+        [float('nan') if value is None else value for value in income],
+        rent,
+        lease,
+        has_pets,
+        pet_friendly,
+        [float('nan') if value is None else value for value in credit],
+    )
+    
+    applications = [RentalApplication(id=id, screening_score=float(score)) for id, score in zip(ids, scores)]
+    RentalApplication.objects.bulk_update(applications, ['screening_score'], batch_size=1000)
+    return {application.id: application.screening_score for application in applications}
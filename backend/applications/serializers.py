@@ -1,15 +1,37 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.urls import reverse
 from rest_framework import serializers
-from .models import RentalApplication, ApplicationDocument, ApplicationMessage
-from properties.serializers import PropertyListSerializer
+from .models import (
+    RentalApplication, ApplicationDocument, ApplicationMessage, ApplicationReadCursor,
+    ArchivedApplication, ArchivedApplicationDocument, ArchivedApplicationMessage
+)
+from properties.serializers import PropertyListSerializer, PropertySummarySerializer
 from accounts.serializers import UserSerializer
 
 
 class ApplicationDocumentSerializer(serializers.ModelSerializer):
     
+    download_url = serializers.SerializerMethodField()
+    
     class Meta:
         model = ApplicationDocument
-        fields = ('id', 'document_type', 'file', 'description', 'uploaded_at')
+        fields = ('id', 'document_type', 'file', 'description', 'uploaded_at', 'download_url')
         read_only_fields = ('uploaded_at',)
+        # Upload only: documents are read back through download_url.
+        extra_kwargs = {'file': {'write_only': True}}
+    
+    def get_download_url(self, obj):
+        url = reverse('application_document_download', kwargs={'application_id': obj.application_id, 'pk': obj.id})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class ApplicationDocumentMetadataSerializer(ApplicationDocumentSerializer):
+    
+    class Meta(ApplicationDocumentSerializer.Meta):
+        fields = ('id', 'document_type', 'description', 'uploaded_at', 'download_url')
 
 
 class ApplicationMessageSerializer(serializers.ModelSerializer):
@@ -31,16 +53,73 @@ class RentalApplicationListSerializer(serializers.ModelSerializer):
     class Meta:
         model = RentalApplication
         fields = ('id', 'property', 'applicant', 'status', 'move_in_date', 
-                 'lease_duration_months', 'submitted_at', 'reviewed_at', 'reviewed_by')
+                 'lease_duration_months', 'screening_score', 'submitted_at', 'reviewed_at', 'reviewed_by')
+
+
+class ApplicationInboxSerializer(serializers.ModelSerializer):
+    
+    property = PropertySummarySerializer(read_only=True)
+    applicant = UserSerializer(read_only=True)
+    reviewed_by = UserSerializer(read_only=True)
+    
+    class Meta:
+        model = RentalApplication
+        fields = ('id', 'property', 'applicant', 'status', 'move_in_date', 'lease_duration_months',
+                 'monthly_income', 'employment_status', 'has_pets', 'screening_score', 'submitted_at',
+                 'reviewed_at', 'reviewed_by')
+
+
+class LatestThreadSerializer(serializers.ModelSerializer):
+    
+    # Detail views prefetch the newest limit + 1 rows of each thread into
+    # latest_messages / latest_documents; the extra row only tells us whether
+    # a *_next link to the paginated endpoint is needed.
+    
+    documents = serializers.SerializerMethodField()
+    documents_next = serializers.SerializerMethodField()
+    messages = serializers.SerializerMethodField()
+    messages_next = serializers.SerializerMethodField()
+    
+    document_serializer_class = ApplicationDocumentMetadataSerializer
+    message_serializer_class = ApplicationMessageSerializer
+    next_link_query = ''
+    
+    def _latest(self, obj, attr, related_name, limit):
+        rows = getattr(obj, attr, None)
+        if rows is None:
+            rows = list(getattr(obj, related_name).order_by('-id')[:limit + 1])
+        return rows[:limit], len(rows) > limit
+    
+    def _next_link(self, obj, url_name, rows, has_more):
+        if not has_more:
+            return None
+        url = f"{reverse(url_name, kwargs={'application_id': obj.id})}?{self.next_link_query}before={rows[-1].id}"
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+    
+    def get_documents(self, obj):
+        rows, _ = self._latest(obj, 'latest_documents', 'documents', settings.APPLICATION_DETAIL_DOCUMENTS)
+        return self.document_serializer_class(rows, many=True, context=self.context).data
+    
+    def get_documents_next(self, obj):
+        rows, has_more = self._latest(obj, 'latest_documents', 'documents', settings.APPLICATION_DETAIL_DOCUMENTS)
+        return self._next_link(obj, 'application_documents', rows, has_more)
+    
+    def get_messages(self, obj):
+        rows, _ = self._latest(obj, 'latest_messages', 'messages', settings.APPLICATION_DETAIL_MESSAGES)
+        # Embedded messages stay in chronological order, as before.
+        return self.message_serializer_class(rows[::-1], many=True, context=self.context).data
+    
+    def get_messages_next(self, obj):
+        rows, has_more = self._latest(obj, 'latest_messages', 'messages', settings.APPLICATION_DETAIL_MESSAGES)
+        return self._next_link(obj, 'application_messages', rows, has_more)
 
 
-class RentalApplicationDetailSerializer(serializers.ModelSerializer):
+class RentalApplicationDetailSerializer(LatestThreadSerializer):
     
     property = PropertyListSerializer(read_only=True)
     applicant = UserSerializer(read_only=True)
     reviewed_by = UserSerializer(read_only=True)
-    documents = ApplicationDocumentSerializer(many=True, read_only=True)
-    messages = ApplicationMessageSerializer(many=True, read_only=True)
     
     class Meta:
         model = RentalApplication
@@ -48,6 +127,61 @@ class RentalApplicationDetailSerializer(serializers.ModelSerializer):
         read_only_fields = ('applicant', 'submitted_at', 'reviewed_at', 'reviewed_by')
 
 
+class ArchivedApplicationDocumentSerializer(serializers.ModelSerializer):
+    
+    class Meta:
+        model = ArchivedApplicationDocument
+        fields = ('id', 'document_type', 'file_name', 'description', 'uploaded_at')
+
+
+class ArchivedApplicationMessageSerializer(serializers.ModelSerializer):
+    
+    sender = UserSerializer(read_only=True)
+    
+    class Meta:
+        model = ArchivedApplicationMessage
+        fields = ('id', 'sender', 'message', 'is_from_owner', 'created_at')
+
+
+class ArchivedApplicationListSerializer(serializers.ModelSerializer):
+    
+    property = PropertyListSerializer(read_only=True)
+    applicant = UserSerializer(read_only=True)
+    reviewed_by = UserSerializer(read_only=True)
+    is_archived = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ArchivedApplication
+        fields = ('id', 'property', 'applicant', 'status', 'move_in_date', 'lease_duration_months',
+                 'screening_score', 'submitted_at', 'reviewed_at', 'reviewed_by', 'archived_at', 'is_archived')
+    
+    def get_is_archived(self, obj):
+        return True
+
+
+class ArchivedApplicationDetailSerializer(LatestThreadSerializer):
+    
+    property = PropertyListSerializer(read_only=True)
+    applicant = UserSerializer(read_only=True)
+    reviewed_by = UserSerializer(read_only=True)
+    
+    document_serializer_class = ArchivedApplicationDocumentSerializer
+    message_serializer_class = ArchivedApplicationMessageSerializer
+    next_link_query = 'archived=true&'
+    
+    class Meta:
+        model = ArchivedApplication
+        fields = '__all__'
+    
+    def to_representation(self, instance):
+        # Flatten the archived snapshot back into the live detail shape.
+        data = super().to_representation(instance)
+        snapshot = data.pop('data')
+        snapshot.update(data)
+        snapshot['is_archived'] = True
+        return snapshot
+
+
 class RentalApplicationCreateSerializer(serializers.ModelSerializer):
     
     documents = ApplicationDocumentSerializer(many=True, required=False)
@@ -98,6 +232,14 @@ class RentalApplicationUpdateSerializer(serializers.ModelSerializer):
         return instance
 
 
+class BulkReviewSerializer(serializers.Serializer):
+    
+    property = serializers.IntegerField()
+    approved_application = serializers.IntegerField()
+    others_status = serializers.ChoiceField(choices=[('rejected', 'Rejected'), ('pending', 'Pending')], default='rejected')
+    mark_property_rented = serializers.BooleanField(default=False)
+
+
 class ApplicationMessageCreateSerializer(serializers.ModelSerializer):
     
     class Meta:
@@ -105,13 +247,27 @@ class ApplicationMessageCreateSerializer(serializers.ModelSerializer):
         fields = ('message',)
     
     def create(self, validated_data):
-        application = self.context['application']
+        application = validated_data.pop('application')
         sender = self.context['request'].user
-        is_from_owner = sender == application.property.owner
+        owner_id = application.property.owner_id
+        is_from_owner = sender.id == owner_id
+        
+        with transaction.atomic():
+            message = ApplicationMessage.objects.create(
+                application=application,
+                sender=sender,
+                is_from_owner=is_from_owner,
+                **validated_data
+            )
+            
+            # Keep unread counts current so reading them never scans messages.
+            participant_ids = {application.applicant_id, owner_id}
+            ApplicationReadCursor.objects.bulk_create(
+                [ApplicationReadCursor(application=application, user_id=user_id) for user_id in participant_ids],
+                ignore_conflicts=True,
+            )
+            cursors = ApplicationReadCursor.objects.filter(application=application)
+            cursors.filter(user_id__in=participant_ids - {sender.id}).update(unread_count=F('unread_count') + 1)
+            cursors.filter(user=sender).update(last_read_message_id=message.id, unread_count=0)
         
-        return ApplicationMessage.objects.create(
-            application=application,
-            sender=sender,
-            is_from_owner=is_from_owner,
-            **validated_data
-        )
+        return message
@@ -0,0 +1,88 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from accounts.models import RenterProfile
+from properties.models import Property, PropertyImage
+from .models import RentalApplication
+from .cache import invalidate_dashboard_summary
+from .scoring import rescore_applications
+
+User = get_user_model()
+
+
+def _invalidate_property_dashboards(property_id, owner_id=None):
+    if owner_id is None:
+        owner_id = Property.objects.filter(id=property_id).values_list('owner_id', flat=True).first()
+    applicant_ids = RentalApplication.objects.filter(property_id=property_id).values_list('applicant_id', flat=True)
+    invalidate_dashboard_summary(owner_id, *applicant_ids)
+
+
+@receiver([post_save, post_delete], sender=RentalApplication)
+def rental_application_changed(sender, instance, **kwargs):
+    owner_id = Property.objects.filter(id=instance.property_id).values_list('owner_id', flat=True).first()
+    invalidate_dashboard_summary(instance.applicant_id, owner_id)
+
+
+@receiver([post_save, post_delete], sender=Property)
+def property_changed(sender, instance, **kwargs):
+    _invalidate_property_dashboards(instance.id, owner_id=instance.owner_id)
+
+
+@receiver([post_save, post_delete], sender=PropertyImage)
+def property_image_changed(sender, instance, **kwargs):
+    _invalidate_property_dashboards(instance.property_id)
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_dashboard_summary(instance.id)
+
+
+# Screening scores are stored, so they are only recomputed when one of their
+# inputs actually changes on save.
+
+def _inputs_changed(sender, instance, fields, update_fields):
+    if update_fields is not None and not set(update_fields) & set(fields):
+        return False
+    if instance.pk is None:
+        return True
+    previous = sender.objects.filter(pk=instance.pk).values(*fields).first()
+    return previous is None or any(previous[field] != getattr(instance, field) for field in fields)
+
+
+@receiver(pre_save, sender=RentalApplication)
+def rental_application_score_inputs(sender, instance, update_fields=None, **kwargs):
+    fields = ('monthly_income', 'lease_duration_months', 'has_pets', 'property_id', 'applicant_id')
+    instance._rescore = _inputs_changed(sender, instance, fields, update_fields)
+
+
+@receiver(post_save, sender=RentalApplication)
+def rental_application_rescore(sender, instance, **kwargs):
+    if getattr(instance, '_rescore', False):
+        scores = rescore_applications(RentalApplication.objects.filter(id=instance.id))
+        instance.screening_score = scores.get(instance.id)
+
+
+@receiver(pre_save, sender=Property)
+def property_score_inputs(sender, instance, update_fields=None, **kwargs):
+    instance._rescore = instance.pk is not None and _inputs_changed(
+        sender, instance, ('monthly_rent', 'pet_friendly'), update_fields
+    )
+
+
+@receiver(post_save, sender=Property)
+def property_rescore(sender, instance, **kwargs):
+    if getattr(instance, '_rescore', False):
+        rescore_applications(RentalApplication.objects.filter(property_id=instance.id))
+
+
+@receiver(pre_save, sender=RenterProfile)
+def renter_profile_score_inputs(sender, instance, update_fields=None, **kwargs):
+    instance._rescore = _inputs_changed(sender, instance, ('credit_score',), update_fields)
+
+
+@receiver(post_save, sender=RenterProfile)
+def renter_profile_rescore(sender, instance, **kwargs):
+    if getattr(instance, '_rescore', False):
+        rescore_applications(RentalApplication.objects.filter(applicant_id=instance.user_id))
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ProtectedDocumentStorage(FileSystemStorage):
+    """
+    Application documents live under PROTECTED_MEDIA_ROOT, outside
+    MEDIA_ROOT, so no static() route or media alias can serve them; they
+    leave only through ApplicationDocumentDownloadView.
+    """
+
+    @property
+    def base_location(self):
+        # Read on every access so override_settings() applies in tests.
+        return settings.PROTECTED_MEDIA_ROOT
+
+    @property
+    def location(self):
+        return str(self.base_location)
+
+    def url(self, name):
+        raise ValueError('Application documents have no public URL; use the download view.')
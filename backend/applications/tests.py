@@ -1,3 +1,851 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from unittest.mock import patch
+from datetime import date, timedelta
+from io import StringIO
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.conf import settings
+from django.db import connection
+from django.test import LiveServerTestCase, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from accounts.models import User, RenterProfile
+from accounts.serializers import UserSerializer
+from properties.models import Property, PropertyImage
+from .models import (
+    RentalApplication, ApplicationDocument, ApplicationMessage, ApplicationReadCursor,
+    ArchivedApplication, ArchivedApplicationMessage
+)
+from .access import application_access
+from .cache import get_dashboard_summary, set_dashboard_summary
+from .realtime import get_broker, issue_stream_ticket, redeem_stream_ticket
+from .views import STREAM_BACKLOG_PAGE_SIZE
+from .scoring import rescore_applications, score_batch
 
-# Create your tests here.
+
+def make_user(username, role):
+    return User.objects.create_user(
+        email=f'{username}@example.com', username=username, password=None,
+        first_name=username.title(), last_name='Test', role=role,
+    )
+
+
+def make_property(owner, title='Flat', **kwargs):
+    fields = {
+        'title': title, 'description': 'A place', 'property_type': 'apartment',
+        'address': '1 Main St', 'city': 'Addis Ababa', 'state': 'AA', 'zip_code': '1000',
+        'bedrooms': 2, 'bathrooms': 1, 'monthly_rent': 1000, 'available_from': date(2025, 1, 1),
+        'is_approved': True,
+    }
+    fields.update(kwargs)
+    property_obj = Property.objects.create(owner=owner, **fields)
+    PropertyImage.objects.create(property=property_obj, image='property_images/a.jpg', is_primary=True)
+    PropertyImage.objects.create(property=property_obj, image='property_images/b.jpg', order=1)
+    return property_obj
+
+
+class DashboardSummaryTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.owner = make_user('owner', 'homeowner')
+        self.properties = [make_property(self.owner, title=f'Flat {i}') for i in range(3)]
+        self.renters = [make_user(f'renter{i}', 'renter') for i in range(3)]
+        for renter in self.renters:
+            for property_obj in self.properties:
+                RentalApplication.objects.create(property=property_obj, applicant=renter)
+        RentalApplication.objects.filter(applicant=self.renters[0]).update(status='approved')
+        self.url = reverse('dashboard_summary')
+
+    def test_homeowner_summary(self):
+        self.client.force_authenticate(self.owner)
+        with self.assertNumQueries(6):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        counts = response.data['counts']
+        self.assertEqual(counts['total_applications'], 9)
+        self.assertEqual(counts['pending_applications'], 6)
+        self.assertEqual(counts['approved_applications'], 3)
+        self.assertEqual(counts['total_properties'], 3)
+        self.assertEqual(counts['total_monthly_rent'], 3000)
+        self.assertEqual(len(response.data['recent_applications']), 5)
+        self.assertEqual(len(response.data['properties']), 3)
+        self.assertEqual(response.data['properties'][0]['application_count'], 3)
+        self.assertEqual(response.data['properties'][0]['image_count'], 2)
+
+    def test_renter_summary(self):
+        self.client.force_authenticate(self.renters[1])
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.data['counts']['total_applications'], 3)
+        self.assertEqual(len(response.data['recent_applications']), 3)
+        self.assertEqual(response.data['properties'], [])
+
+    def test_summary_is_cached_until_a_relevant_write(self):
+        self.client.force_authenticate(self.renters[1])
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        application = RentalApplication.objects.filter(applicant=self.renters[1]).first()
+        application.status = 'rejected'
+        application.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['counts']['rejected_applications'], 1)
+
+
+class ApplicationInboxTests(APITestCase):
+
+    def setUp(self):
+        self.owner = make_user('owner', 'homeowner')
+        self.url = reverse('application_inbox')
+        self.client.force_authenticate(self.owner)
+
+    def seed(self, property_count, renter_count):
+        properties = [make_property(self.owner, title=f'Flat {i}') for i in range(property_count)]
+        for i in range(renter_count):
+            renter = make_user(f'renter{User.objects.count()}', 'renter')
+            for property_obj in properties:
+                RentalApplication.objects.create(property=property_obj, applicant=renter, reviewed_by=self.owner)
+        return properties
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        self.seed(property_count=1, renter_count=1)
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+        self.seed(property_count=4, renter_count=4)
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 17)
+        self.assertEqual(len(response.data['results']), 17)
+        self.assertIsNotNone(response.data['results'][0]['property']['primary_image'])
+
+    def test_list_view_query_count_does_not_grow_with_page_size(self):
+        self.seed(property_count=1, renter_count=1)
+        with self.assertNumQueries(3):
+            self.client.get(reverse('application_list'))
+
+        self.seed(property_count=3, renter_count=3)
+        with self.assertNumQueries(3):
+            self.client.get(reverse('application_list'))
+
+    def test_filters_by_status_and_property(self):
+        properties = self.seed(property_count=2, renter_count=2)
+        RentalApplication.objects.filter(property=properties[0]).update(status='approved')
+
+        response = self.client.get(self.url, {'status': 'approved'})
+        self.assertEqual(response.data['count'], 2)
+
+        response = self.client.get(self.url, {'property': properties[1].id})
+        self.assertEqual({row['property']['id'] for row in response.data['results']}, {properties[1].id})
+
+    def test_renters_have_no_inbox(self):
+        self.client.force_authenticate(make_user('renter', 'renter'))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+
+class ApplicationDetailEmbedTests(APITestCase):
+
+    def setUp(self):
+        self.owner = make_user('owner', 'homeowner')
+        self.renter = make_user('renter', 'renter')
+        self.application = RentalApplication.objects.create(
+            property=make_property(self.owner), applicant=self.renter,
+        )
+        self.url = reverse('application_detail', kwargs={'pk': self.application.id})
+        self.client.force_authenticate(self.renter)
+
+    def add_messages(self, count):
+        ApplicationMessage.objects.bulk_create([
+            ApplicationMessage(application=self.application, sender=self.renter, message=f'Message {i}')
+            for i in range(count)
+        ])
+
+    def test_short_thread_is_embedded_without_next_link(self):
+        self.add_messages(3)
+        ApplicationDocument.objects.create(application=self.application, document_type='id', file='application_documents/id.pdf')
+
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+
+        self.assertEqual([m['message'] for m in response.data['messages']], ['Message 0', 'Message 1', 'Message 2'])
+        self.assertIsNone(response.data['messages_next'])
+        self.assertEqual(len(response.data['documents']), 1)
+        self.assertNotIn('file', response.data['documents'][0])
+
+    def test_long_thread_embeds_latest_messages_with_cursor_link(self):
+        self.add_messages(30)
+
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+
+        messages = response.data['messages']
+        self.assertEqual(len(messages), 20)
+        self.assertEqual(messages[-1]['message'], 'Message 29')
+        self.assertIn(f"before={messages[0]['id']}", response.data['messages_next'])
+
+        response = self.client.get(response.data['messages_next'])
+        self.assertEqual([m['message'] for m in response.data['results']], [f'Message {i}' for i in range(9, -1, -1)])
+        self.assertIsNone(response.data['next'])
+
+
+class ApplicationMessageSyncTests(APITestCase):
+
+    def setUp(self):
+        self.owner = make_user('owner', 'homeowner')
+        self.renter = make_user('renter', 'renter')
+        self.application = RentalApplication.objects.create(
+            property=make_property(self.owner), applicant=self.renter,
+        )
+        self.messages = ApplicationMessage.objects.bulk_create([
+            ApplicationMessage(application=self.application, sender=self.renter, message=f'Message {i}')
+            for i in range(5)
+        ])
+        self.url = reverse('application_messages', kwargs={'application_id': self.application.id})
+        self.client.force_authenticate(self.renter)
+
+    def test_plain_reads_keep_oldest_first_page_numbers(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual([m['message'] for m in response.data['results']], [f'Message {i}' for i in range(5)])
+
+        response = self.client.get(self.url, {'cursor': '', 'page_size': 2})
+        self.assertEqual([m['message'] for m in response.data['results']], ['Message 4', 'Message 3'])
+        self.assertNotIn('count', response.data)
+
+    def test_since_returns_only_newer_messages_oldest_first(self):
+        response = self.client.get(self.url, {'since': self.messages[1].id})
+        self.assertEqual([m['message'] for m in response.data['results']], ['Message 2', 'Message 3', 'Message 4'])
+
+    def test_new_message_is_published_to_subscribers(self):
+        async def first_event():
+            async with get_broker().subscribe(self.application.id) as events:
+                subscribed.set()
+                return await anext(events)
+
+        loop = asyncio.new_event_loop()
+        subscribed = asyncio.Event()
+        task = loop.create_task(first_event())
+        loop.run_until_complete(subscribed.wait())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.force_authenticate(self.owner)
+            self.client.post(self.url, {'message': 'Still available?'})
+
+        payload = loop.run_until_complete(asyncio.wait_for(task, 1))
+        loop.close()
+        self.assertEqual(payload['message'], 'Still available?')
+        self.assertTrue(payload['is_from_owner'])
+
+    async def read_events(self, response, count):
+        events = []
+        while len(events) < count:
+            chunk = (await asyncio.wait_for(anext(response.streaming_content), 2)).decode()
+            events += [event for event in chunk.split('\n\n') if event.startswith('id: ')]
+        await response.streaming_content.aclose()
+        return [json.loads(event.split('\ndata: ')[1]) for event in events]
+
+    async def test_stream_replays_messages_after_last_event_id(self):
+        url = reverse('application_message_stream', kwargs={'application_id': self.application.id})
+        ticket = issue_stream_ticket(self.renter, self.application.id)
+
+        response = await self.async_client.get(
+            url, {'ticket': ticket}, headers={'Last-Event-ID': str(self.messages[3].id)}
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunk = await anext(response.streaming_content)
+        await response.streaming_content.aclose()
+
+        event_id, _, data = chunk.decode().strip().split('\n')
+        self.assertEqual(event_id, f'id: {self.messages[4].id}')
+        self.assertEqual(json.loads(data[len('data: '):])['message'], 'Message 4')
+
+    async def test_stream_replays_a_backlog_longer_than_one_page(self):
+        await ApplicationMessage.objects.abulk_create([
+            ApplicationMessage(application=self.application, sender=self.renter, message=f'Backlog {i}')
+            for i in range(STREAM_BACKLOG_PAGE_SIZE)
+        ])
+        url = reverse('application_message_stream', kwargs={'application_id': self.application.id})
+        token = str(AccessToken.for_user(self.renter))
+
+        response = await self.async_client.get(url, {'since': 0}, headers={'Authorization': f'Bearer {token}'})
+        payloads = await self.read_events(response, STREAM_BACKLOG_PAGE_SIZE + 5)
+        self.assertEqual(payloads[-1]['message'], f'Backlog {STREAM_BACKLOG_PAGE_SIZE - 1}')
+        self.assertEqual(len({payload['id'] for payload in payloads}), STREAM_BACKLOG_PAGE_SIZE + 5)
+
+    async def test_stream_rejects_other_users(self):
+        outsider = await sync_to_async(make_user)('outsider', 'renter')
+        url = reverse('application_message_stream', kwargs={'application_id': self.application.id})
+
+        response = await self.async_client.get(url, headers={'Authorization': f'Bearer {AccessToken.for_user(outsider)}'})
+        self.assertEqual(response.status_code, 403)
+
+    async def test_stream_refuses_query_string_tokens_and_reused_or_foreign_tickets(self):
+        url = reverse('application_message_stream', kwargs={'application_id': self.application.id})
+        other = await RentalApplication.objects.acreate(
+            property=await sync_to_async(make_property)(self.owner, title='Other'), applicant=self.renter,
+        )
+
+        response = await self.async_client.get(url, {'token': str(AccessToken.for_user(self.renter))})
+        self.assertEqual(response.status_code, 403)
+        response = await self.async_client.get(url, {'ticket': issue_stream_ticket(self.renter, other.id)})
+        self.assertEqual(response.status_code, 403)
+
+        ticket = issue_stream_ticket(self.renter, self.application.id)
+        response = await self.async_client.get(url, {'ticket': ticket, 'since': self.messages[3].id})
+        await anext(response.streaming_content)
+        await response.streaming_content.aclose()
+        response = await self.async_client.get(url, {'ticket': ticket})
+        self.assertEqual(response.status_code, 403)
+
+    def test_ticket_endpoint_checks_access(self):
+        url = reverse('application_message_stream_ticket', kwargs={'application_id': self.application.id})
+        response = self.client.post(url)
+        self.assertEqual(response.data['expires_in'], settings.MESSAGE_STREAM_TICKET_MAX_AGE)
+        self.assertEqual(redeem_stream_ticket(response.data['ticket'], self.application.id), self.renter.id)
+
+        self.client.force_authenticate(make_user('outsider', 'renter'))
+        self.assertEqual(self.client.post(url).status_code, 403)
+
+
+class UnreadMessageTests(APITestCase):
+
+    def setUp(self):
+        self.owner = make_user('owner', 'homeowner')
+        self.renter = make_user('renter', 'renter')
+        self.applications = [
+            RentalApplication.objects.create(property=make_property(self.owner, title=f'Flat {i}'), applicant=self.renter)
+            for i in range(2)
+        ]
+
+    def send(self, sender, application, text='Hello'):
+        self.client.force_authenticate(sender)
+        url = reverse('application_messages', kwargs={'application_id': application.id})
+        return self.client.post(url, {'message': text})
+
+    def unread(self, user):
+        self.client.force_authenticate(user)
+        with self.assertNumQueries(1):
+            return self.client.get(reverse('application_unread_counts')).data
+
+    def test_counts_are_maintained_as_messages_are_sent(self):
+        self.send(self.renter, self.applications[0])
+        self.send(self.renter, self.applications[0])
+        self.send(self.renter, self.applications[1])
+
+        self.assertEqual(self.unread(self.owner), {
+            'total_unread': 3,
+            'applications': {self.applications[0].id: 2, self.applications[1].id: 1},
+        })
+
+        # Replying implies the sender has read the thread.
+        self.send(self.owner, self.applications[0])
+        self.assertEqual(self.unread(self.owner), {
+            'total_unread': 1,
+            'applications': {self.applications[1].id: 1},
+        })
+        self.assertEqual(self.unread(self.renter), {
+            'total_unread': 1,
+            'applications': {self.applications[0].id: 1},
+        })
+
+    def test_mark_read_moves_the_cursor_forward_only(self):
+        for i in range(3):
+            self.send(self.renter, self.applications[0], text=f'Message {i}')
+        first_id = ApplicationMessage.objects.order_by('id').first().id
+        url = reverse('application_messages_read', kwargs={'application_id': self.applications[0].id})
+
+        self.client.force_authenticate(self.owner)
+        response = self.client.post(url, {'message_id': first_id})
+        self.assertEqual(response.data['unread_count'], 2)
+
+        response = self.client.post(url)
+        self.assertEqual(response.data['unread_count'], 0)
+
+        response = self.client.post(url, {'message_id': first_id})
+        self.assertEqual(response.data['unread_count'], 0)
+        self.assertEqual(
+            ApplicationReadCursor.objects.get(application=self.applications[0], user=self.owner).last_read_message_id,
+            ApplicationMessage.objects.order_by('id').last().id,
+        )
+        self.assertEqual(self.unread(self.owner)['total_unread'], 0)
+
+    def test_mark_read_refuses_ids_outside_the_thread(self):
+        self.send(self.renter, self.applications[0])
+        self.send(self.renter, self.applications[1])
+        other_id = ApplicationMessage.objects.get(application=self.applications[1]).id
+        url = reverse('application_messages_read', kwargs={'application_id': self.applications[0].id})
+
+        self.client.force_authenticate(self.owner)
+        for message_id in (other_id, 10 ** 9, 'abc'):
+            self.assertEqual(self.client.post(url, {'message_id': message_id}).status_code, 400)
+
+        self.send(self.renter, self.applications[0], text='Later')
+        self.assertEqual(self.unread(self.owner)['applications'][self.applications[0].id], 2)
+
+    def test_outsiders_cannot_mark_read(self):
+        self.client.force_authenticate(make_user('outsider', 'renter'))
+        url = reverse('application_messages_read', kwargs={'application_id': self.applications[0].id})
+        self.assertEqual(self.client.post(url).status_code, 403)
+
+
+class BulkReviewTests(APITestCase):
+
+    def setUp(self):
+        self.owner = make_user('owner', 'homeowner')
+        self.property = make_property(self.owner)
+        self.applications = [
+            RentalApplication.objects.create(property=self.property, applicant=make_user(f'renter{i}', 'renter'))
+            for i in range(5)
+        ]
+        self.applications[4].status = 'withdrawn'
+        self.applications[4].save()
+        self.url = reverse('application_bulk_review')
+        self.client.force_authenticate(self.owner)
+
+    def test_approves_one_and_rejects_the_rest_in_one_transaction(self):
+        payload = {
+            'property': self.property.id,
+            'approved_application': self.applications[1].id,
+            'mark_property_rented': True,
+        }
+        # Access check, lock property, lock applications, bulk update, property
+        # update, plus savepoints.
+        with self.assertNumQueries(7):
+            response = self.client.post(self.url, payload)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated_applications'], 4)
+        statuses = dict(RentalApplication.objects.values_list('id', 'status'))
+        self.assertEqual(statuses[self.applications[1].id], 'approved')
+        self.assertEqual(
+            [statuses[a.id] for a in self.applications],
+            ['rejected', 'approved', 'rejected', 'rejected', 'withdrawn'],
+        )
+        reviewed = RentalApplication.objects.get(id=self.applications[0].id)
+        self.assertEqual(reviewed.reviewed_by, self.owner)
+        self.assertIsNotNone(reviewed.reviewed_at)
+        self.property.refresh_from_db()
+        self.assertEqual(self.property.status, 'rented')
+
+    def test_rejects_applications_from_other_properties(self):
+        other = RentalApplication.objects.create(
+            property=make_property(self.owner, title='Other'), applicant=make_user('other', 'renter'),
+        )
+        response = self.client.post(self.url, {'property': self.property.id, 'approved_application': other.id})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(RentalApplication.objects.exclude(status__in=['pending', 'withdrawn']).exists())
+
+    def test_only_the_owner_can_review(self):
+        self.client.force_authenticate(make_user('intruder', 'homeowner'))
+        response = self.client.post(self.url, {
+            'property': self.property.id, 'approved_application': self.applications[0].id,
+        })
+        self.assertEqual(response.status_code, 404)
+
+
+class ScreeningScoreTests(APITestCase):
+
+    def setUp(self):
+        self.owner = make_user('owner', 'homeowner')
+        self.property = make_property(self.owner, monthly_rent=1000, pet_friendly=False)
+
+    def apply(self, username, credit_score=None, **kwargs):
+        renter = make_user(username, 'renter')
+        RenterProfile.objects.create(user=renter, credit_score=credit_score)
+        return RentalApplication.objects.create(property=self.property, applicant=renter, **kwargs)
+
+    def test_score_batch_is_vectorised_over_all_inputs(self):
+        scores = score_batch(
+            monthly_income=[3000, 2000, float('nan'), 3000],
+            monthly_rent=[1000, 1000, 1000, 1000],
+            lease_duration_months=[12, 6, 12, 12],
+            has_pets=[False, False, False, True],
+            pet_friendly=[False, False, False, False],
+            credit_score=[850, 575, float('nan'), 850],
+        )
+        self.assertEqual(scores.tolist(), [100.0, 55.0, 35.0, 90.0])
+
+    def test_scores_are_stored_and_follow_input_changes(self):
+        application = self.apply('renter', credit_score=850, monthly_income=3000)
+        self.assertEqual(application.screening_score, 100.0)
+
+        self.property.monthly_rent = 1500
+        self.property.save()
+        application.refresh_from_db()
+        self.assertEqual(application.screening_score, 75.0)
+
+        profile = application.applicant.renter_profile
+        profile.credit_score = 300
+        profile.save()
+        application.refresh_from_db()
+        self.assertEqual(application.screening_score, 45.0)
+
+    def test_status_changes_do_not_rescore(self):
+        application = self.apply('renter', credit_score=850, monthly_income=3000)
+        application.status = 'approved'
+        # Input check, the save itself and dashboard invalidation; no rescoring.
+        with self.assertNumQueries(3):
+            application.save()
+
+    def test_property_applications_sort_and_filter_by_score(self):
+        low = self.apply('low', credit_score=400, monthly_income=1000)
+        high = self.apply('high', credit_score=800, monthly_income=3000)
+        mid = self.apply('mid', credit_score=600, monthly_income=2000)
+        url = reverse('property_applications', kwargs={'property_id': self.property.id})
+        self.client.force_authenticate(self.owner)
+
+        response = self.client.get(url, {'ordering': '-screening_score'})
+        self.assertEqual([row['id'] for row in response.data['results']], [high.id, mid.id, low.id])
+
+        response = self.client.get(url, {'min_score': 50})
+        self.assertEqual({row['id'] for row in response.data['results']}, {high.id, mid.id})
+
+        response = self.client.get(url, {'min_score': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('min_score', response.data)
+
+
+class DocumentDownloadTests(APITestCase):
+
+    def setUp(self):
+        self.media_root, self.protected_root = tempfile.mkdtemp(), tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.addCleanup(shutil.rmtree, self.protected_root)
+        media = override_settings(MEDIA_ROOT=self.media_root, PROTECTED_MEDIA_ROOT=self.protected_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.owner = make_user('owner', 'homeowner')
+        self.renter = make_user('renter', 'renter')
+        application = RentalApplication.objects.create(property=make_property(self.owner), applicant=self.renter)
+        self.content = bytes(range(256)) * 4
+        self.document = ApplicationDocument.objects.create(
+            application=application, document_type='pay_stub',
+            file=SimpleUploadedFile('stub.pdf', self.content, content_type='application/pdf'),
+        )
+        self.url = reverse('application_document_download', kwargs={
+            'application_id': application.id, 'pk': self.document.id,
+        })
+        self.client.force_authenticate(self.owner)
+
+    def test_full_download(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('attachment', response['Content-Disposition'])
+
+    def test_range_requests(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.content)}')
+        self.assertEqual(b''.join(response.streaming_content), self.content[10:20])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-8')
+        self.assertEqual(b''.join(response.streaming_content), self.content[-8:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+
+    def test_conditional_get(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_only_participants_and_admins_can_download(self):
+        self.client.force_authenticate(make_user('outsider', 'renter'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.client.force_authenticate(make_user('staff', 'admin'))
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        missing = reverse('application_document_download', kwargs={
+            'application_id': self.document.application_id, 'pk': self.document.id + 1,
+        })
+        self.assertEqual(self.client.get(missing).status_code, 404)
+
+    def test_documents_are_stored_outside_media_root_without_a_public_url(self):
+        self.assertTrue(self.document.file.path.startswith(self.protected_root))
+        self.assertEqual(os.listdir(self.media_root), [])
+        with self.assertRaises(ValueError):
+            self.document.file.url
+
+        url = reverse('application_documents', kwargs={'application_id': self.document.application_id})
+        self.client.force_authenticate(self.renter)
+        response = self.client.post(url, {
+            'document_type': 'id', 'file': SimpleUploadedFile('id.pdf', b'%PDF', content_type='application/pdf'),
+        }, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('file', response.data)
+        self.assertIn('download_url', response.data)
+        rows = self.client.get(url).data['results']
+        self.assertEqual(len(rows), 2)
+        self.assertTrue(all('file' not in row for row in rows))
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(PROTECTED_MEDIA_SERVER='nginx')
+    def test_nginx_offload(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/' + self.document.file.name)
+        self.assertEqual(response.content, b'')
+
+    def test_outsiders_are_refused(self):
+        self.client.force_authenticate(make_user('outsider', 'renter'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class ArchiveTests(APITestCase):
+
+    def setUp(self):
+        self.protected_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.protected_root)
+        media = override_settings(PROTECTED_MEDIA_ROOT=self.protected_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.owner = make_user('owner', 'homeowner')
+        self.renter = make_user('renter', 'renter')
+        self.long_ago = timezone.now() - timedelta(days=400)
+
+        self.closed = self.apply('rejected', monthly_income=2500)
+        ApplicationMessage.objects.bulk_create([
+            ApplicationMessage(application=self.closed, sender=self.renter, message=f'Message {i}')
+            for i in range(3)
+        ])
+        ApplicationMessage.objects.filter(application=self.closed).update(created_at=self.long_ago)
+        self.document = ApplicationDocument.objects.create(
+            application=self.closed, document_type='id',
+            file=SimpleUploadedFile('id.pdf', b'%PDF', content_type='application/pdf'),
+        )
+
+        self.pending = self.apply('pending')
+        self.recently_closed = self.apply('withdrawn', backdate=False)
+        self.client.force_authenticate(self.renter)
+
+    def apply(self, status, backdate=True, **kwargs):
+        application = RentalApplication.objects.create(
+            property=make_property(self.owner), applicant=self.renter, status=status, **kwargs
+        )
+        if backdate:
+            RentalApplication.objects.filter(id=application.id).update(submitted_at=self.long_ago)
+        return application
+
+    def test_archives_only_closed_idle_applications(self):
+        document_path = self.document.file.path
+        self.assertTrue(os.path.exists(document_path))
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('archive_applications', '--older-than-days=180', '--batch-size=1', stdout=StringIO())
+
+        self.assertEqual(set(RentalApplication.objects.values_list('id', flat=True)), {self.pending.id, self.recently_closed.id})
+        archived = ArchivedApplication.objects.get()
+        self.assertEqual(archived.id, self.closed.id)
+        self.assertEqual(archived.data['monthly_income'], '2500.00')
+        self.assertEqual(ArchivedApplicationMessage.objects.filter(application=archived).count(), 3)
+        self.assertEqual(archived.documents.get().file_name, 'application_documents/id.pdf')
+        self.assertFalse(ApplicationMessage.objects.filter(application_id=self.closed.id).exists())
+        self.assertFalse(os.path.exists(document_path))
+
+    def test_history_reads_fall_back_to_the_archive(self):
+        call_command('archive_applications', stdout=StringIO())
+
+        response = self.client.get(reverse('application_list'))
+        self.assertNotIn(self.closed.id, [row['id'] for row in response.data['results']])
+
+        response = self.client.get(reverse('application_list'), {'archived': 'true'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.closed.id])
+
+        detail_url = reverse('application_detail', kwargs={'pk': self.closed.id})
+        self.assertEqual(self.client.get(detail_url).status_code, 404)
+        response = self.client.get(detail_url, {'archived': 'true'})
+        self.assertTrue(response.data['is_archived'])
+        self.assertEqual(response.data['monthly_income'], '2500.00')
+        self.assertEqual(len(response.data['messages']), 3)
+
+        messages_url = reverse('application_messages', kwargs={'application_id': self.closed.id})
+        response = self.client.get(messages_url, {'archived': 'true'})
+        self.assertEqual(len(response.data['results']), 3)
+
+
+class AccessTests(APITestCase):
+
+    def setUp(self):
+        self.owner = make_user('owner', 'homeowner')
+        self.renter = make_user('renter', 'renter')
+        self.admin = make_user('admin', 'admin')
+        self.application = RentalApplication.objects.create(property=make_property(self.owner), applicant=self.renter)
+        ApplicationMessage.objects.create(application=self.application, sender=self.renter, message='Hello')
+        self.messages_url = reverse('application_messages', kwargs={'application_id': self.application.id})
+
+    def test_resolver_is_memoised_per_request(self):
+        request = APIRequestFactory().get('/')
+        request.user = self.owner
+        with self.assertNumQueries(1):
+            for _ in range(3):
+                access = application_access(request, self.application.id)
+        self.assertTrue(access.is_owner)
+        self.assertTrue(access.can_message())
+        self.assertFalse(access.can_upload())
+
+    def test_thread_reads_cost_one_lookup_and_one_page(self):
+        self.client.force_authenticate(self.owner)
+        # Plus the COUNT(*) of page-number pagination; cursor pages skip it.
+        with self.assertNumQueries(3):
+            response = self.client.get(self.messages_url)
+        self.assertEqual(len(response.data['results']), 1)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.messages_url, {'before': 10 ** 9})
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_admin_can_read_but_not_post_and_outsiders_are_refused(self):
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.client.get(self.messages_url).status_code, 200)
+        self.assertEqual(self.client.post(self.messages_url, {'message': 'Hi'}).status_code, 403)
+
+        self.client.force_authenticate(make_user('outsider', 'renter'))
+        self.assertEqual(self.client.get(self.messages_url).status_code, 403)
+        missing_url = reverse('application_messages', kwargs={'application_id': self.application.id + 100})
+        self.assertEqual(self.client.get(missing_url).status_code, 404)
+
+    def test_property_applications_are_limited_to_the_owner(self):
+        url = reverse('property_applications', kwargs={'property_id': self.application.property_id})
+        self.client.force_authenticate(make_user('other', 'homeowner'))
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.client.force_authenticate(self.owner)
+        self.assertEqual(self.client.get(url).data['count'], 1)
+
+
+class SideloadTests(APITestCase):
+
+    def setUp(self):
+        self.owner = make_user('owner', 'homeowner')
+        self.renters = [make_user(f'renter{i}', 'renter') for i in range(2)]
+        properties = [make_property(self.owner, title=f'Flat {i}') for i in range(2)]
+        for property_obj in properties:
+            for renter in self.renters:
+                RentalApplication.objects.create(property=property_obj, applicant=renter)
+        self.client.force_authenticate(self.owner)
+
+    def test_nested_users_are_serialized_once_per_response(self):
+        with patch.object(UserSerializer, 'get_avatar', autospec=True, side_effect=UserSerializer.get_avatar) as get_avatar:
+            response = self.client.get(reverse('application_list'))
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertEqual(response.data['results'][0]['applicant']['username'][:6], 'renter')
+        # Two applicants plus the owner nested in each property.
+        self.assertEqual(get_avatar.call_count, 3)
+        self.assertNotIn('included', response.data)
+
+    def test_normalized_rows_reference_included_objects(self):
+        response = self.client.get(reverse('application_list'), {'normalized': 'true'})
+        row = response.data['results'][0]
+        included = response.data['included']
+        self.assertIsInstance(row['applicant'], int)
+        self.assertIsInstance(row['property'], int)
+        self.assertEqual(set(included['users']), {str(user.id) for user in [self.owner, *self.renters]})
+        self.assertEqual(len(included['properties']), 2)
+        self.assertEqual(included['properties'][str(row['property'])]['owner'], self.owner.id)
+
+        response = self.client.get(reverse('application_inbox'), {'normalized': 'true'})
+        self.assertEqual(set(response.data['included']['users']), {str(user.id) for user in self.renters})
+
+
+class SQLiteConcurrencyTests(SimpleTestCase):
+
+    def test_concurrent_profile_sustains_mixed_load_without_lock_errors(self):
+        # A separate process, so the threads' connections stay outside the test runner's.
+        output = subprocess.run(
+            [sys.executable, 'manage.py', 'sqlite_stress', '--profile=concurrent', '--threads=6', '--seconds=1'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output)
+        self.assertEqual(result['errors'], 0)
+        self.assertGreater(result['reads'], 0)
+        self.assertGreater(result['writes'], 0)
+
+
+@override_settings(RATE_LIMITS={})
+class BenchmarkDataTests(LiveServerTestCase):
+    
+    # The benchmark drives the live server over HTTP, which reads the seeded
+    # rows from its own thread, so they must be committed.
+    
+    def test_seed_and_benchmark_endpoints(self):
+        out = StringIO()
+        call_command('seed_benchmark_data', properties=20, renters=8, stdout=out)
+        rows = json.loads(out.getvalue())['rows']
+        self.assertEqual(rows['properties.Property'], 20)
+        self.assertEqual(rows['properties.PropertyImage'], 60)
+        self.assertEqual(rows['applications.RentalApplication'], 60)
+        self.assertEqual(rows['applications.ApplicationMessage'], 240)
+        self.assertFalse(Property.objects.filter(latitude__isnull=True).exists())
+        # A cursor per participant, as the message serializer would leave them.
+        self.assertEqual(rows['applications.ApplicationReadCursor'], 120)
+        for cursor in ApplicationReadCursor.objects.all():
+            unread = ApplicationMessage.objects.filter(
+                application_id=cursor.application_id, id__gt=cursor.last_read_message_id
+            ).exclude(sender_id=cursor.user_id)
+            self.assertEqual(cursor.unread_count, unread.count())
+        # Scored by the scoring module, not made up: rescoring changes nothing.
+        scores = dict(RentalApplication.objects.values_list('id', 'screening_score'))
+        self.assertNotIn(None, scores.values())
+        rescore_applications(RentalApplication.objects.all())
+        self.assertEqual(dict(RentalApplication.objects.values_list('id', 'screening_score')), scores)
+        
+        with self.assertRaises(CommandError):
+            call_command('seed_benchmark_data', properties=1, stdout=StringIO())
+        
+        out = StringIO()
+        call_command('benchmark_endpoints', requests=3, warmup=0, workers=2, base_url=self.live_server_url,
+                     endpoints='property_detail,property_search,application_list', stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(set(report['endpoints']), {'property_detail', 'property_search', 'application_list'})
+        for result in report['endpoints'].values():
+            self.assertEqual((result['requests'], result['errors']), (3, 0))
+            self.assertIn('p99_ms', result)
+
+
+class ApplicationAdminTests(APITestCase):
+    
+    def test_bulk_reject_is_a_single_update_and_skips_withdrawn(self):
+        moderator = make_user('moderator', 'admin')
+        moderator.is_staff = moderator.is_superuser = True
+        moderator.save()
+        self.client.force_login(moderator)
+        property_obj = make_property(make_user('owner', 'homeowner'))
+        pending = RentalApplication.objects.create(property=property_obj, applicant=make_user('r1', 'renter'))
+        withdrawn = RentalApplication.objects.create(
+            property=property_obj, applicant=make_user('r2', 'renter'), status='withdrawn'
+        )
+        set_dashboard_summary(pending.applicant_id, {'stale': True})
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('admin:applications_rentalapplication_changelist'), {
+                'action': 'reject_applications',
+                '_selected_action': [pending.id, withdrawn.id],
+            })
+        
+        self.assertEqual(response.status_code, 302)
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "applications_rentalapplication"')]
+        self.assertEqual(len(updates), 1)
+        pending.refresh_from_db()
+        withdrawn.refresh_from_db()
+        self.assertEqual((pending.status, pending.reviewed_by), ('rejected', moderator))
+        self.assertEqual(withdrawn.status, 'withdrawn')
+        self.assertIsNone(get_dashboard_summary(pending.applicant_id))
@@ -4,12 +4,20 @@ from . import views
 urlpatterns = [
     # Application CRUD
     path('', views.RentalApplicationListView.as_view(), name='application_list'),
+    path('inbox/', views.ApplicationInboxView.as_view(), name='application_inbox'),
     path('create/', views.RentalApplicationCreateView.as_view(), name='application_create'),
     path('stats/', views.application_stats_view, name='application_stats'),
+    path('bulk-review/', views.bulk_review_view, name='application_bulk_review'),
+    path('dashboard/summary/', views.dashboard_summary_view, name='dashboard_summary'),
+    path('unread/', views.unread_counts_view, name='application_unread_counts'),
     path('<int:pk>/', views.RentalApplicationDetailView.as_view(), name='application_detail'),
     path('<int:pk>/update/', views.RentalApplicationUpdateView.as_view(), name='application_update'),
     
     # Application messages and documents
     path('<int:application_id>/messages/', views.ApplicationMessagesView.as_view(), name='application_messages'),
+    path('<int:application_id>/messages/stream/', views.application_message_stream_view, name='application_message_stream'),
+    path('<int:application_id>/messages/stream/ticket/', views.message_stream_ticket_view, name='application_message_stream_ticket'),
+    path('<int:application_id>/messages/read/', views.mark_messages_read_view, name='application_messages_read'),
     path('<int:application_id>/documents/', views.ApplicationDocumentsView.as_view(), name='application_documents'),
+    path('<int:application_id>/documents/<int:pk>/download/', views.ApplicationDocumentDownloadView.as_view(), name='application_document_download'),
 ]
@@ -1,45 +1,135 @@
-from rest_framework import generics, status, permissions
+import asyncio
+import json
+import mimetypes
+import os
+import re
+from asgiref.sync import sync_to_async
+from rest_framework import generics, status, permissions, filters
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+from django_filters.rest_framework import DjangoFilterBackend
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q, Sum
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+)
 from django.shortcuts import get_object_or_404
-from properties.models import Property
-from .models import RentalApplication, ApplicationDocument, ApplicationMessage
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date
+from accounts.authentication import CachedJWTAuthentication
+from properties.models import Property, PropertyImage
+from rentify.sideload import SideloadMixin
+from properties.serializers import PropertyCardSerializer
+from .models import (
+    RentalApplication, ApplicationDocument, ApplicationMessage, ApplicationReadCursor,
+    ArchivedApplication, ArchivedApplicationDocument, ArchivedApplicationMessage
+)
 from .serializers import (
-    RentalApplicationListSerializer, RentalApplicationDetailSerializer,
+    RentalApplicationListSerializer, RentalApplicationDetailSerializer, ApplicationInboxSerializer,
     RentalApplicationCreateSerializer, RentalApplicationUpdateSerializer,
     ApplicationMessageSerializer, ApplicationMessageCreateSerializer,
-    ApplicationDocumentSerializer
+    ApplicationDocumentSerializer, BulkReviewSerializer,
+    ArchivedApplicationListSerializer, ArchivedApplicationDetailSerializer,
+    ArchivedApplicationMessageSerializer, ArchivedApplicationDocumentSerializer
 )
+from .access import application_access, property_access, visible_applications, reviewable_applications
+from .cache import get_dashboard_summary, set_dashboard_summary, invalidate_dashboard_summary
+from .pagination import OldestFirstCursorPagination, thread_paginator
+from .realtime import get_broker, issue_stream_ticket, redeem_stream_ticket
+
+STREAM_BACKLOG_PAGE_SIZE = OldestFirstCursorPagination.max_page_size
+
+
+def wants_history(request):
+    # Archived applications are only read when a client explicitly asks.
+    return request.query_params.get('archived', '').lower() == 'true'
+
+
+def filter_before(queryset, request):
+    # ?before=<id> resumes a thread below the rows embedded in the detail view.
+    before = request.query_params.get('before', '')
+    if before.isdigit():
+        queryset = queryset.filter(id__lt=int(before))
+    return queryset
+
 
+def filter_since(queryset, request):
+    # ?since=<id> is the incremental fetch used by reconnecting clients.
+    since = request.query_params.get('since', '')
+    if since.isdigit():
+        queryset = queryset.filter(id__gt=int(since))
+    return queryset
 
-class RentalApplicationListView(generics.ListAPIView):
+
+class RentalApplicationListView(SideloadMixin, generics.ListAPIView):
     
-    serializer_class = RentalApplicationListSerializer
     permission_classes = [permissions.IsAuthenticated]
     
+    def get_serializer_class(self):
+        if wants_history(self.request):
+            return ArchivedApplicationListSerializer
+        return RentalApplicationListSerializer
+    
+    def get_queryset(self):
+        model = ArchivedApplication if wants_history(self.request) else RentalApplication
+        queryset = visible_applications(self.request.user, model)
+        return queryset.select_related('property__owner', 'applicant', 'reviewed_by').prefetch_related('property__images')
+
+
+class ApplicationInboxView(SideloadMixin, generics.ListAPIView):
+    
+    serializer_class = ApplicationInboxSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['status', 'property']
+    ordering_fields = ['submitted_at', 'move_in_date', 'status', 'screening_score']
+    ordering = ['-submitted_at']
+    
     def get_queryset(self):
         user = self.request.user
         if user.role == 'homeowner':
-            return RentalApplication.objects.filter(property__owner=user).select_related('property', 'applicant', 'reviewed_by')
-        elif user.role == 'renter':
-            return RentalApplication.objects.filter(applicant=user).select_related('property', 'applicant', 'reviewed_by')
+            queryset = RentalApplication.objects.filter(property__owner=user)
+        elif user.role == 'admin':
+            queryset = RentalApplication.objects.all()
         else:
-            return RentalApplication.objects.all().select_related('property', 'applicant', 'reviewed_by')
+            raise PermissionDenied("Only homeowners have an application inbox")
+        
+        # One query for the page, one for the primary images of its properties.
+        return queryset.select_related('property__owner', 'applicant', 'reviewed_by').prefetch_related(
+            Prefetch('property__images', queryset=PropertyImage.objects.filter(is_primary=True), to_attr='primary_images')
+        )
 
 
 class RentalApplicationDetailView(generics.RetrieveAPIView):
     
-    serializer_class = RentalApplicationDetailSerializer
     permission_classes = [permissions.IsAuthenticated]
     
+    def get_serializer_class(self):
+        if wants_history(self.request):
+            return ArchivedApplicationDetailSerializer
+        return RentalApplicationDetailSerializer
+    
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'homeowner':
-            return RentalApplication.objects.filter(property__owner=user)
-        elif user.role == 'renter':
-            return RentalApplication.objects.filter(applicant=user)
+        if wants_history(self.request):
+            model, message_model, document_model = ArchivedApplication, ArchivedApplicationMessage, ArchivedApplicationDocument
         else:
-            return RentalApplication.objects.all()
+            model, message_model, document_model = RentalApplication, ApplicationMessage, ApplicationDocument
+        queryset = visible_applications(self.request.user, model)
+        
+        # Sliced prefetches fetch one row past the embed limit so the
+        # serializer can tell whether to emit a *_next link.
+        latest_messages = message_model.objects.select_related('sender').order_by('-id')
+        latest_documents = document_model.objects.order_by('-id')
+        return queryset.select_related('property__owner', 'applicant', 'reviewed_by').prefetch_related(
+            'property__images',
+            Prefetch('messages', queryset=latest_messages[:settings.APPLICATION_DETAIL_MESSAGES + 1], to_attr='latest_messages'),
+            Prefetch('documents', queryset=latest_documents[:settings.APPLICATION_DETAIL_DOCUMENTS + 1], to_attr='latest_documents'),
+        )
 
 
 class RentalApplicationCreateView(generics.CreateAPIView):
@@ -49,7 +139,7 @@ class RentalApplicationCreateView(generics.CreateAPIView):
     
     def perform_create(self, serializer):
         if self.request.user.role != 'renter':
-            raise permissions.PermissionDenied("Only renters can create rental applications")
+            raise PermissionDenied("Only renters can create rental applications")
         serializer.save(applicant=self.request.user)
 
 
@@ -59,18 +149,60 @@ class RentalApplicationUpdateView(generics.UpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'homeowner':
-            return RentalApplication.objects.filter(property__owner=user)
-        elif user.role == 'admin':
-            return RentalApplication.objects.all()
-        else:
-            return RentalApplication.objects.none()
+        return reviewable_applications(self.request.user)
     
     def perform_update(self, serializer):
         serializer.save(reviewed_by=self.request.user)
 
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_review_view(request):
+    
+    serializer = BulkReviewSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+    user = request.user
+    
+    if not property_access(request, data['property']).can_manage():
+        raise Http404('No property matches the given query.')
+    
+    with transaction.atomic():
+        # Lock the property and its applications so concurrent reviews of the
+        # same listing serialise instead of approving two applicants.
+        property_obj = get_object_or_404(Property.objects.select_for_update(), id=data['property'])
+        applications = list(
+            reviewable_applications(user).select_for_update().filter(property=property_obj).exclude(status='withdrawn')
+        )
+        if data['approved_application'] not in {application.id for application in applications}:
+            return Response({'error': 'Application not found for this property'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        reviewed_at = timezone.now()
+        for application in applications:
+            if application.id == data['approved_application']:
+                application.status = 'approved'
+            else:
+                application.status = data['others_status']
+            application.reviewed_by = user
+            application.reviewed_at = reviewed_at
+        RentalApplication.objects.bulk_update(applications, ['status', 'reviewed_by', 'reviewed_at'])
+        
+        if data['mark_property_rented']:
+            Property.objects.filter(id=property_obj.id).update(status='rented')
+            property_obj.status = 'rented'
+    
+    # bulk_update() and update() skip the post_save handlers in signals.py.
+    invalidate_dashboard_summary(property_obj.owner_id, *(application.applicant_id for application in applications))
+    
+    return Response({
+        'property': property_obj.id,
+        'property_status': property_obj.status,
+        'approved_application': data['approved_application'],
+        'updated_applications': len(applications),
+        'others_status': data['others_status'],
+    }, status=status.HTTP_200_OK)
+
+
 class PropertyApplicationsView(generics.ListAPIView):
     
     serializer_class = RentalApplicationListSerializer
@@ -79,62 +211,326 @@ class PropertyApplicationsView(generics.ListAPIView):
     def get_queryset(self):
         property_id = self.kwargs['property_id']
         property_obj = get_object_or_404(Property, id=property_id, owner=self.request.user)
-        return RentalApplication.objects.filter(property=property_obj).select_related('applicant', 'reviewed_by')
+        return RentalApplication.objects.filter(property=property_obj).select_related(
+            'property__owner', 'applicant', 'reviewed_by'
+        ).prefetch_related('property__images')
 
 
-class ApplicationMessagesView(generics.ListCreateAPIView):
+class ApplicationMessagesView(SideloadMixin, generics.ListCreateAPIView):
     
     permission_classes = [permissions.IsAuthenticated]
+    filter_backends = []
+    
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            self._paginator = thread_paginator(self.request)
+        return self._paginator
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return ApplicationMessageCreateSerializer
+        if wants_history(self.request):
+            return ArchivedApplicationMessageSerializer
         return ApplicationMessageSerializer
     
     def get_queryset(self):
-        application_id = self.kwargs['application_id']
-        application = get_object_or_404(RentalApplication, id=application_id)
-        
-        user = self.request.user
-        if not (user == application.applicant or user == application.property.owner or user.role == 'admin'):
-            raise permissions.PermissionDenied("You don't have permission to view this application")
+        history = wants_history(self.request)
+        access = application_access(
+            self.request, self.kwargs['application_id'], ArchivedApplication if history else RentalApplication
+        )
+        if not access.can_view():
+            raise PermissionDenied("You don't have permission to view this application")
         
-        return ApplicationMessage.objects.filter(application=application).select_related('sender')
+        message_model = ArchivedApplicationMessage if history else ApplicationMessage
+        queryset = message_model.objects.filter(application=access.application).select_related('sender')
+        return filter_since(filter_before(queryset, self.request), self.request)
     
     def perform_create(self, serializer):
-        application_id = self.kwargs['application_id']
-        application = get_object_or_404(RentalApplication, id=application_id)
+        access = application_access(self.request, self.kwargs['application_id'])
+        if not access.can_message():
+            raise PermissionDenied("You don't have permission to send messages for this application")
         
-        user = self.request.user
-        if not (user == application.applicant or user == application.property.owner):
-            raise permissions.PermissionDenied("You don't have permission to send messages for this application")
-        
-        serializer.save(application=application)
+        application = access.application
+        message = serializer.save(application=application)
+        payload = ApplicationMessageSerializer(message, context={'request': self.request}).data
+        transaction.on_commit(lambda: get_broker().publish(application.id, payload), robust=True)
+
+
+def _stream_user_id(request, application_id):
+    # Browsers open the stream with ?ticket= from the ticket endpoint; other
+    # clients may send their access token in the Authorization header.
+    ticket = request.GET.get('ticket')
+    if ticket is not None:
+        return redeem_stream_ticket(ticket, application_id)
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    if result is None:
+        return None
+    request.user = result[0]
+    return request.user.id if application_access(request, application_id).can_view() else None
+
+
+def _stream_backlog(request, application_id, since):
+    # One page of the catch-up; the stream keeps fetching until a short page.
+    messages = ApplicationMessage.objects.filter(
+        application_id=application_id, id__gt=since
+    ).select_related('sender').order_by('id')[:STREAM_BACKLOG_PAGE_SIZE]
+    return ApplicationMessageSerializer(messages, many=True, context={'request': request}).data
+
+
+def _sse_event(payload):
+    return f"id: {payload['id']}\nevent: message\ndata: {json.dumps(payload)}\n\n"
+
+
+async def application_message_stream_view(request, application_id):
+    """
+    Server-Sent Events feed of new messages for one application.
+
+    Needs ASGI (rentify/asgi.py). After the initial auth and permission check
+    the only database access is a catch-up query for messages after ?since=
+    or Last-Event-ID; everything else arrives through the message broker.
+    """
+    
+    user_id = await sync_to_async(_stream_user_id)(request, application_id)
+    if user_id is None:
+        return HttpResponseForbidden()
+    
+    since = request.GET.get('since') or request.headers.get('Last-Event-ID', '')
+    since = int(since) if since.isdigit() else None
+    
+    async def events():
+        last_id = since or 0
+        async with get_broker().subscribe(application_id) as messages:
+            # Subscribe before replaying so nothing posted in between is lost.
+            while since is not None:
+                backlog = await sync_to_async(_stream_backlog)(request, application_id, last_id)
+                for payload in backlog:
+                    last_id = payload['id']
+                    yield _sse_event(payload)
+                if len(backlog) < STREAM_BACKLOG_PAGE_SIZE:
+                    break
+            
+            next_message = asyncio.ensure_future(anext(messages))
+            try:
+                while True:
+                    done, _ = await asyncio.wait({next_message}, timeout=settings.MESSAGE_STREAM_HEARTBEAT)
+                    if not done:
+                        yield ': keep-alive\n\n'
+                        continue
+                    payload = next_message.result()
+                    next_message = asyncio.ensure_future(anext(messages))
+                    if payload['id'] > last_id:
+                        last_id = payload['id']
+                        yield _sse_event(payload)
+            finally:
+                next_message.cancel()
+    
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def message_stream_ticket_view(request, application_id):
+    
+    if not application_access(request, application_id).can_view():
+        raise PermissionDenied("You don't have permission to view this application")
+    return Response({
+        'ticket': issue_stream_ticket(request.user, application_id),
+        'expires_in': settings.MESSAGE_STREAM_TICKET_MAX_AGE,
+    })
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def mark_messages_read_view(request, application_id):
+    
+    access = application_access(request, application_id)
+    application, user = access.application, request.user
+    if not access.can_message():
+        return Response({'error': "You don't have permission to view this application"}, status=status.HTTP_403_FORBIDDEN)
+    
+    messages = ApplicationMessage.objects.filter(application=application)
+    message_id = request.data.get('message_id')
+    if message_id is None:
+        message_id = messages.order_by('-id').values_list('id', flat=True).first() or 0
+    elif not str(message_id).isdigit() or not messages.filter(id=message_id).exists():
+        # Otherwise a large id would mark messages not yet sent as read.
+        return Response({'error': 'message_id must be a message of this application'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    with transaction.atomic():
+        ApplicationReadCursor.objects.bulk_create(
+            [ApplicationReadCursor(application=application, user=user)], ignore_conflicts=True,
+        )
+        # The lock orders this recount with the unread_count increments in
+        # ApplicationMessageCreateSerializer, so neither overwrites the other.
+        cursor = ApplicationReadCursor.objects.select_for_update().get(application=application, user=user)
+        cursor.last_read_message_id = max(cursor.last_read_message_id, int(message_id))
+        cursor.unread_count = messages.filter(id__gt=cursor.last_read_message_id).exclude(sender=user).count()
+        cursor.save(update_fields=['last_read_message_id', 'unread_count', 'updated_at'])
+    
+    return Response({
+        'application': application.id,
+        'last_read_message_id': cursor.last_read_message_id,
+        'unread_count': cursor.unread_count,
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def unread_counts_view(request):
+    
+    # Served from the (user, unread_count) index; counts are kept current by
+    # ApplicationMessageCreateSerializer and mark_messages_read_view.
+    counts = dict(
+        ApplicationReadCursor.objects.filter(user=request.user, unread_count__gt=0)
+        .values_list('application_id', 'unread_count')
+    )
+    return Response({
+        'total_unread': sum(counts.values()),
+        'applications': counts,
+    })
 
 
 class ApplicationDocumentsView(generics.ListCreateAPIView):
     
-    serializer_class = ApplicationDocumentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    filter_backends = []
+    
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            self._paginator = thread_paginator(self.request)
+        return self._paginator
+    
+    def get_serializer_class(self):
+        if self.request.method == 'GET' and wants_history(self.request):
+            return ArchivedApplicationDocumentSerializer
+        return ApplicationDocumentSerializer
     
     def get_queryset(self):
-        application_id = self.kwargs['application_id']
-        application = get_object_or_404(RentalApplication, id=application_id)
-        
-        user = self.request.user
-        if not (user == application.applicant or user == application.property.owner or user.role == 'admin'):
-            raise permissions.PermissionDenied("You don't have permission to view this application")
+        history = wants_history(self.request)
+        access = application_access(
+            self.request, self.kwargs['application_id'], ArchivedApplication if history else RentalApplication
+        )
+        if not access.can_view():
+            raise PermissionDenied("You don't have permission to view this application")
         
-        return ApplicationDocument.objects.filter(application=application)
+        document_model = ArchivedApplicationDocument if history else ApplicationDocument
+        return filter_before(document_model.objects.filter(application=access.application), self.request)
     
     def perform_create(self, serializer):
-        application_id = self.kwargs['application_id']
-        application = get_object_or_404(RentalApplication, id=application_id)
+        access = application_access(self.request, self.kwargs['application_id'])
+        if not access.can_upload():
+            raise PermissionDenied("Only the applicant can upload documents")
+        
+        serializer.save(application=access.application)
+
+
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _parse_range(header, size):
+    # Single byte ranges only; anything else falls back to the whole file.
+    match = RANGE_HEADER.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if start == '':
+        start, end = size - min(int(end), size), size - 1
+    else:
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def _file_range(file, start, length, chunk_size=64 * 1024):
+    try:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+class ApplicationDocumentDownloadView(APIView):
+    
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request, application_id, pk):
+        if not application_access(request, application_id).can_view():
+            raise PermissionDenied("You don't have permission to view this application")
+        document = get_object_or_404(ApplicationDocument, id=pk, application_id=application_id)
+        
+        # Uploaded documents are never rewritten in place, so the upload time
+        # is a stable validator.
+        last_modified = int(document.uploaded_at.timestamp())
+        etag = f'"{document.id}-{last_modified}"'
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = self.offload(document) or self.stream(request, document, etag, last_modified)
+        
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+    
+    def offload(self, document):
+        server = settings.PROTECTED_MEDIA_SERVER
+        if server not in ('nginx', 'sendfile'):
+            return None
+        
+        # The front server does the transfer, including Range handling.
+        response = HttpResponse(content_type=mimetypes.guess_type(document.file.name)[0] or 'application/octet-stream')
+        if server == 'nginx':
+            response['X-Accel-Redirect'] = settings.PROTECTED_MEDIA_INTERNAL_URL + document.file.name
+        else:
+            response['X-Sendfile'] = document.file.path
+        response['Content-Disposition'] = content_disposition_header(True, os.path.basename(document.file.name))
+        return response
+    
+    def stream(self, request, document, etag, last_modified):
+        size = document.file.size
+        content_type = mimetypes.guess_type(document.file.name)[0] or 'application/octet-stream'
+        
+        range_header = request.META.get('HTTP_RANGE')
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if if_range and if_range not in (etag, http_date(last_modified)):
+            range_header = None
         
-        if self.request.user != application.applicant:
-            raise permissions.PermissionDenied("Only the applicant can upload documents")
+        try:
+            byte_range = _parse_range(range_header, size) if range_header else None
+        except ValueError:
+            response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
         
-        serializer.save(application=application)
+        file = document.file.storage.open(document.file.name, 'rb')
+        if byte_range is None:
+            response = FileResponse(file, content_type=content_type)
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                _file_range(file, start, end - start + 1),
+                status=status.HTTP_206_PARTIAL_CONTENT,
+                content_type=content_type,
+            )
+            response['Content-Length'] = str(end - start + 1)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        
+        response['Accept-Ranges'] = 'bytes'
+        response['Content-Disposition'] = content_disposition_header(True, os.path.basename(document.file.name))
+        return response
 
 
 @api_view(['GET'])
@@ -180,4 +576,67 @@ def application_stats_view(request):
             'pending_applications': pending_applications,
             'approved_applications': approved_applications,
             'rejected_applications': rejected_applications,
-        })
\ No newline at end of file
+        })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def dashboard_summary_view(request):
+    # Homeowners cost six queries (application counts, recent applications and
+    # their images, property totals, property cards and their images), renters
+    # three. Per-user summaries are dropped by the handlers in signals.py; admin
+    # summaries span the whole site and are always computed fresh.
+    
+    user = request.user
+    cacheable = user.role in ('homeowner', 'renter')
+    
+    if cacheable:
+        data = get_dashboard_summary(user.id)
+        if data is not None:
+            return Response(data)
+    
+    if user.role == 'homeowner':
+        applications = RentalApplication.objects.filter(property__owner=user)
+    elif user.role == 'renter':
+        applications = RentalApplication.objects.filter(applicant=user)
+    else:
+        applications = RentalApplication.objects.all()
+    
+    month_start = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    counts = applications.aggregate(
+        total_applications=Count('id'),
+        pending_applications=Count('id', filter=Q(status='pending')),
+        approved_applications=Count('id', filter=Q(status='approved')),
+        rejected_applications=Count('id', filter=Q(status='rejected')),
+        applications_this_month=Count('id', filter=Q(submitted_at__gte=month_start)),
+    )
+    
+    recent_applications = applications.select_related(
+        'property__owner', 'applicant', 'reviewed_by'
+    ).prefetch_related('property__images').order_by('-submitted_at')[:settings.DASHBOARD_RECENT_APPLICATIONS]
+    
+    properties = []
+    if user.role == 'homeowner':
+        owned = Property.objects.filter(owner=user)
+        totals = owned.aggregate(total_properties=Count('id'), total_monthly_rent=Sum('monthly_rent'))
+        counts['total_properties'] = totals['total_properties']
+        counts['total_monthly_rent'] = float(totals['total_monthly_rent']) if totals['total_monthly_rent'] else 0
+        
+        cards = owned.select_related('owner').prefetch_related('images').annotate(
+            application_count=Count('applications')
+        ).order_by('-created_at')[:settings.DASHBOARD_PROPERTY_CARDS]
+        properties = PropertyCardSerializer(cards, many=True, context={'request': request}).data
+    
+    data = {
+        'role': user.role,
+        'counts': counts,
+        'recent_applications': RentalApplicationListSerializer(
+            recent_applications, many=True, context={'request': request}
+        ).data,
+        'properties': properties,
+    }
+    
+    if cacheable:
+        set_dashboard_summary(user.id, data)
+    
+    return Response(data)
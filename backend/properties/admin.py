@@ -1,17 +1,78 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from applications.cache import invalidate_dashboard_summary
+from applications.models import RentalApplication
+from rentify.admin_tools import LargeTableAdmin
 from .models import Property, PropertyImage, PropertyAmenity
 
+
+def _update_properties(modeladmin, request, queryset, done, **fields):
+    # One UPDATE for the whole selection. update() skips the post_save
+    # handlers in applications/signals.py, so dashboards are dropped here.
+    # The ids are read first: the queryset keeps the changelist filters,
+    # which the update can make it stop matching.
+    owner_ids = list(queryset.values_list('owner_id', flat=True))
+    applicant_ids = list(
+        RentalApplication.objects.filter(property__in=queryset).values_list('applicant_id', flat=True)
+    )
+    updated = queryset.update(**fields)
+    invalidate_dashboard_summary(*owner_ids, *applicant_ids)
+    modeladmin.message_user(request, f'{updated} properties {done}.', messages.SUCCESS)
+
+
+@admin.action(description='Approve selected properties')
+def approve_properties(modeladmin, request, queryset):
+    _update_properties(modeladmin, request, queryset, 'approved', is_approved=True)
+
+
+@admin.action(description='Reject selected properties')
+def reject_properties(modeladmin, request, queryset):
+    _update_properties(modeladmin, request, queryset, 'rejected', is_approved=False)
+
+
+def _status_action(status, label):
+    
+    def action(modeladmin, request, queryset):
+        _update_properties(modeladmin, request, queryset, f'marked {label.lower()}', status=status)
+    
+    # Django tells actions apart by function name.
+    action.__name__ = f'mark_{status}'
+    return admin.action(description=f'Mark selected properties as {label.lower()}')(action)
+
+
 @admin.register(Property)
-class PropertyAdmin(admin.ModelAdmin):
+class PropertyAdmin(LargeTableAdmin):
+    
     list_display = ('title', 'owner', 'city', 'state', 'monthly_rent', 'is_approved', 'status')
     list_filter = ('is_approved', 'status', 'property_type')
-    list_editable = ('is_approved', 'status')  # Allow quick editing
-    search_fields = ('title', 'city', 'state')
+    list_select_related = ('owner',)
+    # Moderation and status changes go through the bulk actions rather than
+    # list_editable, which posts a formset and saves every row on the page
+    # one by one.
+    actions = (
+        approve_properties, reject_properties,
+        *(_status_action(status, label) for status, label in Property.STATUS_CHOICES),
+    )
+    raw_id_fields = ('owner',)
+    # Prefix matches (istartswith) instead of icontains, which has to scan
+    # every row; migration 0003 adds the indexes these use. Also what the
+    # property autocomplete widgets search with.
+    search_fields = ('^title', '^city', '^state')
+
 
 @admin.register(PropertyImage)
-class PropertyImageAdmin(admin.ModelAdmin):
+class PropertyImageAdmin(LargeTableAdmin):
+    
     list_display = ('property', 'image', 'is_primary')
+    # Spelled out rather than left to Django's list_display guess, so the
+    # changelist and the action confirmation pages (which call __str__, and
+    # so property.title, per row) keep the join if the columns change.
+    list_select_related = ('property',)
+    autocomplete_fields = ('property',)
+
 
 @admin.register(PropertyAmenity)
-class PropertyAmenityAdmin(admin.ModelAdmin):
-    list_display = ('property', 'name')
\ No newline at end of file
+class PropertyAmenityAdmin(LargeTableAdmin):
+    
+    list_display = ('property', 'name')
+    list_select_related = ('property',)
+    autocomplete_fields = ('property',)
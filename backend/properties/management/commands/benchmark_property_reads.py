@@ -0,0 +1,67 @@
+import asyncio
+import json
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from properties.models import Property
+from rentify.benchmarking import run_concurrent, run_threaded
+
+ENDPOINTS = {
+    'list': ('property_list', 'property_list_async'),
+    'search': ('property_search', 'property_search_async'),
+    'detail': ('property_detail', 'property_detail_async'),
+    'stats': ('property_stats', 'property_stats_async'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the sync and async property read endpoints in-process with the same '
+        'concurrency and report throughput and latency for each as JSON.'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8,
+                            help='Threads for the sync stack, in-flight requests for the async one.')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint and stack.')
+        parser.add_argument('--endpoints', default=','.join(ENDPOINTS))
+        parser.add_argument('--query', default='', help="Query string for list and search, e.g. 'city=Austin'.")
+    
+    def handle(self, *args, **options):
+        endpoints = [name.strip() for name in options['endpoints'].split(',') if name.strip()]
+        unknown = set(endpoints) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+        workers, total = options['workers'], options['requests']
+        
+        results = []
+        # Rate limits would turn most of the run into 429s.
+        with override_settings(RATE_LIMITS={}, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for name in endpoints:
+                sync_path, async_path = self.paths(name, options['query'])
+                
+                async def fetch_async(client, index):
+                    return (await client.get(async_path)).status_code
+                
+                results.append({
+                    'endpoint': name,
+                    'sync': run_threaded(
+                        lambda: Client(raise_request_exception=False),
+                        lambda client, index: client.get(sync_path).status_code,
+                        workers, total,
+                    ),
+                    'async': asyncio.run(run_concurrent(AsyncClient(raise_request_exception=False), fetch_async, workers, total)),
+                })
+        
+        self.stdout.write(json.dumps({'workers': workers, 'requests': total, 'results': results}))
+    
+    def paths(self, name, query):
+        sync_name, async_name = ENDPOINTS[name]
+        if name == 'detail':
+            property_id = Property.objects.filter(is_approved=True).values_list('id', flat=True).first()
+            if property_id is None:
+                raise CommandError('No approved properties to fetch; seed the database first.')
+            return reverse(sync_name, args=[property_id]), reverse(async_name, args=[property_id])
+        suffix = f'?{query}' if query and name in ('list', 'search') else ''
+        return reverse(sync_name) + suffix, reverse(async_name) + suffix
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:20
+
+from django.db import migrations
+
+# Columns PropertyAdmin searches with '^' (istartswith).
+SEARCH_COLUMNS = ['title', 'city', 'state']
+
+
+def _index_name(column):
+    return f'property_{column}_prefix_idx'
+
+
+def create_prefix_search_indexes(apps, schema_editor):
+    # istartswith compiles to UPPER("col"::text) LIKE UPPER('term%') on
+    # PostgreSQL, which only an index on that expression with a pattern
+    # opclass can serve, and to "col" LIKE 'term%' on SQLite, which needs a
+    # NOCASE index. Model Meta.indexes cannot express either per backend.
+    vendor = schema_editor.connection.vendor
+    for column in SEARCH_COLUMNS:
+        if vendor == 'postgresql':
+            expression = f'UPPER("{column}"::text) text_pattern_ops'
+        elif vendor == 'sqlite':
+            expression = f'"{column}" COLLATE NOCASE'
+        else:
+            return
+        schema_editor.execute(f'CREATE INDEX "{_index_name(column)}" ON "properties_property" ({expression})')
+
+
+def drop_prefix_search_indexes(apps, schema_editor):
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{_index_name(column)}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0002_property_location'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_search_indexes, drop_prefix_search_indexes),
+    ]
@@ -1,7 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
-from .utils.geocoding import geocode_address
 User = get_user_model()
 
 
@@ -69,6 +68,7 @@ class Property(models.Model):
 
     # def save(self, *args, **kwargs):
     #     if not self.latitude or not self.longitude:
+    #         from .utils.geocoding import geocode_address
     #         lat, lon = geocode_address(self.location)
     #         self.latitude = lat
     #         self.longitude = lon
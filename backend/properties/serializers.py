@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Property, PropertyImage, PropertyAmenity
 from accounts.serializers import UserSerializer
+from rentify.sideload import SideloadedSerializerMixin
 from .utils.geocoding import geocode_address
 
 class PropertyImageSerializer(serializers.ModelSerializer):
@@ -17,8 +18,9 @@ class PropertyAmenitySerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'description')
 
 
-class PropertyListSerializer(serializers.ModelSerializer):
+class PropertyListSerializer(SideloadedSerializerMixin, serializers.ModelSerializer):
     
+    sideload_as = 'properties'
     owner = UserSerializer(read_only=True)
     primary_image = serializers.SerializerMethodField()
     image_count = serializers.SerializerMethodField()
@@ -30,7 +32,8 @@ class PropertyListSerializer(serializers.ModelSerializer):
                  'owner', 'primary_image', 'image_count', 'created_at', 'latitude', 'longitude', 'square_feet')
     
     def get_primary_image(self, obj):
-        primary_image = obj.images.filter(is_primary=True).first()
+        # Walk images.all() so a prefetch_related('images') on the queryset is reused.
+        primary_image = next((image for image in obj.images.all() if image.is_primary), None)
         if primary_image:
             request = self.context.get('request')
             if request:
@@ -42,6 +45,38 @@ class PropertyListSerializer(serializers.ModelSerializer):
         return obj.images.count()
 
 
+class PropertyCardSerializer(PropertyListSerializer):
+    
+    application_count = serializers.IntegerField(read_only=True)
+    
+    class Meta(PropertyListSerializer.Meta):
+        fields = PropertyListSerializer.Meta.fields + ('application_count',)
+
+
+class PropertySummarySerializer(SideloadedSerializerMixin, serializers.ModelSerializer):
+    
+    sideload_as = 'properties'
+    owner_name = serializers.CharField(source='owner.full_name', read_only=True)
+    primary_image = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Property
+        fields = ('id', 'title', 'property_type', 'city', 'state', 'monthly_rent', 'status',
+                 'owner', 'owner_name', 'primary_image')
+    
+    def get_primary_image(self, obj):
+        # Expects Prefetch('images', queryset=<primary images>, to_attr='primary_images').
+        primary_images = getattr(obj, 'primary_images', None)
+        if primary_images is None:
+            primary_images = [image for image in obj.images.all() if image.is_primary]
+        if primary_images:
+            request = self.context.get('request')
+            if request:
+                return request.build_absolute_uri(primary_images[0].image.url)
+            return primary_images[0].image.url
+        return None
+
+
 class PropertyDetailSerializer(serializers.ModelSerializer):
     
     owner = UserSerializer(read_only=True)
@@ -56,6 +91,9 @@ class PropertyDetailSerializer(serializers.ModelSerializer):
         read_only_fields = ('owner', 'created_at', 'updated_at', 'is_approved')
     
     def get_application_count(self, obj):
+        # PropertyDetailView annotates the count; the async detail view relies on it.
+        if hasattr(obj, 'num_applications'):
+            return obj.num_applications
         return obj.applications.count()
 
 class PropertyCreateUpdateSerializer(serializers.ModelSerializer):
@@ -76,20 +114,8 @@ class PropertyCreateUpdateSerializer(serializers.ModelSerializer):
         
         # AUTO-APPROVE FOR DEVELOPMENT
         validated_data['is_approved'] = True
-
-        full_address = f"{validated_data.get('address', '')}, {validated_data.get('city', '')}, {validated_data.get('state', '')}"
-        lat, lon = geocode_address(full_address)
-          # 🌍 Geocode address before creating
-        full_address = f"{validated_data.get('address', '')}, {validated_data.get('city', '')}, {validated_data.get('state', '')}"
-        lat, lon = geocode_address(full_address)
-
-        # 🪄 Debug print (you’ll see this in your terminal)
-        print(f"[🛰️ GEOCODING CREATE] Address: {full_address} → lat: {lat}, lon: {lon}")
-
-
-        validated_data['latitude'] = lat
-        validated_data['longitude'] = lon
-
+        # latitude and longitude come from property_create_view, which
+        # geocodes the address without holding a thread.
 
         property_obj = Property.objects.create(**validated_data)
         
@@ -1,3 +1,241 @@
-from django.test import TestCase
+from io import StringIO
+import json
+from unittest import skipUnless
+from unittest.mock import patch
+import httpx
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from applications.cache import get_dashboard_summary, set_dashboard_summary
+from applications.models import RentalApplication
+from applications.tests import make_property, make_user
+from rentify.throttling import get_bucket_store
+from .models import Property
+from .utils.geocoding import HEADERS, ageocode_address
 
-# Create your tests here.
+
+@override_settings(RATE_LIMITS={'search': {'ip': '2/minute'}, 'stats': {'ip': '1/minute'}})
+class PublicRateLimitTests(APITestCase):
+    
+    def setUp(self):
+        get_bucket_store.cache_clear()
+    
+    def test_anonymous_search_and_stats_are_throttled_per_ip(self):
+        with self.assertLogs('rentify.throttling', 'WARNING') as logs:
+            statuses = [self.client.get(reverse('property_search')).status_code for _ in range(3)]
+            self.assertEqual(statuses, [200, 200, 429])
+            
+            self.assertEqual(self.client.get(reverse('property_stats')).status_code, 200)
+            with self.assertNumQueries(0):
+                self.assertEqual(self.client.get(reverse('property_stats')).status_code, 429)
+        self.assertEqual(len(logs.records), 2)
+        
+        other_ip = self.client.get(reverse('property_search'), REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(other_ip.status_code, 200)
+    
+    def test_forwarded_for_is_ignored_without_trusted_proxies(self):
+        with self.assertLogs('rentify.throttling', 'WARNING'):
+            statuses = [
+                self.client.get(reverse('property_search'), HTTP_X_FORWARDED_FOR=f'203.0.113.{i}').status_code
+                for i in range(3)
+            ]
+        self.assertEqual(statuses, [200, 200, 429])
+    
+    def test_one_trusted_proxy_uses_the_address_it_appended(self):
+        with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}):
+            with self.assertLogs('rentify.throttling', 'WARNING'):
+                statuses = [
+                    self.client.get(
+                        reverse('property_search'), HTTP_X_FORWARDED_FOR=f'203.0.113.{i}, 198.51.100.7'
+                    ).status_code
+                    for i in range(3)
+                ]
+            self.assertEqual(statuses, [200, 200, 429])
+            other_client = self.client.get(reverse('property_search'), HTTP_X_FORWARDED_FOR='198.51.100.8')
+            self.assertEqual(other_client.status_code, 200)
+
+
+@override_settings(RATE_LIMITS={})
+class AsyncReadViewTests(APITestCase):
+    
+    def setUp(self):
+        self.owner = make_user('owner', 'homeowner')
+        self.flat = make_property(self.owner, 'Flat', city='Adama', monthly_rent=900)
+        make_property(self.owner, 'House', property_type='house', monthly_rent=2000, has_parking=True)
+        make_property(self.owner, 'Hidden', is_approved=False)
+    
+    def assertSameResponse(self, sync_name, async_name, args=(), query=None):
+        sync_response = self.client.get(reverse(sync_name, args=args), query)
+        async_response = self.client.get(reverse(async_name, args=args), query)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response.json(), sync_response.json())
+        return async_response
+    
+    def test_async_list_search_and_stats_match_sync_views(self):
+        response = self.assertSameResponse('property_list', 'property_list_async')
+        self.assertEqual(response.json()['count'], 2)
+        self.assertSameResponse('property_list', 'property_list_async', query={'city': 'Adama', 'normalized': 'true'})
+        self.assertSameResponse('property_list', 'property_list_async', query={'has_parking': 'true', 'ordering': 'monthly_rent'})
+        self.assertSameResponse('property_list', 'property_list_async', query={'page': 5})
+        self.assertSameResponse('property_search', 'property_search_async', query={'search': 'house'})
+        self.assertSameResponse('property_stats', 'property_stats_async')
+    
+    def test_async_detail_matches_sync_view(self):
+        response = self.assertSameResponse('property_detail', 'property_detail_async', args=[self.flat.id])
+        self.assertEqual(response.json()['application_count'], 0)
+        self.assertSameResponse('property_detail', 'property_detail_async', args=[999])
+
+
+@override_settings(RATE_LIMITS={})
+class PropertyReadBenchmarkTests(TransactionTestCase):
+    # Committed rows, so the benchmark's worker threads can read them.
+    
+    def test_benchmark_command_reports_both_stacks(self):
+        make_property(make_user('owner', 'homeowner'))
+        out = StringIO()
+        call_command('benchmark_property_reads', requests=4, workers=2, endpoints='list,detail', stdout=out)
+        results = json.loads(out.getvalue())['results']
+        self.assertEqual([result['endpoint'] for result in results], ['list', 'detail'])
+        for result in results:
+            self.assertEqual((result['sync']['errors'], result['async']['errors']), (0, 0))
+
+
+class AsyncGeocodingTests(APITestCase):
+    
+    def test_ageocode_address_parses_first_result(self):
+        requests = []
+        
+        def respond(request):
+            requests.append(request)
+            return httpx.Response(200, json=[{'lat': '9.03', 'lon': '38.74'}])
+        
+        async def geocode():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(respond)) as client:
+                return await ageocode_address('Addis Ababa', client)
+        
+        self.assertEqual(async_to_sync(geocode)(), (9.03, 38.74))
+        self.assertEqual(requests[0].headers['User-Agent'], HEADERS['User-Agent'])
+    
+    def test_create_geocodes_on_the_async_client(self):
+        owner = make_user('owner', 'homeowner')
+        self.client.force_authenticate(owner)
+        with patch('properties.views.ageocode_address', return_value=(9.03, 38.74)) as geocode:
+            response = self.client.post(reverse('property_create'), {
+                'title': 'New flat', 'description': 'A place', 'property_type': 'apartment',
+                'address': '1 Main St', 'city': 'Adama', 'state': 'OR', 'zip_code': '1000',
+                'bedrooms': 2, 'bathrooms': 1, 'monthly_rent': 1000, 'available_from': '2025-01-01',
+            })
+        
+        self.assertEqual(response.status_code, 201, response.content)
+        geocode.assert_awaited_once_with('1 Main St, Adama, OR')
+        property_obj = Property.objects.get(pk=response.json()['id'])
+        self.assertEqual((property_obj.owner, float(property_obj.latitude), float(property_obj.longitude)), (owner, 9.03, 38.74))
+        
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.post(reverse('property_create'), {}).status_code, 401)
+
+
+
+class PropertyAdminTests(APITestCase):
+    
+    def setUp(self):
+        self.moderator = make_user('moderator', 'admin')
+        self.moderator.is_staff = self.moderator.is_superuser = True
+        self.moderator.save()
+        self.client.force_login(self.moderator)
+        self.owner = make_user('owner', 'homeowner')
+    
+    def table_queries(self, queries, prefix, table='properties_property'):
+        return [query['sql'] for query in queries if query['sql'].startswith(prefix) and f'"{table}"' in query['sql']]
+    
+    def test_changelists_run_the_same_queries_for_more_rows(self):
+        make_property(self.owner, 'First')
+        for url_name in ('admin:properties_property_changelist', 'admin:properties_propertyimage_changelist'):
+            with self.subTest(url_name):
+                self.client.get(reverse(url_name))
+                with CaptureQueriesContext(connection) as few:
+                    self.assertEqual(self.client.get(reverse(url_name)).status_code, 200)
+                for index in range(4):
+                    make_property(self.owner, f'More {index}')
+                with CaptureQueriesContext(connection) as many:
+                    self.assertEqual(self.client.get(reverse(url_name)).status_code, 200)
+                self.assertEqual(len(many), len(few))
+    
+    def test_bulk_approve_is_a_single_update(self):
+        properties = [make_property(self.owner, f'Flat {index}', is_approved=False) for index in range(3)]
+        set_dashboard_summary(self.owner.id, {'stale': True})
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('admin:properties_property_changelist'), {
+                'action': 'approve_properties',
+                '_selected_action': [property_obj.id for property_obj in properties],
+            })
+        
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(self.table_queries(queries, 'UPDATE')), 1)
+        self.assertEqual(Property.objects.filter(is_approved=True).count(), 3)
+        self.assertIsNone(get_dashboard_summary(self.owner.id))
+    
+    def test_status_action_is_a_single_update(self):
+        properties = [make_property(self.owner, f'Flat {index}') for index in range(3)]
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('admin:properties_property_changelist'), {
+                'action': 'mark_rented',
+                '_selected_action': [property_obj.id for property_obj in properties[:2]],
+            })
+        
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(self.table_queries(queries, 'UPDATE')), 1)
+        self.assertEqual(list(Property.objects.order_by('id').values_list('status', flat=True)),
+                         ['rented', 'rented', 'available'])
+    
+    def test_actions_on_a_filtered_changelist_drop_the_dashboards(self):
+        property_obj = make_property(self.owner, 'Flat', is_approved=False)
+        renter = make_user('renter', 'renter')
+        RentalApplication.objects.create(property=property_obj, applicant=renter)
+        set_dashboard_summary(self.owner.id, {'stale': True})
+        set_dashboard_summary(renter.id, {'stale': True})
+        
+        # The action's queryset keeps the filter, which the update makes it stop matching.
+        url = reverse('admin:properties_property_changelist') + '?is_approved__exact=0'
+        response = self.client.post(url, {'action': 'approve_properties', '_selected_action': [property_obj.id]})
+        
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Property.objects.get(id=property_obj.id).is_approved)
+        self.assertIsNone(get_dashboard_summary(self.owner.id))
+        self.assertIsNone(get_dashboard_summary(renter.id))
+    
+    @skipUnless(connection.vendor == 'sqlite', 'checks the SQLite plan for the NOCASE indexes')
+    def test_prefix_search_uses_the_search_indexes(self):
+        make_property(self.owner, 'Flat')
+        response = self.client.get(reverse('admin:properties_property_changelist'), {'q': 'fla'})
+        self.assertEqual(response.context['cl'].result_count, 1)
+        
+        plan = response.context['cl'].queryset.order_by().explain()
+        for column in ('title', 'city', 'state'):
+            self.assertIn(f'INDEX property_{column}_prefix_idx', plan)
+    
+    @override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=1)
+    def test_unfiltered_changelist_uses_the_planner_estimate(self):
+        for index in range(3):
+            make_property(self.owner, f'Flat {index}')
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        for index in range(2):
+            make_property(self.owner, f'New {index}')
+        url = reverse('admin:properties_property_changelist')
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.context['cl'].result_count, 3)
+        self.assertEqual(self.table_queries(queries, 'SELECT COUNT(*)'), [])
+        
+        # Filtered changelists count exactly.
+        response = self.client.get(url, {'is_approved__exact': '1'})
+        self.assertEqual(response.context['cl'].result_count, 5)
@@ -5,7 +5,11 @@ urlpatterns = [
     path('', views.PropertyListView.as_view(), name='property_list'),
     path('search/', views.PropertySearchView.as_view(), name='property_search'),
     path('stats/', views.property_stats_view, name='property_stats'),
-    path('create/', views.PropertyCreateView.as_view(), name='property_create'),
+    path('async/', views.property_list_async_view, name='property_list_async'),
+    path('async/search/', views.property_search_async_view, name='property_search_async'),
+    path('async/stats/', views.property_stats_async_view, name='property_stats_async'),
+    path('async/<int:pk>/', views.property_detail_async_view, name='property_detail_async'),
+    path('create/', views.property_create_view, name='property_create'),
     path('my-properties/', views.UserPropertiesView.as_view(), name='user_properties'),
     path('<int:pk>/', views.PropertyDetailView.as_view(), name='property_detail'),
     path('<int:pk>/update/', views.PropertyUpdateView.as_view(), name='property_update'),
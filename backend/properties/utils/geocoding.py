@@ -1,21 +1,42 @@
-import requests
+# The HTTP clients are imported on first use: this module is imported by
+# the property serializers, and neither client is needed to boot a worker.
 
-def geocode_address(address):
-    url = "https://nominatim.openstreetmap.org/search"
-    params = {
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+HEADERS = {
+    "User-Agent": "rental-service-app/1.0"
+}
+TIMEOUT = 10
+
+
+def _params(address):
+    return {
         "q": address,
         "format": "json",
         "limit": 1,
         "addressdetails": 1
     }
-    headers = {
-        "User-Agent": "rental-service-app/1.0"
-    }
 
-    response = requests.get(url, params=params, headers=headers)
 
-    if response.status_code == 200 and response.json():
-        data = response.json()[0]
+def _coordinates(status_code, results):
+    if status_code == 200 and results:
+        data = results[0]
         return float(data["lat"]), float(data["lon"])
     else:
         return None, None
+
+
+def geocode_address(address):
+    import requests
+    response = requests.get(NOMINATIM_URL, params=_params(address), headers=HEADERS, timeout=TIMEOUT)
+    return _coordinates(response.status_code, response.json() if response.status_code == 200 else None)
+
+
+async def ageocode_address(address, client=None):
+    # For async callers: waits on the network without holding a thread.
+    # client, if given, is reused for the request and left open.
+    import httpx
+    if client is None:
+        async with httpx.AsyncClient(timeout=TIMEOUT) as client:
+            return await ageocode_address(address, client)
+    response = await client.get(NOMINATIM_URL, params=_params(address), headers=HEADERS)
+    return _coordinates(response.status_code, response.json() if response.status_code == 200 else None)
@@ -1,19 +1,31 @@
+from asgiref.sync import sync_to_async
 from rest_framework import generics, status, permissions, filters
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.exceptions import APIException, NotFound, ValidationError
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q, Avg, Min, Max, Count
 from django.db import models
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from applications.access import property_access
+from applications.models import RentalApplication
+from applications.serializers import RentalApplicationListSerializer
+from rentify.async_api import alist, api_response, begin_async_request, exception_response
+from rentify.sideload import SideloadMixin
+from rentify.throttling import SearchRateThrottle, StatsRateThrottle
 from .models import Property, PropertyImage, PropertyAmenity
 from .serializers import (
     PropertyListSerializer, PropertyDetailSerializer, PropertyCreateUpdateSerializer,
     PropertySearchSerializer, PropertyImageSerializer
 )
+from .utils.geocoding import ageocode_address
 
 
-class PropertyListView(generics.ListAPIView):
+class PropertyListView(SideloadMixin, generics.ListAPIView):
     
     serializer_class = PropertyListSerializer
     permission_classes = [permissions.AllowAny]
@@ -65,18 +77,30 @@ class PropertyDetailView(generics.RetrieveAPIView):
     permission_classes = [permissions.AllowAny]
     
     def get_queryset(self):
-        return Property.objects.filter(is_approved=True).select_related('owner').prefetch_related('images', 'amenities')
+        return Property.objects.filter(is_approved=True).select_related('owner').prefetch_related(
+            'images', 'amenities'
+        ).annotate(num_applications=Count('applications'))
 
 
-class PropertyCreateView(generics.CreateAPIView):
-    
-    serializer_class = PropertyCreateUpdateSerializer
-    permission_classes = [permissions.IsAuthenticated]
-    
-    def perform_create(self, serializer):
-       # if self.request.user.role != 'homeowner':
-        #    raise permissions.PermissionDenied("Only homeowners can create properties")
-        serializer.save(owner=self.request.user)
+@csrf_exempt
+@require_POST
+async def property_create_view(request):
+    # Async so the wait on the geocoding service, up to its timeout, does not
+    # hold a worker thread; validation and the inserts still run on one.
+    drf_request, refused = await sync_to_async(begin_async_request)(request, [], authenticate=True)
+    if refused:
+        return refused
+    # if drf_request.user.role != 'homeowner':
+    #    raise permissions.PermissionDenied("Only homeowners can create properties")
+    
+    serializer = PropertyCreateUpdateSerializer(data=drf_request.data, context={'request': drf_request})
+    if not await sync_to_async(serializer.is_valid)():
+        return api_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    data = serializer.validated_data
+    latitude, longitude = await ageocode_address(f"{data.get('address', '')}, {data.get('city', '')}, {data.get('state', '')}")
+    await sync_to_async(serializer.save)(owner=drf_request.user, latitude=latitude, longitude=longitude)
+    return api_response(serializer.data, status=status.HTTP_201_CREATED)
 
 
 class PropertyUpdateView(generics.UpdateAPIView):
@@ -96,7 +120,7 @@ class PropertyDeleteView(generics.DestroyAPIView):
         return Property.objects.filter(owner=self.request.user)
 
 
-class UserPropertiesView(generics.ListAPIView):
+class UserPropertiesView(SideloadMixin, generics.ListAPIView):
     
     serializer_class = PropertyListSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -105,24 +129,38 @@ class UserPropertiesView(generics.ListAPIView):
         return Property.objects.filter(owner=self.request.user).select_related('owner').prefetch_related('images')
 
 
-class PropertyApplicationsView(generics.ListAPIView):
-    
-    from applications.serializers import RentalApplicationListSerializer
+class PropertyApplicationsView(SideloadMixin, generics.ListAPIView):
     
     serializer_class = RentalApplicationListSerializer
     permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['screening_score', 'submitted_at']
+    ordering = ['-submitted_at']
     
     def get_queryset(self):
-        property_id = self.kwargs['property_id']
-        property_obj = get_object_or_404(Property, id=property_id, owner=self.request.user)
-        from applications.models import RentalApplication
-        return RentalApplication.objects.filter(property=property_obj).select_related('applicant', 'reviewed_by')
+        access = property_access(self.request, self.kwargs['property_id'])
+        if not access.can_manage():
+            raise Http404('No property matches the given query.')
+        queryset = RentalApplication.objects.filter(property=access.property)
+        
+        min_score = self.request.query_params.get('min_score')
+        if min_score:
+            try:
+                min_score = float(min_score)
+            except ValueError:
+                raise ValidationError({'min_score': 'Must be a number.'})
+            queryset = queryset.filter(screening_score__gte=min_score)
+        
+        return queryset.select_related(
+            'property__owner', 'applicant', 'reviewed_by'
+        ).prefetch_related('property__images')
 
 
-class PropertySearchView(generics.ListAPIView):
+class PropertySearchView(SideloadMixin, generics.ListAPIView):
     
     serializer_class = PropertyListSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [SearchRateThrottle]
     
     def get_queryset(self):
         queryset = Property.objects.filter(is_approved=True, status='available')
@@ -191,6 +229,7 @@ class PropertySearchView(generics.ListAPIView):
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([StatsRateThrottle])
 def property_stats_view(request):
     
     total_properties = Property.objects.filter(is_approved=True, status='available').count()
@@ -266,4 +305,65 @@ def set_primary_image_view(request, property_id, image_id):
     image.is_primary = True
     image.save()
     
-    return Response({'message': 'Primary image updated successfully'}, status=status.HTTP_200_OK)
\ No newline at end of file
+    return Response({'message': 'Primary image updated successfully'}, status=status.HTTP_200_OK)
+
+
+# Async variants of the public read endpoints, served under async/. They reuse
+# the views above for query building and serialization and fetch through the
+# async ORM, so under ASGI the event loop keeps serving other requests while
+# their queries run.
+
+async def _async_view(request, view_class, throttles=(), **kwargs):
+    drf_request, refused = await sync_to_async(begin_async_request)(request, list(throttles))
+    return view_class(request=drf_request, args=(), kwargs=kwargs, format_kwarg=None), refused
+
+
+async def _async_list(request, view_class, throttles=()):
+    view, refused = await _async_view(request, view_class, throttles)
+    if refused:
+        return refused
+    try:
+        return api_response(await alist(view))
+    except APIException as exc:
+        return exception_response(exc)
+
+
+@require_GET
+async def property_list_async_view(request):
+    return await _async_list(request, PropertyListView)
+
+
+@require_GET
+async def property_search_async_view(request):
+    return await _async_list(request, PropertySearchView, [SearchRateThrottle()])
+
+
+@require_GET
+async def property_detail_async_view(request, pk):
+    view, refused = await _async_view(request, PropertyDetailView, pk=pk)
+    if refused:
+        return refused
+    property_obj = await view.get_queryset().filter(pk=pk).afirst()
+    if property_obj is None:
+        return exception_response(NotFound('No Property matches the given query.'))
+    return api_response(view.get_serializer(property_obj).data)
+
+
+@require_GET
+async def property_stats_async_view(request):
+    drf_request, refused = await sync_to_async(begin_async_request)(request, [StatsRateThrottle()])
+    if refused:
+        return refused
+    
+    properties = Property.objects.filter(is_approved=True, status='available')
+    total_properties = await properties.acount()
+    prices = await properties.aaggregate(average=Avg('monthly_rent'), minimum=Min('monthly_rent'), maximum=Max('monthly_rent'))
+    property_types = [row async for row in properties.values('property_type').annotate(count=Count('id'))]
+    cities = [row async for row in properties.values('city').annotate(count=Count('id')).order_by('-count')[:10]]
+    
+    return api_response({
+        'total_properties': total_properties,
+        'price_stats': {key: float(value) if value else 0 for key, value in prices.items()},
+        'property_types': property_types,
+        'top_cities': cities,
+    })
@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimated_row_count(model, using='default'):
+    """
+    The planner's row estimate for the model's table, or None when the
+    database keeps none. Postgres refreshes it on (auto)vacuum/ANALYZE;
+    SQLite only after ANALYZE.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)', [table])
+            row = cursor.fetchone()
+            # -1 means the table has never been analyzed.
+            return row[0] if row and row[0] >= 0 else None
+        if connection.vendor == 'sqlite':
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            # The first number of each index's stat is the table's row count.
+            cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+            row = cursor.fetchone()
+            return int(row[0].split()[0]) if row else None
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Uses the planner's estimate instead of COUNT(*) for unfiltered
+    changelists of tables above ADMIN_ESTIMATED_COUNT_THRESHOLD rows.
+    Filtered and searched changelists, and small tables, count exactly.
+    """
+    
+    @cached_property
+    def count(self):
+        threshold = settings.ADMIN_ESTIMATED_COUNT_THRESHOLD
+        query = getattr(self.object_list, 'query', None)
+        if threshold and query is not None and not query.where:
+            estimate = estimated_row_count(self.object_list.model, self.object_list.db)
+            if estimate is not None and estimate >= threshold:
+                return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Base for changelists over big tables: estimated page counts, and no
+    second COUNT(*) of the whole table for the "N total" link on filtered
+    pages. Subclasses still set list_select_related for every relation
+    list_display shows, and raw_id_fields/autocomplete_fields for foreign
+    keys so the change form never renders a <select> of the whole table.
+    """
+    
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -3,6 +3,10 @@ ASGI config for rentify project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve the project through this module (e.g. ``uvicorn rentify.asgi:application``)
+to use the streaming message endpoint in applications.views; under WSGI each
+open stream pins a worker.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -0,0 +1,78 @@
+import math
+from django.core.paginator import InvalidPage
+from django.http import JsonResponse
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated, NotFound, Throttled
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+from accounts.authentication import CachedJWTAuthentication
+
+
+def begin_async_request(request, throttles, authenticate=False):
+    # The DRF steps an APIView would run before its handler, for async
+    # function views: parsing, authentication and throttling. Returns the DRF
+    # request and, if one of them refused, the response to send.
+    drf_request = Request(
+        request,
+        parsers=[JSONParser(), FormParser(), MultiPartParser()],
+        authenticators=[CachedJWTAuthentication()] if authenticate else [],
+    )
+    try:
+        drf_request.data
+        if authenticate and not drf_request.user.is_authenticated:
+            raise NotAuthenticated()
+        for throttle in throttles:
+            if not throttle.allow_request(drf_request, None):
+                raise Throttled(throttle.wait())
+    except APIException as exc:
+        return drf_request, exception_response(exc)
+    return drf_request, None
+
+
+def exception_response(exc):
+    detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    response = api_response(detail, status=exc.status_code)
+    if getattr(exc, 'wait', None):
+        response['Retry-After'] = str(math.ceil(exc.wait))
+    if isinstance(exc, (AuthenticationFailed, NotAuthenticated)):
+        # As APIView sends with its 401s.
+        response['WWW-Authenticate'] = CachedJWTAuthentication().authenticate_header(None)
+    return response
+
+
+def api_response(data, status=200):
+    # DRF's encoder, so dates, decimals and lazy strings render as in Response.
+    return JsonResponse(data, status=status, encoder=JSONEncoder, safe=False)
+
+
+def _with_included(view, data):
+    sideload = getattr(view, 'sideload', None)
+    return sideload.attach(data) if sideload is not None else data
+
+
+async def alist(view):
+    """
+    Async ListModelMixin.list() for a GenericAPIView: the page and its count
+    go through the async ORM. The view's serializer must not query, so related
+    rows have to be select_related/prefetched by get_queryset().
+    """
+    queryset = view.filter_queryset(view.get_queryset())
+    paginator = view.paginator
+    page_size = paginator.get_page_size(view.request) if paginator else None
+    if not page_size:
+        objects = [obj async for obj in queryset]
+        return _with_included(view, view.get_serializer(objects, many=True).data)
+    
+    django_paginator = paginator.django_paginator_class(queryset, page_size)
+    django_paginator.count = await queryset.acount()
+    page_number = paginator.get_page_number(view.request, django_paginator)
+    try:
+        page = django_paginator.page(page_number)
+    except InvalidPage as exc:
+        raise NotFound(paginator.invalid_page_message.format(page_number=page_number, message=str(exc)))
+    
+    page.object_list = [obj async for obj in page.object_list]
+    paginator.page = page
+    paginator.request = view.request
+    data = paginator.get_paginated_response(view.get_serializer(page.object_list, many=True).data).data
+    return _with_included(view, data)
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+from django.db import connections
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    
+    def ms(fraction):
+        value = percentile(latencies, fraction)
+        return round(value * 1000, 2) if value is not None else None
+    
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'requests_per_second': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'p50_ms': ms(0.5),
+        'p95_ms': ms(0.95),
+        'p99_ms': ms(0.99),
+    }
+
+
+def run_threaded(make_client, fetch, workers, total):
+    """
+    A threaded WSGI worker: `workers` threads, each with its own client and
+    database connection, handling one request at a time until `total`
+    requests have been made. fetch(client, index) returns a status code.
+    """
+    latencies, errors = [], [0]
+    issued = [0]
+    lock = threading.Lock()
+    
+    def worker():
+        client = make_client()
+        try:
+            while True:
+                with lock:
+                    if issued[0] >= total:
+                        return
+                    index = issued[0]
+                    issued[0] += 1
+                started = time.perf_counter()
+                status = fetch(client, index)
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+                    errors[0] += status >= 400
+        finally:
+            if hasattr(client, 'close'):
+                client.close()
+            connections.close_all()
+    
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, errors[0], time.perf_counter() - started)
+
+
+async def run_concurrent(client, fetch, workers, total):
+    # An ASGI worker: one event loop with at most `workers` requests in flight.
+    semaphore = asyncio.Semaphore(workers)
+    latencies, errors = [], 0
+    
+    async def timed(index):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            status = await fetch(client, index)
+            latencies.append(time.perf_counter() - started)
+            errors += status >= 400
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(timed(index) for index in range(total)))
+    return summarize(latencies, errors, time.perf_counter() - started)
@@ -0,0 +1,112 @@
+import hashlib
+import random
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.utils.decorators import sync_and_async_middleware
+from rest_framework.throttling import BaseThrottle
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+# Set by ReplicaRoutingMiddleware for the duration of a request whose reads
+# may be served by a replica.
+read_from_replica = ContextVar('read_from_replica', default=False)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+STICKY_KEY = 'db_primary_sticky:{client}'
+
+
+class PrimaryReplicaRouter:
+    
+    def db_for_read(self, model, **hints):
+        if not settings.DATABASE_REPLICAS or not read_from_replica.get():
+            return 'default'
+        # Reads inside a transaction must see that transaction's writes.
+        if connections['default'].in_atomic_block:
+            return 'default'
+        return random.choice(settings.DATABASE_REPLICAS)
+    
+    def db_for_write(self, model, **hints):
+        return 'default'
+    
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+    
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+def sticky_key(identity):
+    return STICKY_KEY.format(client=hashlib.sha1(identity.encode()).hexdigest())
+
+
+def client_identity(request):
+    # The user a valid access token names, so a refreshed token or the first
+    # token after registering or logging in finds the same key; the client
+    # address (as the throttles see it) when anonymous.
+    scheme, _, raw_token = request.headers.get('Authorization', '').partition(' ')
+    if scheme == 'Bearer' and raw_token:
+        try:
+            return f'user:{AccessToken(raw_token)[jwt_settings.USER_ID_CLAIM]}'
+        except TokenError:
+            pass
+    return f'ip:{BaseThrottle().get_ident(request)}'
+
+
+def stick_to_primary(user_id):
+    """
+    Keep the user's reads on the primary for DB_REPLICA_STICKY_SECONDS.
+    For views that hand out the user's first token (registration, login),
+    whose request the middleware could only key by address.
+    """
+    if settings.DATABASE_REPLICAS:
+        cache.set(sticky_key(f'user:{user_id}'), 1, settings.DB_REPLICA_STICKY_SECONDS)
+
+
+def _use_replica(request):
+    return request.method in SAFE_METHODS and not cache.get(sticky_key(client_identity(request)))
+
+
+def _after_response(request, response):
+    if request.method not in SAFE_METHODS and response.status_code < 400:
+        identities = {client_identity(request)}
+        # DRF copies the authenticated user onto the HttpRequest.
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            identities.add(f'user:{user.pk}')
+        cache.set_many({sticky_key(identity): 1 for identity in identities}, settings.DB_REPLICA_STICKY_SECONDS)
+
+
+@sync_and_async_middleware
+def ReplicaRoutingMiddleware(get_response):
+    # Safe requests read from a replica unless this client wrote within
+    # DB_REPLICA_STICKY_SECONDS; everything else stays on the primary.
+    
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            if not settings.DATABASE_REPLICAS:
+                return await get_response(request)
+            token = read_from_replica.set(await sync_to_async(_use_replica)(request))
+            try:
+                response = await get_response(request)
+            finally:
+                read_from_replica.reset(token)
+            await sync_to_async(_after_response)(request, response)
+            return response
+    else:
+        def middleware(request):
+            if not settings.DATABASE_REPLICAS:
+                return get_response(request)
+            token = read_from_replica.set(_use_replica(request))
+            try:
+                response = get_response(request)
+            finally:
+                read_from_replica.reset(token)
+            _after_response(request, response)
+            return response
+    
+    return middleware
@@ -0,0 +1,126 @@
+import bisect
+import threading
+from collections import defaultdict
+
+# Every metric registers itself here so /metrics can render them all.
+REGISTRY = []
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Monotonic per-process counter keyed by label values.
+    """
+    
+    type = 'counter'
+    
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = defaultdict(float)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+    
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] += amount
+    
+    def value(self, **labels):
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0.0)
+    
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name, _label_text(self.labelnames, key), value
+
+
+class Histogram:
+    """
+    Per-process histogram keyed by label values, with cumulative buckets
+    as Prometheus expects them.
+    """
+    
+    type = 'histogram'
+    
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+    
+    def observe(self, amount, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, amount)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts (plus +Inf), sum, count.
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += amount
+            series[2] += 1
+    
+    def count(self, **labels):
+        series = self._series.get(tuple(str(labels[name]) for name in self.labelnames))
+        return series[2] if series else 0
+    
+    def samples(self):
+        with self._lock:
+            snapshot = {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+        for key, (counts, total, count) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                yield f'{self.name}_bucket', _label_text(self.labelnames, key, [('le', _number(bound))]), cumulative
+            yield f'{self.name}_sum', _label_text(self.labelnames, key), total
+            yield f'{self.name}_count', _label_text(self.labelnames, key), count
+
+
+def render_metrics():
+    # Prometheus text exposition format, version 0.0.4.
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.type}')
+        for name, labels, value in metric.samples():
+            lines.append(f'{name}{labels} {_number(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+RATE_LIMIT_REJECTIONS = Counter(
+    'rentify_rate_limit_rejections_total', 'Requests refused with 429 by a token bucket.', ('scope', 'bucket')
+)
+
+REQUEST_DURATION = Histogram(
+    'rentify_request_duration_seconds', 'Total request latency by URL name.', ('view', 'method')
+)
+REQUEST_PHASE_DURATION = Histogram(
+    'rentify_request_phase_duration_seconds', 'Time spent in SQL, serializers and rendering per request.', ('view', 'phase')
+)
+REQUEST_QUERIES = Histogram(
+    'rentify_request_queries', 'SQL queries run per request.', ('view',), buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200)
+)
@@ -2,6 +2,7 @@
 from pathlib import Path
 from datetime import timedelta
 import os
+from django.core.exceptions import ImproperlyConfigured
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -28,6 +29,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'rentify.timing.RequestTimingMiddleware',
+    'rentify.slow_queries.SlowQueryLogMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -36,6 +39,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'rentify.db_router.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'rentify.urls'
@@ -56,15 +60,156 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'rentify.wsgi.application'
+ASGI_APPLICATION = 'rentify.asgi.application'
 
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE=postgres uses the database from docker-compose.yml; DB_REPLICA_HOSTS
+# (comma separated) adds read replicas that rentify.db_router sends safe
+# requests to. SQLite stays the default for local development.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+SQLITE_CONCURRENT_OPTIONS = {
+    'transaction_mode': 'IMMEDIATE',
+    'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 20)),
+    'init_command': (
+        'PRAGMA journal_mode=WAL;'
+        'PRAGMA synchronous=NORMAL;'
+        f"PRAGMA mmap_size={int(os.environ.get('SQLITE_MMAP_SIZE', 128 * 1024 * 1024))};"
+        f"PRAGMA cache_size=-{int(os.environ.get('SQLITE_CACHE_KB', 20000))};"
+        'PRAGMA temp_store=MEMORY;'
+    ),
+}
+
+if DB_ENGINE == 'postgres':
+    def postgres_database(host):
+        database = {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'rentify_db'),
+            'USER': os.environ.get('POSTGRES_USER', 'rentify_user'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': host,
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+        if os.environ.get('DB_POOL', 'False').lower() == 'true':
+            # psycopg's pool hands out connections per query; Django requires
+            # CONN_MAX_AGE=0 with it.
+            database['CONN_MAX_AGE'] = 0
+            database['OPTIONS']['pool'] = {
+                'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+                'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+                'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            }
+        else:
+            database['CONN_MAX_AGE'] = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+        return database
+    
+    DATABASES = {'default': postgres_database(os.environ.get('POSTGRES_HOST', 'localhost'))}
+    replica_hosts = [host for host in os.environ.get('DB_REPLICA_HOSTS', '').split(',') if host]
+    for index, host in enumerate(replica_hosts):
+        DATABASES[f'replica_{index}'] = postgres_database(host)
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+    # SQLITE_PROFILE=concurrent is for single-node sites with concurrent
+    # writers: WAL lets readers run alongside the writer, writes take the
+    # write lock up front (BEGIN IMMEDIATE) and wait up to busy_timeout for it
+    # instead of failing with "database is locked".
+    if os.environ.get('SQLITE_PROFILE', '') == 'concurrent':
+        DATABASES['default']['OPTIONS'] = SQLITE_CONCURRENT_OPTIONS
+    # A second alias on the same file stands in for a replica when trying
+    # the router locally.
+    if os.environ.get('DB_SQLITE_REPLICA', 'False').lower() == 'true':
+        DATABASES['replica_0'] = dict(DATABASES['default'])
+
+for alias in DATABASES:
+    if alias != 'default':
+        DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['rentify.db_router.PrimaryReplicaRouter']
+# After a write, that user's (or anonymous address's) reads stay on the
+# primary this long so they see their own changes despite replication lag.
+# The flag lives in CACHES, so replicas need REDIS_URL outside DEBUG: with the
+# per-process LocMemCache other workers would read from a lagging replica.
+DB_REPLICA_STICKY_SECONDS = int(os.environ.get('DB_REPLICA_STICKY_SECONDS', 5))
+
+REDIS_URL = os.environ.get('REDIS_URL', '')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+if DATABASE_REPLICAS and not REDIS_URL and not DEBUG:
+    raise ImproperlyConfigured('Read replicas need REDIS_URL: the read-your-writes flag must be shared by every worker.')
+
+if REDIS_URL:
+    MESSAGE_BROKER = {
+        'BACKEND': 'applications.realtime.RedisBroker',
+        'OPTIONS': {'url': REDIS_URL},
+    }
+else:
+    MESSAGE_BROKER = {
+        'BACKEND': 'applications.realtime.InMemoryBroker',
+    }
+
+# Token buckets behind rentify.throttling; limits are '<burst>/<period>' and
+# refill continuously at that rate.
+if REDIS_URL:
+    RATE_LIMIT_STORE = {
+        'BACKEND': 'rentify.throttling.RedisBucketStore',
+        'OPTIONS': {'url': REDIS_URL},
+    }
+else:
+    RATE_LIMIT_STORE = {
+        'BACKEND': 'rentify.throttling.InMemoryBucketStore',
+        'OPTIONS': {'max_buckets': int(os.environ.get('RATE_LIMIT_MAX_BUCKETS', 100000))},
     }
+
+RATE_LIMITS = {
+    'login': {'ip': os.environ.get('RATE_LIMIT_LOGIN_IP', '20/minute'), 'account': os.environ.get('RATE_LIMIT_LOGIN_ACCOUNT', '5/minute')},
+    'register': {'ip': os.environ.get('RATE_LIMIT_REGISTER_IP', '10/hour')},
+    'search': {'ip': os.environ.get('RATE_LIMIT_SEARCH_IP', '120/minute')},
+    'stats': {'ip': os.environ.get('RATE_LIMIT_STATS_IP', '60/minute')},
 }
 
+# Revoked refresh-token jtis (logout, rotation); entries expire with the token.
+# A revocation must reach every worker, so the per-process store is only used
+# under DEBUG or with TOKEN_REVOCATION_IN_MEMORY=true; otherwise, without
+# REDIS_URL, revocations are stored in the database (accounts.RevokedToken).
+if REDIS_URL:
+    TOKEN_REVOCATION_STORE = {
+        'BACKEND': 'accounts.revocation.RedisRevocationStore',
+        'OPTIONS': {'url': REDIS_URL},
+    }
+elif os.environ.get('TOKEN_REVOCATION_IN_MEMORY', str(DEBUG)).lower() == 'true':
+    TOKEN_REVOCATION_STORE = {
+        'BACKEND': 'accounts.revocation.InMemoryRevocationStore',
+    }
+else:
+    TOKEN_REVOCATION_STORE = {
+        'BACKEND': 'accounts.revocation.DatabaseRevocationStore',
+    }
+
+MESSAGE_STREAM_HEARTBEAT = int(os.environ.get('MESSAGE_STREAM_HEARTBEAT', 15))
+# Lifetime of the single-use tickets browsers open the message stream with.
+MESSAGE_STREAM_TICKET_MAX_AGE = int(os.environ.get('MESSAGE_STREAM_TICKET_MAX_AGE', 30))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -94,7 +239,7 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -106,6 +251,10 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # Number of reverse proxies in front of the app. Throttles take the client
+    # IP from that far back in X-Forwarded-For; 0 ignores the header, which a
+    # client could otherwise rotate to dodge the per-IP rate limits.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
 }
 
 SIMPLE_JWT = {
@@ -133,6 +282,7 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=5),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.RevocableTokenRefreshSerializer',
 }
 
 CORS_ALLOWED_ORIGINS = [
@@ -157,6 +307,70 @@ CORS_ALLOWED_HEADERS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Application documents are stored under PROTECTED_MEDIA_ROOT, which must not
+# be served directly (keep it outside MEDIA_ROOT and any public alias). After
+# the permission check they are sent as: 'nginx' returns X-Accel-Redirect to
+# an internal location at PROTECTED_MEDIA_INTERNAL_URL aliased to
+# PROTECTED_MEDIA_ROOT, 'sendfile' returns X-Sendfile (Apache mod_xsendfile,
+# lighttpd), anything else streams from Django.
+PROTECTED_MEDIA_ROOT = os.environ.get('PROTECTED_MEDIA_ROOT', str(BASE_DIR / 'protected_media'))
+PROTECTED_MEDIA_SERVER = os.environ.get('PROTECTED_MEDIA_SERVER', '')
+PROTECTED_MEDIA_INTERNAL_URL = os.environ.get('PROTECTED_MEDIA_INTERNAL_URL', '/protected-media/')
+
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 AUTH_USER_MODEL = 'accounts.User'
+
+# Square WebP renditions of profile pictures, rendered after upload on a
+# small thread pool (or inline when AVATAR_VARIANTS_EAGER is set).
+AVATAR_VARIANT_SIZES = (48, 96, 256)
+AVATAR_VARIANT_QUALITY = int(os.environ.get('AVATAR_VARIANT_QUALITY', 80))
+AVATAR_VARIANT_WORKERS = int(os.environ.get('AVATAR_VARIANT_WORKERS', 2))
+AVATAR_VARIANTS_EAGER = os.environ.get('AVATAR_VARIANTS_EAGER', 'False').lower() == 'true'
+
+# Password hashing for login, registration and password changes runs on a
+# pool of this many threads; beyond MAX_PENDING waiting calls requests get 503.
+PASSWORD_HASHING_WORKERS = int(os.environ.get('PASSWORD_HASHING_WORKERS', os.cpu_count() or 2))
+PASSWORD_HASHING_MAX_PENDING = int(os.environ.get('PASSWORD_HASHING_MAX_PENDING', 4 * PASSWORD_HASHING_WORKERS))
+
+# Authenticated requests resolve request.user from CACHES (and a per-process
+# copy) instead of the database; saving a User replaces its version stamp.
+# The stamp only reaches every worker through a shared cache, so this is off
+# by default outside DEBUG unless REDIS_URL is set: with the per-process
+# LocMemCache a password change or deactivation would not be seen by other
+# workers until AUTH_USER_CACHE_TIMEOUT. QuerySet.update() on users skips the
+# stamp; call accounts.authentication.bump_user_version() after one.
+AUTH_USER_CACHE_ENABLED = os.environ.get('AUTH_USER_CACHE_ENABLED', str(bool(REDIS_URL) or DEBUG)).lower() == 'true'
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', 60))
+AUTH_USER_LOCAL_CACHE_SIZE = int(os.environ.get('AUTH_USER_LOCAL_CACHE_SIZE', 10000))
+
+DASHBOARD_RECENT_APPLICATIONS = int(os.environ.get('DASHBOARD_RECENT_APPLICATIONS', 5))
+DASHBOARD_PROPERTY_CARDS = int(os.environ.get('DASHBOARD_PROPERTY_CARDS', 4))
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get('DASHBOARD_CACHE_TIMEOUT', 300))
+
+APPLICATION_DETAIL_MESSAGES = int(os.environ.get('APPLICATION_DETAIL_MESSAGES', 20))
+APPLICATION_DETAIL_DOCUMENTS = int(os.environ.get('APPLICATION_DETAIL_DOCUMENTS', 20))
+
+APPLICATION_ARCHIVE_AFTER_DAYS = int(os.environ.get('APPLICATION_ARCHIVE_AFTER_DAYS', 180))
+APPLICATION_ARCHIVE_BATCH_SIZE = int(os.environ.get('APPLICATION_ARCHIVE_BATCH_SIZE', 500))
+
+# Per-request SQL, serializer and render timings, sent as a Server-Timing
+# header and aggregated into the histograms served at /metrics. When off the
+# middleware removes itself at startup. Metrics are per process; when
+# METRICS_TOKEN is set /metrics requires "Authorization: Bearer <token>", and
+# without one it returns 404 unless DEBUG is on.
+REQUEST_TIMING_ENABLED = os.environ.get('REQUEST_TIMING_ENABLED', 'False').lower() == 'true'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Queries slower than SLOW_QUERY_THRESHOLD_MS during a request are appended to
+# SLOW_QUERY_LOG_FILE as JSON lines with the URL name and the request's
+# parameter names; that fraction of them also records EXPLAIN. 0 disables the
+# hook. Summarise the file with `manage.py slow_query_report`.
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 0))
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(os.environ.get('SLOW_QUERY_EXPLAIN_SAMPLE_RATE', 0.1))
+SLOW_QUERY_LOG_FILE = os.environ.get('SLOW_QUERY_LOG_FILE', str(BASE_DIR / 'slow_queries.log'))
+
+# Admin changelists on tables with at least this many rows (by the planner's
+# estimate) show the estimate instead of running COUNT(*) when unfiltered.
+# 0 always counts exactly.
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.environ.get('ADMIN_ESTIMATED_COUNT_THRESHOLD', 10000))
@@ -0,0 +1,73 @@
+from collections import defaultdict
+from rest_framework.serializers import ListSerializer
+
+
+def wants_normalized(request):
+    # Normalized responses are opt-in so existing clients keep nested objects.
+    return request.query_params.get('normalized', '').lower() == 'true'
+
+
+class Sideload:
+    
+    def __init__(self, normalized):
+        self.normalized = normalized
+        self.representations = {}
+        self.included = defaultdict(dict)
+    
+    def attach(self, data):
+        # Lists become {'results': [...]} so there is somewhere to put included.
+        if not self.normalized:
+            return data
+        if isinstance(data, list):
+            data = {'results': data}
+        data['included'] = self.included
+        return data
+
+
+class SideloadedSerializerMixin:
+    """
+    For serializers that appear nested in many rows of one response (users,
+    properties). Each distinct object is serialized once per response; with
+    ?normalized=true the row holds only its id and the object is emitted
+    once under included[sideload_as][id].
+    """
+    
+    sideload_as = None
+    
+    def is_nested(self):
+        root = self.root
+        return root is not self and not (self.parent is root and isinstance(root, ListSerializer))
+    
+    def to_representation(self, instance):
+        sideload = self.context.get('sideload')
+        if sideload is None or not self.is_nested():
+            return super().to_representation(instance)
+        
+        key = (type(self), instance.pk)
+        if key not in sideload.representations:
+            sideload.representations[key] = super().to_representation(instance)
+        if not sideload.normalized:
+            return sideload.representations[key]
+        
+        sideload.included[self.sideload_as][str(instance.pk)] = sideload.representations[key]
+        return instance.pk
+
+
+class SideloadMixin:
+    """
+    View mixin that shares one Sideload across the response's serializers
+    and, when normalized, attaches the included map to the response body.
+    """
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if not hasattr(self, 'sideload'):
+            self.sideload = Sideload(wants_normalized(self.request))
+        context['sideload'] = self.sideload
+        return context
+    
+    def finalize_response(self, request, response, *args, **kwargs):
+        sideload = getattr(self, 'sideload', None)
+        if sideload is not None and response.status_code == 200:
+            response.data = sideload.attach(response.data)
+        return super().finalize_response(request, response, *args, **kwargs)
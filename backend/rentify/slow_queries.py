@@ -0,0 +1,155 @@
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import timezone
+from .timing import install_execute_wrapper
+
+logger = logging.getLogger(__name__)
+
+# The request whose view issued the query; sync_to_async copies it to the
+# async ORM's thread.
+current_request = ContextVar('slow_query_request', default=None)
+
+_write_lock = threading.Lock()
+
+_NORMALIZE = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\bIN \(\?(?:, \?)*\)', re.IGNORECASE), 'IN (...)'),
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def normalize_sql(sql):
+    # Literals, numbers and placeholders become ?, so LIMIT 20 and LIMIT 40
+    # or IN lists of any length share a fingerprint.
+    for pattern, replacement in _NORMALIZE:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.sha1(normalized_sql.encode()).hexdigest()[:12]
+
+
+def _normalize_params(params):
+    # Types only: parameter values can be emails or password hashes.
+    if not params:
+        return []
+    values = params.values() if isinstance(params, dict) else params
+    return [type(value).__name__ for value in values]
+
+
+def _origin():
+    request = current_request.get()
+    if request is None:
+        return {'view': None, 'method': None, 'filters': []}
+    match = request.resolver_match
+    return {
+        'view': (match.url_name or match.view_name) if match else None,
+        'method': request.method,
+        # Parameter names without values: which filter combination was used.
+        'filters': sorted(request.GET.keys()),
+    }
+
+
+def _explain(connection, sql, params):
+    if not sql.lstrip()[:6].upper() == 'SELECT':
+        return None
+    if connection.needs_rollback:
+        return None
+    # A raw backend cursor: it bypasses the execute wrappers and leaves the
+    # caller's cursor and its pending rows alone. Inside a transaction the
+    # EXPLAIN runs in its own savepoint, since a failed statement aborts the
+    # whole transaction on PostgreSQL.
+    savepoint = None
+    if connection.in_atomic_block and connection.features.uses_savepoints:
+        savepoint = 'slow_query_explain'
+    cursor = connection.create_cursor()
+    try:
+        if savepoint:
+            cursor.execute(connection.ops.savepoint_create_sql(savepoint))
+        try:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+            plan = [' '.join(str(column) for column in row) for row in cursor.fetchall()]
+        except Exception:
+            if savepoint:
+                cursor.execute(connection.ops.savepoint_rollback_sql(savepoint))
+            raise
+        finally:
+            if savepoint:
+                cursor.execute(connection.ops.savepoint_commit_sql(savepoint))
+        return plan
+    except Exception:
+        logger.debug('EXPLAIN failed for slow query', exc_info=True)
+        return None
+    finally:
+        cursor.close()
+
+
+def record_slow_query(execute, sql, params, many, context):
+    started = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration_ms = (time.perf_counter() - started) * 1000
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS
+    if not threshold or duration_ms < threshold:
+        return result
+    
+    normalized = normalize_sql(sql)
+    entry = {
+        'time': timezone.now().isoformat(),
+        'duration_ms': round(duration_ms, 2),
+        'fingerprint': fingerprint(normalized),
+        'sql': normalized,
+        'params': _normalize_params(params),
+        'database': context['connection'].alias,
+        **_origin(),
+        'plan': None,
+    }
+    if not many and random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE:
+        entry['plan'] = _explain(context['connection'], sql, params)
+    
+    logger.warning('Slow query %.1fms in %s: %s', duration_ms, entry['view'], normalized[:200])
+    with _write_lock, open(settings.SLOW_QUERY_LOG_FILE, 'a') as log_file:
+        log_file.write(json.dumps(entry) + '\n')
+    return result
+
+
+class SlowQueryLogMiddleware:
+    
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERY_THRESHOLD_MS:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        install_execute_wrapper(record_slow_query)
+    
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            current_request.reset(token)
+    
+    async def __acall__(self, request):
+        token = current_request.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            current_request.reset(token)
@@ -0,0 +1,466 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from io import BytesIO, StringIO
+from unittest import mock
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from accounts.models import User
+from applications.models import ApplicationDocument, ApplicationMessage, RentalApplication
+from applications.tests import make_property, make_user
+from properties.models import Property, PropertyAmenity
+from .db_router import PrimaryReplicaRouter, ReplicaRoutingMiddleware
+from .slow_queries import _explain, normalize_sql
+from .throttling import InMemoryBucketStore
+from .metrics import REQUEST_DURATION, REQUEST_QUERIES, Histogram, render_metrics
+
+
+@override_settings(DATABASE_REPLICAS=['replica_0'], DB_REPLICA_STICKY_SECONDS=5, RATE_LIMITS={})
+class ReplicaRoutingTests(TransactionTestCase):
+    
+    # TestCase would wrap every test in a transaction, which pins reads to the primary.
+    
+    def setUp(self):
+        cache.clear()
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+    
+    def route(self, method, status=200, token=None):
+        routed = []
+        
+        def view(request):
+            routed.append(self.router.db_for_read(Property))
+            return HttpResponse(status=status)
+        
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        request = getattr(self.factory, method)('/api/properties/', **headers)
+        ReplicaRoutingMiddleware(view)(request)
+        return routed[0]
+    
+    def test_safe_requests_read_from_replicas(self):
+        self.assertEqual(self.route('get'), 'replica_0')
+        self.assertEqual(self.route('post'), 'default')
+        self.assertEqual(self.router.db_for_read(Property), 'default')
+        self.assertEqual(self.router.db_for_write(Property), 'default')
+    
+    def test_reads_stick_to_the_primary_after_a_write(self):
+        writer, other = AccessToken.for_user(make_user('writer', 'renter')), AccessToken.for_user(make_user('other', 'renter'))
+        self.route('post', status=400, token=writer)
+        self.assertEqual(self.route('get', token=writer), 'replica_0')
+        
+        self.route('patch', token=writer)
+        self.assertEqual(self.route('get', token=writer), 'default')
+        self.assertEqual(self.route('get', token=other), 'replica_0')
+        # Anonymous requests from another address are not pinned.
+        self.assertEqual(self.route('get'), 'replica_0')
+    
+    def test_registering_pins_the_new_users_reads(self):
+        response = self.client.post(reverse('user_register'), {
+            'email': 'new@example.com', 'username': 'newrenter', 'first_name': 'New', 'last_name': 'Renter',
+            'role': 'renter', 'password': 'a-long-password-1', 'password_confirm': 'a-long-password-1',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.route('get', token=response.json()['tokens']['access']), 'default')
+    
+    def test_refreshed_tokens_keep_reading_from_the_primary(self):
+        user = make_user('writer', 'renter')
+        refresh = RefreshToken.for_user(user)
+        self.route('patch', token=refresh.access_token)
+        
+        response = self.client.post(reverse('token_refresh'), {'refresh': str(refresh)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.route('get', token=response.json()['access']), 'default')
+    
+    def test_transactions_read_from_the_primary(self):
+        def view(request):
+            with transaction.atomic():
+                return HttpResponse(self.router.db_for_read(Property))
+        
+        response = ReplicaRoutingMiddleware(view)(self.factory.get('/'))
+        self.assertEqual(response.content, b'default')
+
+
+@override_settings(REQUEST_TIMING_ENABLED=True, METRICS_TOKEN='')
+class RequestTimingTests(APITestCase):
+    
+    def setUp(self):
+        owner = make_user('owner', 'homeowner')
+        make_property(owner, 'Flat')
+        make_property(owner, 'House')
+    
+    def timings(self, response):
+        return {
+            part.split(';')[0]: part for part in (item.strip() for item in response['Server-Timing'].split(','))
+        }
+    
+    def test_responses_carry_server_timing_by_phase(self):
+        before = REQUEST_DURATION.count(view='property_list', method='GET')
+        response = self.client.get(reverse('property_list'))
+        
+        timings = self.timings(response)
+        self.assertEqual(set(timings), {'db', 'serialize', 'render', 'total'})
+        self.assertIn('desc="3 queries"', timings['db'])
+        self.assertEqual(REQUEST_DURATION.count(view='property_list', method='GET'), before + 1)
+    
+    def test_async_views_count_queries_from_the_orm_thread(self):
+        before = REQUEST_QUERIES.count(view='property_list_async')
+        response = self.client.get(reverse('property_list_async'))
+        self.assertIn('desc="3 queries"', self.timings(response)['db'])
+        self.assertEqual(REQUEST_QUERIES.count(view='property_list_async'), before + 1)
+    
+    @override_settings(DEBUG=True)
+    def test_metrics_endpoint_renders_prometheus_text(self):
+        self.client.get(reverse('property_list'))
+        response = self.client.get(reverse('metrics'))
+        
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE rentify_request_duration_seconds histogram', body)
+        self.assertIn('rentify_request_duration_seconds_bucket{view="property_list",method="GET",le="+Inf"}', body)
+        self.assertIn('# TYPE rentify_rate_limit_rejections_total counter', body)
+    
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_token_is_required_when_configured(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+    
+    def test_metrics_are_hidden_without_a_token_outside_debug(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+    
+    @override_settings(REQUEST_TIMING_ENABLED=False)
+    def test_disabled_timing_adds_no_header(self):
+        self.client.handler.load_middleware()
+        self.assertNotIn('Server-Timing', self.client.get(reverse('property_list')))
+
+
+class HistogramTests(APITestCase):
+    
+    def test_buckets_are_cumulative(self):
+        histogram = Histogram('test_latency_seconds', 'Test.', ('view',), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 3):
+            histogram.observe(value, view='a')
+        
+        body = render_metrics()
+        self.assertIn('test_latency_seconds_bucket{view="a",le="0.1"} 1', body)
+        self.assertIn('test_latency_seconds_bucket{view="a",le="1.0"} 3', body)
+        self.assertIn('test_latency_seconds_bucket{view="a",le="+Inf"} 4', body)
+        self.assertIn('test_latency_seconds_count{view="a"} 4', body)
+
+
+# Queries per endpoint, whatever the fixture size. A change that adds per-row
+# queries breaks the large-fixture run; a deliberate change updates the number.
+# (url name, method, user, url kwargs, query/body, budget)
+# Not listed: application_message_stream holds the response open and polls,
+# so its queries grow with the time it stays connected (ApplicationMessageSyncTests
+# covers it), and application_document_download streams a file after the
+# same access check application_documents runs.
+QUERY_BUDGETS = [
+    ('property_list', 'get', None, {}, {}, 3),
+    ('property_list', 'get', None, {}, {'normalized': 'true'}, 3),
+    ('property_list_async', 'get', None, {}, {}, 3),
+    ('property_search', 'get', None, {}, {'search': 'Flat'}, 3),
+    ('property_search_async', 'get', None, {}, {'search': 'Flat'}, 3),
+    ('property_stats', 'get', None, {}, {}, 7),
+    ('property_stats_async', 'get', None, {}, {}, 4),
+    ('property_detail', 'get', None, {'pk': 'property'}, {}, 3),
+    ('property_detail_async', 'get', None, {'pk': 'property'}, {}, 3),
+    ('property_images', 'get', None, {'property_id': 'property'}, {}, 3),
+    ('user_properties', 'get', 'owner', {}, {}, 3),
+    ('property_applications', 'get', 'owner', {'property_id': 'property'}, {}, 4),
+    ('application_list', 'get', 'owner', {}, {}, 3),
+    ('application_list', 'get', 'renter', {}, {}, 3),
+    ('application_list', 'get', 'admin', {}, {}, 3),
+    ('application_inbox', 'get', 'owner', {}, {}, 3),
+    ('application_stats', 'get', 'owner', {}, {}, 4),
+    ('dashboard_summary', 'get', 'owner', {}, {}, 6),
+    ('dashboard_summary', 'get', 'renter', {}, {}, 3),
+    ('application_unread_counts', 'get', 'owner', {}, {}, 1),
+    ('application_detail', 'get', 'owner', {'pk': 'application'}, {}, 4),
+    ('application_messages', 'get', 'owner', {'application_id': 'application'}, {}, 3),
+    ('application_messages', 'get', 'owner', {'application_id': 'application'}, {'cursor': ''}, 2),
+    ('application_documents', 'get', 'owner', {'application_id': 'application'}, {}, 3),
+    ('application_documents', 'get', 'owner', {'application_id': 'application'}, {'cursor': ''}, 2),
+    ('application_messages_read', 'post', 'owner', {'application_id': 'application'}, {}, 8),
+    ('application_bulk_review', 'post', 'owner', {}, 'bulk_review', 6),
+    ('user_profile', 'get', 'renter', {}, {}, 0),
+    ('homeowner_profile', 'get', 'owner', {}, {}, 1),
+    ('renter_profile', 'get', 'renter', {}, {}, 1),
+    # Writes run last, each on rows no read above depends on.
+    ('application_create', 'post', 'renter', {}, 'application', 6),
+    ('application_update', 'patch', 'owner', {'pk': 'application'}, {'status': 'rejected'}, 4),
+    ('property_create', 'post', 'owner', {}, 'property', 2),
+    ('property_update', 'patch', 'owner', {'pk': 'property'}, {'monthly_rent': 1200}, 6),
+    ('property_delete', 'delete', 'owner', {'pk': 'spare_property'}, {}, 12),
+    ('user_update', 'patch', 'renter', {}, {'first_name': 'Renamed'}, 1),
+    ('application_messages', 'post', 'renter', {'application_id': 'application'}, {'message': 'Hello'}, 7),
+    ('application_documents', 'post', 'renter', {'application_id': 'application'}, 'document', 2),
+    ('application_message_stream_ticket', 'post', 'owner', {'application_id': 'application'}, {}, 1),
+    ('property_image_upload', 'post', 'owner', {'property_id': 'vacant_property'}, 'property_image', 4),
+    ('set_primary_image', 'post', 'owner', {'property_id': 'vacant_property', 'image_id': 'vacant_image'}, {}, 6),
+    ('property_image_delete', 'delete', 'owner', {'property_id': 'vacant_property', 'pk': 'vacant_primary_image'}, {}, 4),
+    ('profile_image_upload', 'post', 'renter', {}, 'profile_picture', 1),
+    ('delete_profile_image', 'delete', 'renter', {}, {}, 2),
+    # Revocation goes to the in-memory store under the test settings.
+    ('user_logout', 'post', 'member', {}, 'logout', 0),
+    ('user_register', 'post', None, {}, 'registration', 7),
+    ('user_login', 'post', None, {}, {'email': 'member@example.com', 'password': 'old-password-123'}, 9),
+    ('password_change', 'post', 'member', {}, 'password_change', 1),
+]
+
+
+@override_settings(RATE_LIMITS={})
+class QueryBudgetTests(APITestCase):
+    
+    # Properties, and amenities, messages and documents per row; applications
+    # are every property times up to four renters.
+    size = 2
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = {
+            'owner': make_user('owner', 'homeowner'),
+            'admin': make_user('admin', 'admin'),
+        }
+        renters = [make_user(f'renter{i}', 'renter') for i in range(min(cls.size, 4))]
+        cls.users['renter'] = renters[0]
+        properties = [make_property(cls.users['owner'], f'Flat {i}') for i in range(cls.size)]
+        for property_obj in properties:
+            PropertyAmenity.objects.bulk_create(
+                PropertyAmenity(property=property_obj, name=f'Amenity {i}') for i in range(cls.size)
+            )
+        applications = [
+            RentalApplication.objects.create(property=property_obj, applicant=renter)
+            for property_obj in properties for renter in renters
+        ]
+        for application in applications:
+            ApplicationMessage.objects.bulk_create(
+                ApplicationMessage(application=application, sender=sender, message='Hello')
+                for sender in [application.applicant, cls.users['owner']] * cls.size
+            )
+            ApplicationDocument.objects.bulk_create(
+                ApplicationDocument(application=application, document_type='id', file='application_documents/id.pdf')
+                for _ in range(cls.size)
+            )
+        cls.users['member'] = User.objects.create_user(
+            email='member@example.com', username='member', password='old-password-123', role='renter',
+        )
+        vacant = make_property(cls.users['owner'], 'Vacant')
+        vacant_images = list(vacant.images.order_by('order').values_list('id', flat=True))
+        cls.objects = {
+            'property': properties[0].id,
+            'application': applications[0].id,
+            'vacant_property': vacant.id,
+            'vacant_primary_image': vacant_images[0],
+            'vacant_image': vacant_images[1],
+            'spare_property': make_property(cls.users['owner'], 'Spare').id,
+        }
+    
+    def setUp(self):
+        cache.clear()
+        # property_create geocodes the address over the network.
+        geocode = mock.patch('properties.views.ageocode_address', return_value=(9.03, 38.74))
+        geocode.start()
+        self.addCleanup(geocode.stop)
+        media_root, protected_root = tempfile.mkdtemp(), tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.addCleanup(shutil.rmtree, protected_root)
+        media = override_settings(MEDIA_ROOT=media_root, PROTECTED_MEDIA_ROOT=protected_root)
+        media.enable()
+        self.addCleanup(media.disable)
+    
+    def image(self, name):
+        buffer = BytesIO()
+        Image.new('RGB', (4, 4)).save(buffer, 'PNG')
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+    
+    def payload(self, name):
+        if name == 'document':
+            return {'document_type': 'id', 'file': SimpleUploadedFile('id.pdf', b'%PDF', content_type='application/pdf')}
+        if name == 'property_image':
+            return {'image': self.image('flat.png')}
+        if name == 'profile_picture':
+            return {'profile_picture': self.image('avatar.png')}
+        if name == 'logout':
+            return {'refresh': str(RefreshToken.for_user(self.users['member']))}
+        return {
+            'bulk_review': {'property': self.objects['property'], 'approved_application': self.objects['application']},
+            'application': {'property': self.objects['vacant_property'], 'message': 'Hello'},
+            'property': {
+                'title': 'New flat', 'description': 'A place', 'property_type': 'apartment',
+                'address': '1 Main St', 'city': 'Adama', 'state': 'OR', 'zip_code': '1000',
+                'bedrooms': 2, 'bathrooms': 1, 'monthly_rent': 1000, 'available_from': '2025-01-01',
+            },
+            'registration': {
+                'email': 'new@example.com', 'username': 'newrenter', 'first_name': 'New', 'last_name': 'Renter',
+                'role': 'renter', 'password': 'a-long-password-1', 'password_confirm': 'a-long-password-1',
+            },
+            'password_change': {
+                'old_password': 'old-password-123', 'new_password': 'new-password-456',
+                'new_password_confirm': 'new-password-456',
+            },
+        }[name]
+    
+    def request(self, name, method, user, kwargs, data):
+        if user:
+            self.client.force_authenticate(self.users[user])
+        if isinstance(data, str):
+            data = self.payload(data)
+        url = reverse(name, kwargs={key: self.objects[value] for key, value in kwargs.items()})
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data)
+        self.client.force_authenticate(None)
+        return response, queries
+    
+    def test_endpoints_stay_within_query_budget(self):
+        for name, method, user, kwargs, data, budget in QUERY_BUDGETS:
+            with self.subTest(endpoint=name, user=user, data=data):
+                response, queries = self.request(name, method, user, kwargs, data)
+                self.assertLess(response.status_code, 300, response.content[:200])
+                executed = '\n'.join(f'  {query["sql"]}' for query in queries.captured_queries)
+                self.assertEqual(
+                    len(queries), budget,
+                    f'{name} ran {len(queries)} queries with {self.size} rows per table, budget {budget}:\n{executed}'
+                )
+
+
+class LargeQueryBudgetTests(QueryBudgetTests):
+    
+    # More rows than one page (PAGE_SIZE 20) for every list.
+    size = 25
+
+
+class SlowQueryLogTests(APITestCase):
+    
+    def setUp(self):
+        owner = make_user('owner', 'homeowner')
+        make_property(owner, 'Flat', city='Adama')
+        handle, self.log_file = tempfile.mkstemp(suffix='.log')
+        os.close(handle)
+        self.addCleanup(os.remove, self.log_file)
+    
+    def test_normalize_sql_folds_literals_and_in_lists(self):
+        self.assertEqual(
+            normalize_sql('SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = \'x\'  LIMIT 20'),
+            'SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?',
+        )
+    
+    def test_slow_queries_are_logged_with_view_filters_and_plan(self):
+        with override_settings(SLOW_QUERY_THRESHOLD_MS=0.001, SLOW_QUERY_EXPLAIN_SAMPLE_RATE=1.0,
+                               SLOW_QUERY_LOG_FILE=self.log_file, RATE_LIMITS={}):
+            with self.assertLogs('rentify.slow_queries', 'WARNING') as logs:
+                self.client.get(reverse('property_search'), {'city': 'Adama', 'min_price': 100})
+            
+            with open(self.log_file) as log_file:
+                entries = [json.loads(line) for line in log_file]
+            self.assertTrue(entries)
+            self.assertEqual(len(logs.output), len(entries))
+            self.assertEqual({entry['view'] for entry in entries}, {'property_search'})
+            self.assertEqual(entries[0]['filters'], ['city', 'min_price'])
+            self.assertTrue(all(entry['plan'] for entry in entries if entry['sql'].startswith('SELECT')))
+            
+            out = StringIO()
+            call_command('slow_query_report', view='property_search', top=1, stdout=out)
+            report = json.loads(out.getvalue())
+            self.assertEqual(report['entries'], len(entries))
+            self.assertEqual(report['top'][0]['views'], {'property_search': report['top'][0]['count']})
+            self.assertEqual(report['top'][0]['filters'], {'city,min_price': report['top'][0]['count']})
+        
+        # The wrapper stays installed but logs nothing once the threshold is 0 again.
+        self.client.get(reverse('property_search'), {'city': 'Adama'})
+        with open(self.log_file) as log_file:
+            self.assertEqual(len(log_file.readlines()), len(entries))
+    
+    def test_failed_explain_leaves_the_transaction_usable(self):
+        with transaction.atomic():
+            Property.objects.update(title='Renamed')
+            self.assertIsNone(_explain(connection, 'SELECT * FROM missing_table', None))
+            self.assertEqual(list(Property.objects.values_list('title', flat=True)), ['Renamed'])
+        self.assertIsNotNone(_explain(connection, 'SELECT 1', None))
+
+
+class InMemoryBucketStoreTests(SimpleTestCase):
+    
+    def test_refilled_buckets_are_dropped_and_the_store_is_capped(self):
+        store = InMemoryBucketStore(max_buckets=3)
+        for i in range(10):
+            store.consume(f'login:ip:{i}', 5, 1000)
+        self.assertEqual(list(store._buckets), ['login:ip:7', 'login:ip:8', 'login:ip:9'])
+        
+        # At 1000 tokens/s these refill within milliseconds and are swept.
+        time.sleep(0.01)
+        store.consume('login:ip:new', 5, 1000)
+        self.assertEqual(list(store._buckets), ['login:ip:new'])
+    
+    def test_eviction_keeps_limits_for_active_keys(self):
+        store = InMemoryBucketStore(max_buckets=2)
+        self.assertEqual([store.consume('target', 2, 1 / 60)[0] for _ in range(3)], [True, True, False])
+        store.consume('other', 2, 1 / 60)
+        self.assertFalse(store.consume('target', 2, 1 / 60)[0])
+
+
+# Modules a worker must not import until a request actually needs them.
+# (requests is still loaded at boot by rest_framework.compat, outside our control.)
+LAZY_MODULES = ('httpx', 'numpy', 'PIL')
+
+# Wall-clock budget for django.setup() plus loading the URLconf in a fresh
+# interpreter; boot measures roughly 450ms on a developer laptop.
+STARTUP_BUDGET_MS = 1500
+
+BOOT_SCRIPT = """
+import json, os, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps({
+    'ms': (time.perf_counter() - started) * 1000,
+    'modules': [name for name in %r if name in sys.modules],
+}))
+"""
+
+
+class StartupImportTests(SimpleTestCase):
+    
+    def boot(self):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='rentify.settings')
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT % (LAZY_MODULES,)],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+        return json.loads(result.stdout), result.stderr
+    
+    def slowest_imports(self, importtime, count=10):
+        # -X importtime lines read "import time: self [us] | cumulative | name".
+        rows = []
+        for line in importtime.splitlines():
+            fields = line.split('|')
+            if len(fields) == 3 and fields[1].strip().isdigit():
+                rows.append((int(fields[1]), fields[2].strip()))
+        return '\n'.join(f'{us / 1000:8.1f}ms  {name}' for us, name in sorted(rows, reverse=True)[:count])
+    
+    def test_boot_is_within_budget_and_skips_heavy_modules(self):
+        # The first boot warms the bytecode cache; only the second is measured.
+        self.boot()
+        boot, importtime = self.boot()
+        
+        self.assertEqual(boot['modules'], [], f'Imported at boot:\n{self.slowest_imports(importtime)}')
+        self.assertLess(
+            boot['ms'], STARTUP_BUDGET_MS,
+            f'Boot took {boot["ms"]:.0f}ms; slowest imports:\n{self.slowest_imports(importtime)}',
+        )
@@ -0,0 +1,166 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from functools import lru_cache
+from django.conf import settings
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+from .metrics import RATE_LIMIT_REJECTIONS
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    # Same '<requests>/<period>' format as DRF's built-in throttles; the
+    # request count is also the burst size.
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+class InMemoryBucketStore:
+    """
+    Token buckets for this process only. Used in tests and single-worker
+    setups; run RedisBucketStore when there is more than one worker.
+    """
+    
+    def __init__(self, max_buckets=100000):
+        # key -> (tokens, updated_at, full_at), least recently used first.
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_buckets = max_buckets
+    
+    def consume(self, key, capacity, refill_rate):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.pop(key, (capacity, now, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / refill_rate)
+            self._evict(now)
+        return allowed, 0 if allowed else (1 - tokens) / refill_rate
+    
+    def _evict(self, now):
+        # A bucket that has refilled is the same as no bucket, so idle ones
+        # are dropped; past max_buckets the least recently used go as well,
+        # so a flood of distinct IPs or emails cannot grow the dict forever.
+        while self._buckets:
+            _, _, full_at = next(iter(self._buckets.values()))
+            if full_at > now and len(self._buckets) <= self.max_buckets:
+                break
+            self._buckets.popitem(last=False)
+
+
+# Refill, take and store in one round trip; Redis' clock keeps workers consistent.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * refill_rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / refill_rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBucketStore:
+    
+    def __init__(self, url, prefix='rentify:ratelimit:'):
+        self.url = url
+        self.prefix = prefix
+        self._script = None
+    
+    def consume(self, key, capacity, refill_rate):
+        if self._script is None:
+            import redis
+            self._script = redis.Redis.from_url(self.url).register_script(TOKEN_BUCKET_SCRIPT)
+        allowed, tokens = self._script(keys=[f'{self.prefix}{key}'], args=[capacity, refill_rate])
+        return bool(allowed), 0 if allowed else (1 - float(tokens)) / refill_rate
+
+
+@lru_cache(maxsize=None)
+def get_bucket_store():
+    config = settings.RATE_LIMIT_STORE
+    return import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Per-IP and optional per-account token buckets for settings.RATE_LIMITS[scope].
+    Throttles run before the handler, so a refusal costs no queries or hashing.
+    """
+    
+    scope = None
+    
+    def get_account(self, request):
+        return None
+    
+    def get_buckets(self, request):
+        limits = settings.RATE_LIMITS.get(self.scope, {})
+        buckets = []
+        if 'ip' in limits:
+            # get_ident() honours X-Forwarded-For only as far as NUM_PROXIES says.
+            buckets.append(('ip', self.get_ident(request), limits['ip']))
+        account = self.get_account(request) if 'account' in limits else None
+        if account:
+            buckets.append(('account', account, limits['account']))
+        return buckets
+    
+    def allow_request(self, request, view):
+        self.retry_after = None
+        store = get_bucket_store()
+        for bucket, ident, rate in self.get_buckets(request):
+            capacity, period = parse_rate(rate)
+            allowed, retry_after = store.consume(f'{self.scope}:{bucket}:{ident}', capacity, capacity / period)
+            if not allowed:
+                self.retry_after = retry_after
+                RATE_LIMIT_REJECTIONS.inc(scope=self.scope, bucket=bucket)
+                logger.warning('Rate limit %s/%s exceeded by %s', self.scope, bucket, ident)
+                return False
+        return True
+    
+    def wait(self):
+        return self.retry_after
+
+
+class LoginRateThrottle(TokenBucketThrottle):
+    
+    scope = 'login'
+    
+    def get_account(self, request):
+        # Credential stuffing rotates IPs, so the target account has its own
+        # bucket. A JSON body may be a list or a scalar; the serializer
+        # rejects those, so they only draw from the IP bucket.
+        if not isinstance(request.data, Mapping):
+            return None
+        email = request.data.get('email')
+        return email.strip().lower() if isinstance(email, str) else None
+
+
+class RegistrationRateThrottle(TokenBucketThrottle):
+    
+    scope = 'register'
+
+
+class SearchRateThrottle(TokenBucketThrottle):
+    
+    scope = 'search'
+
+
+class StatsRateThrottle(TokenBucketThrottle):
+    
+    scope = 'stats'
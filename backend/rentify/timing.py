@@ -0,0 +1,155 @@
+import time
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework.serializers import BaseSerializer
+from .metrics import REQUEST_DURATION, REQUEST_PHASE_DURATION, REQUEST_QUERIES
+
+# The RequestTiming of the request being handled. sync_to_async copies the
+# context, so queries run on the async ORM's thread are counted too.
+current_timing = ContextVar('current_timing', default=None)
+
+METHODS = ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS')
+
+
+class RequestTiming:
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.render = 0.0
+        self.serializing = False
+    
+    def server_timing(self, total):
+        return ', '.join([
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries"',
+            f'serialize;dur={self.serialize * 1000:.1f}',
+            f'render;dur={self.render * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+
+def record_query(execute, sql, params, many, context):
+    timing = current_timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.db += time.perf_counter() - started
+        timing.queries += 1
+
+
+def install_execute_wrapper(wrapper):
+    # Adds wrapper to every connection: those already open in this thread
+    # and each one opened later, in any thread.
+    
+    def install(connection, **kwargs):
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
+    
+    connection_created.connect(install, weak=False, dispatch_uid=f'{wrapper.__module__}.{wrapper.__qualname__}')
+    for connection in connections.all(initialized_only=True):
+        install(connection)
+
+
+def _install_serializer_hook():
+    # Times the outermost serializer.data per request. That includes any
+    # queries the serializer triggers, which db also counts.
+    data = BaseSerializer.data
+    if getattr(data.fget, 'timed', False):
+        return
+    
+    def timed_data(self):
+        timing = current_timing.get()
+        if timing is None or timing.serializing:
+            return data.fget(self)
+        timing.serializing = True
+        started = time.perf_counter()
+        try:
+            return data.fget(self)
+        finally:
+            timing.serializing = False
+            timing.serialize += time.perf_counter() - started
+    
+    timed_data.timed = True
+    BaseSerializer.data = property(timed_data)
+
+
+def _start():
+    timing = RequestTiming()
+    return timing, current_timing.set(timing)
+
+
+def _finish(request, response, timing, token):
+    current_timing.reset(token)
+    total = time.perf_counter() - timing.started
+    match = request.resolver_match
+    view = (match.url_name or match.view_name) if match else 'unmatched'
+    method = request.method if request.method in METHODS else 'other'
+    
+    REQUEST_DURATION.observe(total, view=view, method=method)
+    REQUEST_PHASE_DURATION.observe(timing.db, view=view, phase='db')
+    REQUEST_PHASE_DURATION.observe(timing.serialize, view=view, phase='serialize')
+    REQUEST_PHASE_DURATION.observe(timing.render, view=view, phase='render')
+    REQUEST_QUERIES.observe(timing.queries, view=view)
+    response['Server-Timing'] = timing.server_timing(total)
+    return response
+
+
+class RequestTimingMiddleware:
+    
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        # Disabled means absent: Django drops the middleware at startup and
+        # no query or serializer hooks are installed.
+        if not settings.REQUEST_TIMING_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        
+        install_execute_wrapper(record_query)
+        _install_serializer_hook()
+    
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        timing, token = _start()
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            current_timing.reset(token)
+            raise
+        return _finish(request, response, timing, token)
+    
+    async def __acall__(self, request):
+        timing, token = _start()
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            current_timing.reset(token)
+            raise
+        return _finish(request, response, timing, token)
+    
+    def process_template_response(self, request, response):
+        # DRF responses render after the view returns; time that step with
+        # a post-render callback.
+        timing = current_timing.get()
+        if timing is not None:
+            started = time.perf_counter()
+            
+            def rendered(response):
+                timing.render += time.perf_counter() - started
+            
+            response.add_post_render_callback(rendered)
+        return response
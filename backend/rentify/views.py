@@ -0,0 +1,18 @@
+import hmac
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_GET
+from .metrics import render_metrics
+
+
+@require_GET
+def metrics_view(request):
+    # Route names, latencies and rate-limit rejections are not for the
+    # public: without a METRICS_TOKEN the endpoint only exists under DEBUG.
+    if not settings.METRICS_TOKEN and not settings.DEBUG:
+        return JsonResponse({'error': 'Not found'}, status=404)
+    if settings.METRICS_TOKEN:
+        supplied = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(supplied.encode(), f'Bearer {settings.METRICS_TOKEN}'.encode()):
+            return JsonResponse({'error': 'Invalid metrics token'}, status=401)
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,8 +1,8 @@
 import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
-import { propertiesAPI, applicationsAPI } from '../services/api';
-import { Property, RentalApplication } from '../types';
+import { applicationsAPI } from '../services/api';
+import { DashboardSummary } from '../types';
 import { 
   Home, 
   FileText, 
@@ -20,27 +20,13 @@ import {
 const Dashboard: React.FC = () => {
   const { user } = useAuth();
   const [loading, setLoading] = useState(true);
-  const [properties, setProperties] = useState<Property[]>([]);
-  const [applications, setApplications] = useState<RentalApplication[]>([]);
-  const [recentApplications, setRecentApplications] = useState<RentalApplication[]>([]);
+  const [summary, setSummary] = useState<DashboardSummary | null>(null);
 
   useEffect(() => {
     const fetchDashboardData = async () => {
       try {
-        const [propertiesResponse, applicationsResponse] = await Promise.all([
-          user?.role === 'homeowner' ? propertiesAPI.getUserProperties() : Promise.resolve({ data: [] }),
-          applicationsAPI.getApplications()
-        ]);
-
-        setProperties(propertiesResponse.data.results || propertiesResponse.data || []);
-        setApplications(applicationsResponse.data.results || applicationsResponse.data || []);
-
-        const recent = (applicationsResponse.data.results || applicationsResponse.data || [])
-          .sort((a: RentalApplication, b: RentalApplication) => 
-            new Date(b.submitted_at).getTime() - new Date(a.submitted_at).getTime()
-          )
-          .slice(0, 5);
-        setRecentApplications(recent);
+        const response = await applicationsAPI.getDashboardSummary();
+        setSummary(response.data);
       } catch (err) {
         console.error('Failed to fetch dashboard data:', err);
       } finally {
@@ -77,6 +63,10 @@ const Dashboard: React.FC = () => {
     }
   };
 
+  const counts = summary?.counts;
+  const properties = summary?.properties || [];
+  const recentApplications = summary?.recent_applications || [];
+
   if (loading) {
     return (
       <div className="min-h-screen flex items-center justify-center">
@@ -107,7 +97,7 @@ const Dashboard: React.FC = () => {
                   </div>
                   <div className="ml-4">
                     <p className="text-sm font-medium text-gray-600">Total Properties</p>
-                    <p className="text-2xl font-bold text-gray-900">{properties.length}</p>
+                    <p className="text-2xl font-bold text-gray-900">{counts?.total_properties || 0}</p>
                   </div>
                 </div>
               </div>
@@ -119,7 +109,7 @@ const Dashboard: React.FC = () => {
                   </div>
                   <div className="ml-4">
                     <p className="text-sm font-medium text-gray-600">Total Applications</p>
-                    <p className="text-2xl font-bold text-gray-900">{applications.length}</p>
+                    <p className="text-2xl font-bold text-gray-900">{counts?.total_applications || 0}</p>
                   </div>
                 </div>
               </div>
@@ -132,7 +122,7 @@ const Dashboard: React.FC = () => {
                   <div className="ml-4">
                     <p className="text-sm font-medium text-gray-600">Pending Applications</p>
                     <p className="text-2xl font-bold text-gray-900">
-                      {applications.filter(app => app.status === 'pending').length}
+                      {counts?.pending_applications || 0}
                     </p>
                   </div>
                 </div>
@@ -146,7 +136,7 @@ const Dashboard: React.FC = () => {
                   <div className="ml-4">
                     <p className="text-sm font-medium text-gray-600">Monthly Revenue</p>
                     <p className="text-2xl font-bold text-gray-900">
-                      ${properties.reduce((sum, prop) => sum + prop.monthly_rent, 0).toLocaleString()}
+                      ${(counts?.total_monthly_rent || 0).toLocaleString()}
                     </p>
                   </div>
                 </div>
@@ -161,7 +151,7 @@ const Dashboard: React.FC = () => {
                   </div>
                   <div className="ml-4">
                     <p className="text-sm font-medium text-gray-600">Total Applications</p>
-                    <p className="text-2xl font-bold text-gray-900">{applications.length}</p>
+                    <p className="text-2xl font-bold text-gray-900">{counts?.total_applications || 0}</p>
                   </div>
                 </div>
               </div>
@@ -174,7 +164,7 @@ const Dashboard: React.FC = () => {
                   <div className="ml-4">
                     <p className="text-sm font-medium text-gray-600">Pending</p>
                     <p className="text-2xl font-bold text-gray-900">
-                      {applications.filter(app => app.status === 'pending').length}
+                      {counts?.pending_applications || 0}
                     </p>
                   </div>
                 </div>
@@ -188,7 +178,7 @@ const Dashboard: React.FC = () => {
                   <div className="ml-4">
                     <p className="text-sm font-medium text-gray-600">Approved</p>
                     <p className="text-2xl font-bold text-gray-900">
-                      {applications.filter(app => app.status === 'approved').length}
+                      {counts?.approved_applications || 0}
                     </p>
                   </div>
                 </div>
@@ -202,7 +192,7 @@ const Dashboard: React.FC = () => {
                   <div className="ml-4">
                     <p className="text-sm font-medium text-gray-600">Rejected</p>
                     <p className="text-2xl font-bold text-gray-900">
-                      {applications.filter(app => app.status === 'rejected').length}
+                      {counts?.rejected_applications || 0}
                     </p>
                   </div>
                 </div>
@@ -311,7 +301,7 @@ const Dashboard: React.FC = () => {
                   </div>
                 ) : (
                   <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
-                    {properties.slice(0, 4).map((property) => (
+                    {properties.map((property) => (
                       <div key={property.id} className="border border-gray-200 rounded-lg p-4">
                         <div className="flex items-start justify-between mb-3">
                           <h3 className="font-medium text-gray-900">
@@ -408,15 +398,15 @@ const Dashboard: React.FC = () => {
                   <span className="text-sm text-gray-600">This Month</span>
                   <span className="text-sm font-medium text-gray-900">
                     {user?.role === 'homeowner' 
-                      ? `${applications.filter(app => new Date(app.submitted_at).getMonth() === new Date().getMonth()).length} applications`
-                      : `${applications.filter(app => new Date(app.submitted_at).getMonth() === new Date().getMonth()).length} applications submitted`
+                      ? `${counts?.applications_this_month || 0} applications`
+                      : `${counts?.applications_this_month || 0} applications submitted`
                     }
                   </span>
                 </div>
                 <div className="flex items-center justify-between">
                   <span className="text-sm text-gray-600">Total Properties</span>
                   <span className="text-sm font-medium text-gray-900">
-                    {user?.role === 'homeowner' ? properties.length : 'N/A'}
+                    {user?.role === 'homeowner' ? counts?.total_properties || 0 : 'N/A'}
                   </span>
                 </div>
                 <div className="flex items-center justify-between">
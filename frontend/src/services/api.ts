@@ -1,4 +1,5 @@
 import axios from 'axios';
+import { ApplicationDocument } from '../types';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000/api';
 
@@ -140,6 +141,9 @@ export const applicationsAPI = {
   getApplications: () =>
     api.get('/applications/'),
   
+  getInbox: (params?: any) =>
+    api.get('/applications/inbox/', { params }),
+  
   getApplication: (id: number) =>
     api.get(`/applications/${id}/`),
   
@@ -149,20 +153,43 @@ export const applicationsAPI = {
   updateApplication: (id: number, data: any) =>
     api.patch(`/applications/${id}/update/`, data),
   
-  getApplicationMessages: (id: number) =>
-    api.get(`/applications/${id}/messages/`),
+  // Without params: oldest first, page numbers and a count. since/before/cursor
+  // switch to cursor pages (since: oldest first; before/cursor: newest first).
+  getApplicationMessages: (id: number, params?: { since?: number; before?: number; cursor?: string }) =>
+    api.get(`/applications/${id}/messages/`, { params }),
+  
+  // Tickets are single use: fetch a new URL for every (re)connect.
+  messageStreamUrl: async (id: number, since?: number) => {
+    const { data } = await api.post(`/applications/${id}/messages/stream/ticket/`);
+    const params = new URLSearchParams({ ticket: data.ticket });
+    if (since) params.append('since', String(since));
+    return `${API_BASE_URL}/applications/${id}/messages/stream/?${params}`;
+  },
   
   sendMessage: (id: number, message: string) =>
     api.post(`/applications/${id}/messages/`, { message }),
   
+  markMessagesRead: (id: number, messageId?: number) =>
+    api.post(`/applications/${id}/messages/read/`, messageId ? { message_id: messageId } : {}),
+  
+  getUnreadCounts: () =>
+    api.get('/applications/unread/'),
+  
   getApplicationDocuments: (id: number) =>
     api.get(`/applications/${id}/documents/`),
   
   uploadDocument: (id: number, data: any) =>
     api.post(`/applications/${id}/documents/`, data),
   
+  // download_url needs the Authorization header, so it cannot be a plain link.
+  downloadDocument: (document: ApplicationDocument) =>
+    api.get<Blob>(document.download_url, { responseType: 'blob' }),
+  
   getApplicationStats: () =>
     api.get('/applications/stats/'),
+  
+  getDashboardSummary: () =>
+    api.get('/applications/dashboard/summary/'),
 };
 
 export default api;
@@ -8,6 +8,7 @@ export interface User {
   role: 'homeowner' | 'renter' | 'admin';
   phone_number: string;
   profile_picture?: string;
+  avatar?: Record<'48' | '96' | '256', string> | null;
   is_verified: boolean;
   created_at: string;
   updated_at: string;
@@ -98,9 +99,10 @@ export interface Property {
 export interface ApplicationDocument {
   id: number;
   document_type: 'id' | 'pay_stub' | 'bank_statement' | 'employment_letter' | 'reference_letter' | 'other';
-  file: string;
   description: string;
   uploaded_at: string;
+  // The file itself is upload-only; fetch it with applicationsAPI.downloadDocument.
+  download_url: string;
 }
 
 export interface ApplicationMessage {
@@ -119,6 +121,7 @@ export interface RentalApplication {
   message: string;
   move_in_date: string;
   lease_duration_months: number;
+  screening_score?: number | null;
   monthly_income?: number;
   employment_status: string;
   employer_name: string;
@@ -137,6 +140,8 @@ export interface RentalApplication {
   reviewed_by?: User;
   documents?: ApplicationDocument[];
   messages?: ApplicationMessage[];
+  documents_next?: string | null;
+  messages_next?: string | null;
 }
 
 export interface AuthResponse {
@@ -197,3 +202,14 @@ export interface ApplicationStats {
   approved_applications: number;
   rejected_applications: number;
 }
+
+export interface DashboardSummary {
+  role: 'homeowner' | 'renter' | 'admin';
+  counts: ApplicationStats & {
+    applications_this_month: number;
+    total_properties?: number;
+    total_monthly_rent?: number;
+  };
+  recent_applications: RentalApplication[];
+  properties: Property[];
+}